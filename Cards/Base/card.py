@@ -26,6 +26,9 @@ class Card:
         self.rank = rank
         self.suit = suit
 
+        # NOTE - position of the card in a 52-bit CardSet mask - ordered by rank then suit so it matches sort()
+        self.index = (rank - 1) * 4 + "CDHS".index(suit)
+
     def __repr__(self):
         return "?A23456789TJQK"[self.rank] + self.suit
 
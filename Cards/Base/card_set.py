@@ -0,0 +1,296 @@
+# REFERENCE - https://www.chessprogramming.org/Bitboards
+# REFERENCE - https://docs.python.org/3/library/stdtypes.html#int.bit_count
+
+# External Imports
+import random
+
+# Internal Imports
+from Cards.Base.card import Card
+
+# Every card in a standard deck is given one bit of a 52-bit integer (see Card.index)
+# bit = (rank - 1) * 4 + suit - so iterating the bits from lowest to highest returns cards in sorted order
+SUITS = "CDHS"
+
+# NOTE - one shared Card object per bit - cards are never mutated so every set hands out the same objects
+CARDS = [Card(rank, suit)
+         for rank in range(1, 13 + 1)
+         for suit in SUITS]
+
+FULL_MASK = (1 << 52) - 1
+RANK_MASKS = [0] + [0b1111 << ((rank - 1) * 4) for rank in range(1, 13 + 1)] # indexed by rank (RANK_MASKS[0] unused)
+SUIT_MASKS = {suit: sum(1 << ((rank - 1) * 4 + SUITS.index(suit)) for rank in range(1, 13 + 1)) for suit in SUITS}
+FACE_MASK = RANK_MASKS[11] | RANK_MASKS[12] | RANK_MASKS[13]
+
+# takes a CardSet, CardPile, single card or any iterable of cards and returns its mask
+def maskOf(cards):
+    if cards is None:
+        return 0
+    if isinstance(cards, (CardSet, CardPile)):
+        return cards.mask
+    if isinstance(cards, Card):
+        return 1 << cards.index
+
+    mask = 0
+    for card in cards:
+        mask |= 1 << card.index
+    return mask
+
+# returns the cards of a mask in sorted order
+def cardsOf(mask):
+    cards = []
+    while mask:
+        low = mask & -mask
+        cards.append(CARDS[low.bit_length() - 1])
+        mask ^= low
+    return cards
+
+# sum of the ranks of every card in a mask - popcount per rank instead of walking each card
+def healthOf(mask):
+    health = 0
+    rank = 1
+    while mask:
+        health += rank * (mask & 0b1111).bit_count()
+        mask >>= 4
+        rank += 1
+    return health
+
+# Unordered set of cards stored as a single integer - used for player hands and played cards
+# NOTE - keeps the parts of the list interface the game uses (append, remove, indexing, len, in) so a hand can be used like before
+class CardSet:
+    __slots__ = ("mask",)
+
+    def __init__(self, cards=None, mask=0):
+        self.mask = mask | maskOf(cards)
+
+    def add(self, card):
+        self.mask |= 1 << card.index
+
+    # NOTE - alias so a CardSet can stand in for a hand list
+    def append(self, card):
+        self.mask |= 1 << card.index
+
+    def remove(self, card):
+        bit = 1 << card.index
+        if not self.mask & bit:
+            raise ValueError("CardSet.remove(card): card not in set")
+        self.mask ^= bit
+
+    def clear(self):
+        self.mask = 0
+
+    def copy(self):
+        return CardSet(mask=self.mask)
+
+    # NOTE - cards are immutable so a deepcopy only needs a new mask holder
+    def __copy__(self):
+        return CardSet(mask=self.mask)
+
+    def __deepcopy__(self, memo):
+        return CardSet(mask=self.mask)
+
+    # NOTE - a CardSet is always sorted - kept so callers that sort a hand don't need to know the difference
+    def sort(self, reverse=False):
+        if reverse:
+            raise Exception("A CardSet can only be sorted in ascending order!")
+
+    def health(self):
+        return healthOf(self.mask)
+
+    def hasSuit(self, suit):
+        return self.mask & SUIT_MASKS[suit] != 0
+
+    def rankCount(self, rank):
+        return (self.mask & RANK_MASKS[rank]).bit_count()
+
+    def __contains__(self, card):
+        if card is None:
+            return False
+        return self.mask >> card.index & 1 == 1
+
+    def __len__(self):
+        return self.mask.bit_count()
+
+    def __bool__(self):
+        return self.mask != 0
+
+    def __iter__(self):
+        mask = self.mask
+        while mask:
+            low = mask & -mask
+            yield CARDS[low.bit_length() - 1]
+            mask ^= low
+
+    def __getitem__(self, index):
+        cards = cardsOf(self.mask)
+        return cards[index]
+
+    def __or__(self, other):
+        return CardSet(mask=self.mask | maskOf(other))
+
+    def __and__(self, other):
+        return CardSet(mask=self.mask & maskOf(other))
+
+    def __sub__(self, other):
+        return CardSet(mask=self.mask & ~maskOf(other))
+
+    def __eq__(self, other):
+        if isinstance(other, (CardSet, CardPile)):
+            return self.mask == other.mask
+        if isinstance(other, list):
+            return cardsOf(self.mask) == other
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(cardsOf(self.mask))
+
+# Ordered pile of cards - used where the order matters (tavern, discard and castle decks)
+# NOTE - the list keeps the order, the mask makes membership tests and set operations constant time
+class CardPile:
+    __slots__ = ("cards", "mask")
+
+    def __init__(self, cards=None):
+        self.cards = list(cards) if cards else []
+        self.mask = maskOf(self.cards)
+
+    def append(self, card):
+        self.cards.append(card)
+        self.mask |= 1 << card.index
+
+    def extend(self, cards):
+        for card in cards:
+            self.cards.append(card)
+            self.mask |= 1 << card.index
+
+    # adds cards to the bottom of the pile (index 0) - cards are drawn from the end
+    def prepend(self, cards):
+        cards = list(cards)
+        self.cards[:0] = cards
+        self.mask |= maskOf(cards)
+
+    def pop(self, index=-1):
+        card = self.cards.pop(index)
+        self.mask &= ~(1 << card.index)
+        return card
+
+    def remove(self, card):
+        self.cards.remove(card)
+        self.mask &= ~(1 << card.index)
+
+    # removes and returns the bottom count cards (index 0 onwards) - reverses prepend()
+    def popBottom(self, count):
+        cards = self.cards[:count]
+        del self.cards[:count]
+        self.mask &= ~maskOf(cards)
+        return cards
+
+    # removes every card past length - reverses append()/extend()
+    def truncate(self, length):
+        cards = self.cards[length:]
+        del self.cards[length:]
+        self.mask &= ~maskOf(cards)
+        return cards
+
+    def clear(self):
+        self.cards = []
+        self.mask = 0
+
+    def shuffle(self):
+        random.shuffle(self.cards)
+
+    def sort(self, reverse=False):
+        self.cards.sort(reverse=reverse)
+
+    def copy(self):
+        pile = CardPile.__new__(CardPile)
+        pile.cards = self.cards[:]
+        pile.mask = self.mask
+        return pile
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def health(self):
+        return healthOf(self.mask)
+
+    def hasSuit(self, suit):
+        return self.mask & SUIT_MASKS[suit] != 0
+
+    def __contains__(self, card):
+        if card is None:
+            return False
+        return self.mask >> card.index & 1 == 1
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __bool__(self):
+        return len(self.cards) != 0
+
+    def __iter__(self):
+        return iter(self.cards)
+
+    def __getitem__(self, index):
+        return self.cards[index]
+
+    def __iadd__(self, cards):
+        self.extend(cards)
+        return self
+
+    def __eq__(self, other):
+        if isinstance(other, CardPile):
+            return self.cards == other.cards
+        if isinstance(other, list):
+            return self.cards == other
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.cards)
+
+# testing function
+def cardSet():
+    hand = CardSet([Card(6, "C"), Card(3, "H"), Card(3, "C"), Card(10, "D"), Card(1, "S")])
+    assert len(hand) == 5, "Hand should contain 5 cards!"
+    assert list(hand) == sorted(list(hand)), "CardSet should iterate in sorted order!"
+    assert hand.health() == 6 + 3 + 3 + 10 + 1, "Health should be the sum of the ranks!"
+    assert hand.hasSuit("D") and not CardSet([Card(2, "S")]).hasSuit("D"), "Suit check failed!"
+    assert Card(3, "H") in hand and Card(3, "D") not in hand, "Membership test failed!"
+    assert hand.rankCount(3) == 2, "Hand should contain two 3's!"
+
+    hand.remove(Card(3, "H"))
+    assert len(hand) == 4 and Card(3, "H") not in hand, "Card should have been removed!"
+    assert hand[0] == Card(1, "S") and hand[-1] == Card(10, "D"), "Indexing should follow sorted order!"
+
+    assert len(cardsOf(FULL_MASK)) == 52 and healthOf(FULL_MASK) == 4 * sum(range(1, 13 + 1)), "Full deck mask is wrong!"
+
+    pile = CardPile([Card(5, "H"), Card(13, "S")])
+    pile.prepend([Card(7, "H")])
+    assert pile.cards == [Card(7, "H"), Card(5, "H"), Card(13, "S")], "Prepend should add to the bottom of the pile!"
+    assert pile.pop() == Card(13, "S") and Card(13, "S") not in pile, "Pop should remove from the top of the pile!"
+    assert pile.health() == 12, "Pile health should be the sum of the ranks!"
+
+    pile.extend([Card(2, "C"), Card(3, "C")])
+    assert pile.truncate(2) == [Card(2, "C"), Card(3, "C")] and Card(2, "C") not in pile, "Truncate should remove the top cards!"
+    assert pile.popBottom(1) == [Card(7, "H")] and pile.cards == [Card(5, "H")], "popBottom should reverse prepend!"
+
+if __name__ == "__main__":
+    cardSet()
+    print("Everything Passed!")
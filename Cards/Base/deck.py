@@ -8,21 +8,28 @@ import random
 
 # Internal Imports
 from Cards.Base.card import Card
+from Cards.Base.card_set import CardPile
 
 class Deck:
     def __init__(self):
-        self.cards = []
+        self.cards = CardPile()
 
     # create a standard 52-card deck
     def create(self):
-        self.cards = [Card(rank, suit)
-                      for rank in range(1, 13 + 1)
-                      for suit in ["C", "D", "H", "S"]]
+        self.cards = CardPile([Card(rank, suit)
+                               for rank in range(1, 13 + 1)
+                               for suit in ["C", "D", "H", "S"]])
 
         return self.cards
 
+    # NOTE - cards are immutable so only the pile itself needs copying
+    def clone(self):
+        deck = self.__class__.__new__(self.__class__)
+        deck.cards = self.cards.copy()
+        return deck
+
     def shuffle(self):
-        random.shuffle(self.cards)
+        self.cards.shuffle()
 
     def split(self):
         first_half = self.cards[:len(self.cards) // 2]
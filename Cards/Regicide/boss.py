@@ -22,6 +22,16 @@ class Boss(Card):
         else:
             raise Exception("Invalid Boss Rank!")
 
+    # copies the boss without going through __init__ - attack and health are the only values that change during a game
+    def clone(self):
+        boss = Boss.__new__(Boss)
+        boss.rank = self.rank
+        boss.suit = self.suit
+        boss.index = self.index
+        boss.attack = self.attack
+        boss.health = self.health
+        return boss
+
     def cardEffect(self, cards):
 
         try:
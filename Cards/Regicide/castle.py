@@ -35,9 +35,16 @@ class Castle(Deck):
         random.shuffle(jacks)
 
         # CONFIG - You can pick and choose what makes up the castle deck - I removed the queens and kings in order to feasible debug the reward system
-        self.cards += kings
-        self.cards += queens
-        self.cards += jacks
+        self.cards.extend(kings)
+        self.cards.extend(queens)
+        self.cards.extend(jacks)
+
+    # NOTE - castle pile holds undamaged bosses so it can be shared card-wise - only the boss in play needs its own copy
+    def clone(self):
+        castle = Castle.__new__(Castle)
+        castle.cards = self.cards.copy()
+        castle.boss = self.boss.clone() if self.boss else None
+        return castle
 
     def drawBoss(self):
         if self.boss != None:
@@ -46,7 +53,9 @@ class Castle(Deck):
         if self.cards == None:
             raise Exception("No more cards in castle deck!")
 
-        self.boss = self.cards.pop()
+        # NOTE - a fresh Boss is made when drawn - the castle pile is shared between copies so its bosses must never be damaged
+        card = self.cards.pop()
+        self.boss = Boss(card.rank, card.suit)
 
 def castle():
     castle = Castle()
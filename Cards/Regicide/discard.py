@@ -1,6 +1,7 @@
 # Internal Imports
 from Cards.Base.card import Card
 from Cards.Base.deck import Deck
+from Cards.Base.card_set import CardPile
 
 # simple discard pile that can have cards drawn and added
 
@@ -10,7 +11,12 @@ class Discard(Deck):
 
     # need to override create() in order to not have it take the create() from Deck
     def create(self):
-        self.cards = []
+        self.cards = CardPile()
+
+    def clone(self):
+        discard = Discard.__new__(Discard)
+        discard.cards = self.cards.copy()
+        return discard
 
     def drawCard(self):
         if len(self.cards) == 0:
@@ -20,7 +26,7 @@ class Discard(Deck):
     def addCards(self, cards):
         if len(cards) == 0:
             raise Exception("No cards to add!")
-        self.cards += cards
+        self.cards.extend(cards)
 
 def discard():
     discard = Discard()
@@ -3,6 +3,7 @@ import random
 
 # Internal Imports
 from Cards.Base.card import Card
+from Cards.Base.card_set import CardPile
 from Cards.Base.deck import Deck
 from Cards.Regicide.boss import Boss
 
@@ -11,12 +12,18 @@ class Tavern(Deck):
         super().__init__()
 
     def create(self):
-        self.cards = [Card(rank, suit)
-                      for rank in [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
-                      for suit in ["C", "D", "H", "S"]]
-        self.boss = []
+        self.cards = CardPile([Card(rank, suit)
+                               for rank in [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+                               for suit in ["C", "D", "H", "S"]])
+        self.boss = CardPile()
 
-        random.shuffle(self.cards)
+        self.cards.shuffle()
+
+    def clone(self):
+        tavern = Tavern.__new__(Tavern)
+        tavern.cards = self.cards.copy()
+        tavern.boss = self.boss.copy()
+        return tavern
 
     def drawCard(self):
         if len(self.boss) != 0:
@@ -28,7 +35,7 @@ class Tavern(Deck):
             raise Exception("No cards to add!")
 
         # TODO - If a round ends with a boss on the top of the deck - does the boss stay there?
-        self.cards += cards
+        self.cards.extend(cards)
 
     def addBoss(self, boss):
         if boss.rank not in [11, 12, 13]:
@@ -5,6 +5,11 @@ class Board:
         # Returns a representation of the starting state of the game.
         pass
 
+    def clone(self):
+        # Returns a copy of the game state that can be changed
+        # without affecting the original.
+        pass
+
     def currentPlayer(self):
         # Takes the game state and returns the current player's
         # number.
@@ -0,0 +1,144 @@
+# REFERENCE - https://en.wikipedia.org/wiki/Subset_sum_problem
+# REFERENCE - https://docs.python.org/3/library/functools.html#functools.lru_cache
+
+# External Imports
+from functools import lru_cache
+
+# Internal Imports
+from Cards.Base.card_set import CARDS
+from Cards.Base.card_set import FULL_MASK
+from Cards.Base.card_set import SUIT_MASKS
+from Cards.Base.card_set import RANK_MASKS
+
+# Exact discard solver for AI defence - picks the cards that block the damage while losing as little as possible
+# every subset of the hand (at most 2^8) is scored and the cheapest one that covers the damage is discarded
+# NOTE - the cost of a discard is the sum of the cost of its cards so every subset is scored from a smaller one
+
+# CONFIG - what a discarded card costs - rank points are the overshoot (every covering discard is at least the damage)
+RANK_COST = 1
+CARD_COST = 1 # keeping more cards keeps more plays open
+DIAMOND_COST = 6 # diamonds refill hands later on
+COMPANION_COST = 4 # aces can be added to any play
+COMBO_COST = 2 # cards of a rank that could still be played as a combo (2 or more of a rank adding up to 10 or less)
+
+# CONFIG - number of (hand, damage) keys kept before the least recently used one is evicted
+DISCARD_CACHE_SIZE = 16384
+
+DIAMONDS = SUIT_MASKS["D"]
+# solver subsets - bits 0-7 rank sum (at most 8 cards of rank 13 or less), bits 8-59 discard mask, cost above that
+SUM_BITS = 0xFF
+MASK_SHIFT = 8
+COST_SHIFT = 60
+
+# what losing card from hand (a mask) costs
+def cardCost(card, hand):
+    cost = card.rank * RANK_COST + CARD_COST
+
+    if DIAMONDS >> card.index & 1:
+        cost += DIAMOND_COST
+    if card.rank == 1:
+        cost += COMPANION_COST
+
+    count = (hand & RANK_MASKS[card.rank]).bit_count()
+    if card.rank > 1 and count > 1 and card.rank * 2 <= 10:
+        cost += COMBO_COST
+
+    return cost
+
+# NOTE - the solver doesn't build Card objects - every card is its subset on its own (cardCost() without the combo) plus
+#  the cards that would make it a combo (none for ranks that can't combo)
+STEPS = [cardCost(card, 1 << card.index) << COST_SHIFT | 1 << card.index << MASK_SHIFT | card.rank for card in CARDS]
+COMBO_PARTNERS = [RANK_MASKS[card.rank] & ~(1 << card.index) if 1 < card.rank <= 5 else 0 for card in CARDS]
+COMBO_STEP = COMBO_COST << COST_SHIFT
+
+# mask of the cheapest set of cards from hand whose ranks add up to at least damage - None if the player dies
+# NOTE - same rule as RegicidePlayer.takeDamage() - a hand whose ranks only add up to the damage (or less) dies
+# NOTE - ties go to the lowest mask so the same hand and damage always discard the same cards
+# NOTE - one cache shared by every player in the process - the discard only depends on the hand and the damage
+@lru_cache(maxsize=DISCARD_CACHE_SIZE)
+def solveDiscard(hand, damage):
+    if damage <= 0:
+        return 0
+
+    # NOTE - every card costs more than nothing, so a card that blocks the damage by itself is only ever discarded alone -
+    #  those are scored on their own and only the subsets of the smaller cards are enumerated
+    # every subset is one int - cost | discard mask | rank sum - so the smallest one that covers the damage is the cheapest
+    #  discard (the lowest mask on a tie) and the table doubles once per card in a single comprehension
+    best = None
+    health = 0
+    subsets = [0]
+    cards = hand
+    while cards:
+        bit = cards & -cards
+        cards ^= bit
+        index = bit.bit_length() - 1
+
+        step = STEPS[index]
+        health += step & SUM_BITS
+        if hand & COMBO_PARTNERS[index]:
+            step += COMBO_STEP
+
+        if step & SUM_BITS >= damage:
+            if best is None or step < best:
+                best = step
+            continue
+
+        subsets += [subset + step for subset in subsets]
+
+    if damage >= health:
+        return None
+
+    if subsets[-1] & SUM_BITS >= damage:
+        combined = min([subset for subset in subsets if subset & SUM_BITS >= damage])
+        if best is None or combined < best:
+            best = combined
+
+    return best >> MASK_SHIFT & FULL_MASK
+
+# testing function
+def discardSolver():
+    from Cards.Base.card import Card
+    from Cards.Base.card_set import maskOf
+    from Cards.Base.card_set import cardsOf
+
+    def solve(cards, damage):
+        discard = solveDiscard(maskOf(cards), damage)
+        return cardsOf(discard) if discard is not None else None
+
+    # exact cover beats overshooting
+    assert solve([Card(3, "C"), Card(7, "S"), Card(10, "H")], 10) == [Card(10, "H")], "One card blocking exactly 10 should be discarded!"
+    assert solve([Card(9, "C"), Card(10, "H")], 5) == [Card(9, "C")], "Smallest card that blocks should be discarded!"
+
+    # diamonds and aces are kept if something else covers the damage for a similar price
+    assert solve([Card(5, "D"), Card(6, "S")], 5) == [Card(6, "S")], "Diamond should be kept!"
+    assert solve([Card(1, "H"), Card(2, "S")], 1) == [Card(2, "S")], "Animal companion should be kept!"
+
+    # no damage means no discard and a hand that can't block returns None
+    assert solve([Card(5, "D")], 0) == [], "No damage shouldn't discard anything!"
+    assert solve([Card(5, "D"), Card(3, "C")], 9) is None, "Hand can't block 9 damage!"
+    assert solve([Card(5, "D"), Card(3, "C")], 9) is None, "Cached hand still can't block 9 damage!"
+    assert solve([Card(5, "D"), Card(3, "C")], 8) is None, "Blocking with every card (health == damage) should still die!"
+
+    # same answer from the cache
+    hits = solveDiscard.cache_info().hits
+    assert solve([Card(9, "C"), Card(10, "H")], 5) == [Card(9, "C")] and solveDiscard.cache_info().hits == hits + 1, "Second solve should be a cache hit!"
+
+    # the chosen discard is the cheapest of every covering subset
+    hand = [Card(2, "H"), Card(2, "S"), Card(5, "D"), Card(8, "C"), Card(1, "S"), Card(13, "H")]
+    mask = maskOf(hand)
+    for damage in range(1, 31):
+        discard = solveDiscard(mask, damage)
+        covering = []
+        for subset in range(1, 1 << len(hand)):
+            chosen = [card for index, card in enumerate(hand) if subset >> index & 1]
+            if sum(card.rank for card in chosen) >= damage:
+                covering.append(sum(cardCost(card, mask) for card in chosen))
+        if discard is None:
+            assert damage >= sum(card.rank for card in hand), "Solver missed a covering discard!"
+        else:
+            assert sum(card.rank for card in cardsOf(discard)) >= damage, "Discard doesn't cover the damage!"
+            assert sum(cardCost(card, mask) for card in cardsOf(discard)) == min(covering), "Discard isn't the cheapest!"
+
+if __name__ == "__main__":
+    discardSolver()
+    print("Everything Passed!")
@@ -0,0 +1,85 @@
+# REFERENCE - https://docs.python.org/3/library/collections.html#collections.OrderedDict
+# REFERENCE - https://docs.python.org/3/library/functools.html#functools.lru_cache
+
+# External Imports
+from collections import OrderedDict
+
+# CONFIG - number of (hand, can yield) keys kept before the least recently used one is evicted
+LEGAL_PLAYS_CACHE_SIZE = 8192
+
+# LRU cache of legal plays - keyed by the hand mask (cards in any order give the same key) and whether yielding is allowed
+# NOTE - values are tuples of moves (each move a tuple of cards or None) so a cached result can be handed to every
+#  caller without copying - anything that needs to change the list (e.g. a node's available moves) takes a list() of it
+class LegalPlaysCache:
+    def __init__(self, max_size=LEGAL_PLAYS_CACHE_SIZE):
+        if max_size < 1:
+            raise Exception("Legal plays cache needs room for at least one hand!")
+
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # returns the cached legal plays or None on a miss
+    def get(self, key):
+        try:
+            plays = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return plays
+
+    def put(self, key, plays):
+        self.entries[key] = plays
+        self.entries.move_to_end(key)
+
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def hitRate(self):
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return 0.0
+        return self.hits / lookups
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hit_rate": self.hitRate()
+        }
+
+# testing function
+def legalPlaysCache():
+    cache = LegalPlaysCache(2)
+    assert cache.get((1, True)) is None and cache.misses == 1, "Empty cache should miss!"
+
+    cache.put((1, True), ((1,), None))
+    cache.put((2, True), ((2,), None))
+    assert cache.get((1, True)) == ((1,), None) and cache.hits == 1, "Cached hand should hit!"
+
+    # (2, True) is now the least recently used key
+    cache.put((3, False), ((3,),))
+    assert cache.evictions == 1 and cache.get((2, True)) is None, "Least recently used hand should have been evicted!"
+    assert cache.get((1, True)) is not None, "Recently used hand shouldn't have been evicted!"
+
+    cache.clear()
+    assert cache.stats()["size"] == 0 and cache.hits == 0, "Cleared cache should be empty!"
+
+if __name__ == "__main__":
+    legalPlaysCache()
+    print("Everything Passed!")
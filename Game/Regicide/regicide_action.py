@@ -12,4 +12,25 @@ class RegicideAction:
 
     # NOTE - representation of action used for logging
     def __repr__(self):
-        return self.marker, "|", self.cards
\ No newline at end of file
+        return self.marker, "|", self.cards
+
+# REFERENCE - https://en.wikipedia.org/wiki/Persistent_data_structure#Linked_lists
+# Persistent (immutable) linked list of every action played - the newest action points back at the one before it
+# NOTE - a board only holds the newest entry so clones share the whole history in O(1) and undoing a move is one step back
+class ActionHistory:
+    __slots__ = ("action", "previous", "length")
+
+    def __init__(self, action, previous=None):
+        self.action = action
+        self.previous = previous
+        self.length = previous.length + 1 if previous else 1
+
+    # every action from the first to this one - O(length)
+    def toList(self):
+        actions = []
+        entry = self
+        while entry:
+            actions.append(entry.action)
+            entry = entry.previous
+        actions.reverse()
+        return actions
@@ -8,11 +8,30 @@ import logging
 from Game.Base.board import Board
 from Cards.Base.card import Card
 from Cards.Base.deck import Deck
+from Cards.Base.card_set import CardSet
+from Cards.Base.card_set import CardPile
+from Cards.Base.card_set import FULL_MASK
+from Cards.Base.card_set import SUIT_MASKS
+from Cards.Base.card_set import RANK_MASKS
+from Cards.Base.card_set import maskOf
+from Cards.Base.card_set import cardsOf
+from Cards.Base.card_set import CARDS
 from Game.Regicide.regicide_player import RegicidePlayer
 from Game.Regicide.regicide_action import RegicideAction
+from Game.Regicide.regicide_action import ActionHistory
+from Game.Regicide.regicide_undo import RegicideUndo
+from Game.Regicide.legal_plays_cache import LegalPlaysCache
+from Game.Regicide.regicide_zobrist import publicParts
+from Game.Regicide.regicide_zobrist import publicHash
+from Game.Regicide.regicide_zobrist import updateHash
+from Game.Regicide.regicide_zobrist import infoSetKey
 from Cards.Regicide.castle import Castle
 from Cards.Regicide.tavern import Tavern
 from Cards.Regicide.discard import Discard
+from Cards.Regicide.boss import Boss
+
+# NOTE - one cache shared by every board in the process - the legal plays only depend on the hand and can_yield
+legal_plays_cache = LegalPlaysCache()
 
 class RegicideBoard(Board):
     def __init__(self):
@@ -21,9 +40,13 @@ class RegicideBoard(Board):
         self.castle = Castle()
         self.tavern = Tavern()
         self.powers = [] # stores suit powers in the form of a character array (["H", "S"])
-        self.actions = []
+        self.history = None # NOTE - newest ActionHistory entry - shared between clones, see the actions property
+        self.last_action = None
+        self.current_player = 0 # it's player 1's turn (index 0) when game first begins
+        self.status = Result.ALIVE # winner() - only changes when nextState() or undo() is called
         self.hand_size = 0
         self.consecutive_yields = 0
+        self.zobrist = None # NOTE - incremental hash of the public board - None until enableHashing() is called
         self.verbose = False # NOTE - if verbose is set to true - extensive logging on what exactly is happening to terminal
 
         if self.verbose:
@@ -37,25 +60,39 @@ class RegicideBoard(Board):
 
 
     # initialise board
-    def start(self):
-        # TODO - input validation
-        valid = False
-        num_players = input("How many players would you like to have play? (2-4): ")
-        while not valid:
-            try:
-                if int(num_players) in [2, 3, 4]:
-                    num_players = int(num_players)
-                    valid = True
-                else:
-                    num_players = input("Please enter an appropriate amount of players... (2-4): ")
-            except ValueError:
-                num_players = input("Please enter an appropriate amount (integer) of players... (2-4): ")
-        print()
+    # NOTE - num_players and names are optional - if num_players is given the board is set up without prompting (used by the headless runner)
+    def start(self, num_players=None, names=None):
+        if num_players is None:
+            # TODO - input validation
+            valid = False
+            num_players = input("How many players would you like to have play? (2-4): ")
+            while not valid:
+                try:
+                    if int(num_players) in [2, 3, 4]:
+                        num_players = int(num_players)
+                        valid = True
+                    else:
+                        num_players = input("Please enter an appropriate amount of players... (2-4): ")
+                except ValueError:
+                    num_players = input("Please enter an appropriate amount (integer) of players... (2-4): ")
+            print()
+
+            for counter in range(num_players):
+                name = input("What is Player " + str(counter + 1) + "'s name?: ")
+                player = RegicidePlayer(name)
+                self.players.append(player)
+        else:
+            if num_players not in [2, 3, 4]:
+                raise Exception("Invalid amount of players! (2-4)")
+
+            if not names:
+                names = ["Player " + str(counter + 1) for counter in range(num_players)]
 
-        for counter in range(num_players):
-            name = input("What is Player " + str(counter + 1) + "'s name?: ")
-            player = RegicidePlayer(name)
-            self.players.append(player)
+            if len(names) != num_players:
+                raise Exception("Amount of names does not match the amount of players!")
+
+            for name in names:
+                self.players.append(RegicidePlayer(name))
 
         self.discard.create()
         self.castle.create()
@@ -72,26 +109,78 @@ class RegicideBoard(Board):
         if self.verbose:
             self.logBoard()
 
-    # takes current game state and uses its provided list of previous actions to determine next player
+    # structural copy of the board - used instead of deepcopy() everywhere in the engine
+    # NOTE - only mutable containers are copied, cards and actions are never changed once created so they're shared
+    def clone(self):
+        board = RegicideBoard.__new__(RegicideBoard)
+        board.players = [player.clone() for player in self.players]
+        board.discard = self.discard.clone()
+        board.castle = self.castle.clone()
+        board.tavern = self.tavern.clone()
+        board.powers = self.powers[:]
+        board.history = self.history
+        board.last_action = self.last_action
+        board.current_player = self.current_player
+        board.status = self.status
+        board.hand_size = self.hand_size
+        board.consecutive_yields = self.consecutive_yields
+        board.zobrist = self.zobrist
+        board.verbose = self.verbose
+        return board
+
+    # JSON-safe copy of the board - cards are stored by Card.index (hands as masks, ordered piles as lists)
+    # NOTE - used to send boards between processes without pickling (see ISMCTS/server.py) - boardFromDict() reverses it
+    def toDict(self):
+        boss = self.castle.boss
+        return {
+            "players": [{"name": player.name, "hand": player.hand.mask, "played": player.played.mask} for player in self.players],
+            "discard": [card.index for card in self.discard.cards],
+            "tavern": [card.index for card in self.tavern.cards],
+            "tavern_boss": [card.index for card in self.tavern.boss],
+            "castle": [card.index for card in self.castle.cards],
+            "boss": {"card": boss.index, "health": boss.health, "attack": boss.attack} if boss else None,
+            "powers": self.powers[:],
+            "actions": [[action.marker, [card.index for card in action.cards] if action.cards else None, action.boss_defeated, action.player_died]
+                        for action in self.actions],
+            "hand_size": self.hand_size,
+            "consecutive_yields": self.consecutive_yields
+        }
+
+    # every action played so far (oldest first) - built from the shared history so it's O(turns), only use it for logging/saving
+    @property
+    def actions(self):
+        return self.history.toList() if self.history else []
+
+    # replaces the history - the current player, last action and result are worked out again from it
+    def setActions(self, actions):
+        self.history = None
+        for action in actions:
+            self.history = ActionHistory(action, self.history)
+
+        self.last_action = self.history.action if self.history else None
+        self.current_player = nextPlayer(self.last_action, len(self.players))
+        self.status = self.calculateWinner(self.last_action) if self.last_action else Result.ALIVE
+
+    def turnCount(self):
+        return self.history.length if self.history else 0
+
+    # NOTE - kept up to date by nextState() so it's a field read instead of going through the action history
     def currentPlayer(self):
-        # it's player 1's turn (index 0) when game first begins
-        if len(self.actions) == 0:
-            return 0
-
-        last_action = self.actions[-1]
-
-        if last_action.boss_defeated:
-            return last_action.marker
+        return self.current_player
 
-        last_player = last_action.marker
-        next_player = (last_player + 1) % len(self.players)
-
-        return next_player
+    # appends the action to the history and moves the turn on - the last step of every nextState()
+    def recordAction(self, action):
+        self.history = ActionHistory(action, self.history)
+        self.last_action = action
+        self.current_player = nextPlayer(action, len(self.players))
+        self.status = self.calculateWinner(action)
 
     # takes the current game state and requested play and calculates the next game state
     # NOTE - play and final parameters is optional for debugging
     # NOTE - ai parameter is used to determine if takeDamage() is automatically handled
-    def nextState(self, play=None, ai=False, final=False):
+    # NOTE - if undo is True a RegicideUndo record is returned instead of the board - pass it to undo() to take the move back
+    # NOTE - defence is optional - the cards the player discards if they take damage (see RegicidePlayer.takeDamage())
+    def nextState(self, play=None, ai=False, final=False, undo=False, defence=None):
         # FIXME - This is the problem line of code...
         current_player = self.currentPlayer()
 
@@ -100,21 +189,31 @@ class RegicideBoard(Board):
         boss_defeated = False
         player_died = False
 
+        record = RegicideUndo(self) if undo else None
+
+        # NOTE - only the parts that changed are hashed again once the move has been applied
+        old_parts = publicParts(self) if self.zobrist is not None else None
 
         if not play:
             self.consecutive_yields += 1
 
             # NOTE - if player yields - they immediately take damage from the boss
-            discarded = self.players[current_player].takeDamage(self.castle.boss.attack, ai)
+            discarded = self.players[current_player].takeDamage(self.castle.boss.attack, ai, defence)
 
             if not discarded and self.castle.boss.attack != 0:
                 player_died = True
             else:
                 if len(discarded) != 0:
-                    self.discard.addCards(deepcopy(discarded))
+                    self.discard.addCards(discarded)
+
+            self.recordAction(RegicideAction(current_player, play, boss_defeated, player_died))
 
-            action = RegicideAction(current_player, play, boss_defeated, player_died)
-            self.actions.append(action)
+            if old_parts:
+                self.zobrist = updateHash(self.zobrist, old_parts, publicParts(self))
+
+            if record:
+                record.action = True
+                return record
             return self
 
         # Set cards to played first to check it's a valid move before applying card effects
@@ -128,9 +227,9 @@ class RegicideBoard(Board):
         except AttributeError:
             raise Exception("Trying to cardEffect() a NoneType boss!")
         if not ai or final:
-            self.cardEffect(play)
+            self.cardEffect(play, False, record)
         else:
-            self.cardEffect(play, True)
+            self.cardEffect(play, True, record)
 
         # TEST - If player defeats the boss - put all the cards the played into the discard pile have the same player start the next phase
         # NOTE - perfect hit adding current boss to tavern deck isn't currently implemented
@@ -141,22 +240,27 @@ class RegicideBoard(Board):
                 if len(player.played) != 0:
                     if not ai or final:
                         print(player.name + "'s Played Cards added to Discard Pile:", player.played)
-                    self.discard.addCards(deepcopy(player.played))
-                player.played = []
+                    self.discard.addCards(player.played)
+                player.played = CardSet()
             if perfect_hit:
                 if not ai or final:
                     print("Perfect Hit!")
                 self.tavern.addBoss(self.castle.boss)
+                if record:
+                    record.tavern_boss_added = True
             else:
-                self.discard.addCards([deepcopy(self.castle.boss)])
+                # NOTE - boss is converted back into a normal card once it's in the discard pile
+                self.discard.addCards([Card(self.castle.boss.rank, self.castle.boss.suit)])
             self.castle.boss = None
             boss_defeated = True
 
             if len(self.castle.cards) != 0:
+                if record:
+                    record.castle_card = self.castle.cards[-1]
                 self.castle.drawBoss()
         else:
             # player uses cards to defend themselves
-            discarded = self.players[current_player].takeDamage(self.castle.boss.attack, ai)
+            discarded = self.players[current_player].takeDamage(self.castle.boss.attack, ai, defence)
 
             # takeDamage() returns None if player died
             # second condition is a redundancy so the player isn't check to be dead if adventures have run
@@ -166,104 +270,110 @@ class RegicideBoard(Board):
                 if len(discarded) != 0:
                     if not ai or final:
                         print("Discarded Defence:", discarded)
-                    self.discard.addCards(deepcopy(discarded))
+                    self.discard.addCards(discarded)
+
+        self.recordAction(RegicideAction(current_player, play, boss_defeated, player_died))
 
-        action = RegicideAction(current_player, play, boss_defeated, player_died)
-        self.actions.append(action)
+        if old_parts:
+            self.zobrist = updateHash(self.zobrist, old_parts, publicParts(self))
 
         # NOTE - display piles as game progresses...
         if self.verbose and not ai:
             self.logBoard()
 
+        if record:
+            record.action = True
+            return record
         return self
 
+    # takes a RegicideUndo record from nextState() or randomize() and reverts the board to exactly how it was before
+    # NOTE - records must be undone in the reverse order they were made
+    def undo(self, record):
+        if record.action:
+            self.history = self.history.previous
+            self.last_action = self.history.action if self.history else None
+            self.current_player = record.current_player
+            self.status = record.status
+
+        # castle - put the drawn boss back and restore the boss in play
+        if record.castle_card is not None:
+            self.castle.cards.append(record.castle_card)
+        if record.castle_cards is not None:
+            self.castle.cards = record.castle_cards
+        self.castle.boss = record.boss
+        if record.boss:
+            record.boss.attack = record.boss_attack
+            record.boss.health = record.boss_health
+
+        # tavern - reverse perfect hit, then diamond draws, then the heart power
+        if record.tavern_boss_added:
+            self.tavern.boss.pop()
+        if record.tavern_drawn:
+            for card, from_boss in reversed(record.tavern_drawn):
+                if from_boss:
+                    self.tavern.boss.append(card)
+                else:
+                    self.tavern.cards.append(card)
+        if record.tavern_prepended:
+            self.tavern.cards.popBottom(record.tavern_prepended)
+        if record.tavern_cards is not None:
+            self.tavern.cards = record.tavern_cards
+
+        # discard - the heart power shuffles the whole pile so the old order is restored whole
+        if record.discard_order is not None:
+            self.discard.cards = record.discard_order
+        elif len(self.discard.cards) != record.discard_len:
+            self.discard.cards.truncate(record.discard_len)
+
+        for player, hand, played in zip(self.players, record.hands, record.played):
+            player.hand.mask = hand
+            player.played.mask = played
+
+        self.consecutive_yields = record.consecutive_yields
+        self.zobrist = record.zobrist
+
+    # starts keeping an incremental Zobrist hash of the public board (see regicide_zobrist.py) - nextState() updates it from then on
+    def enableHashing(self):
+        self.zobrist = publicHash(self)
+
+    # hash of what seat can observe - used by the search's transposition table
+    def infoSetHash(self, seat=None):
+        if self.zobrist is None:
+            self.enableHashing()
+        if seat is None:
+            seat = self.currentPlayer()
+        return infoSetKey(self.zobrist, self, seat)
+
     # takes current game state and returns of legal moves available to the player
     # NOTE - cards parameter is optional for debugging
+    # NOTE - results are cached by hand mask and whether yielding is allowed (see legal_plays_cache.py) -
+    #  a tuple of moves is returned and each move is a tuple of cards (or None for yielding), neither can be changed in place
     def legalPlays(self, cards=None):
-        legal_plays = []
-        cards.sort()
-
-        # return hand if player only has one card
-        if len(cards) == 1:
-            if self.consecutive_yields < len(self.players) - 1:
-                return [cards] + [None]
-            return [cards]
+        key = self.legalPlaysKey(cards)
+        plays = legal_plays_cache.get(key)
+        if plays is None:
+            plays = tuple(tuple(play) if play else None for play in generateLegalPlays(*key))
+            legal_plays_cache.put(key, plays)
 
-        # first simply append each card on their own
-        for card in cards:
-            if [card] not in legal_plays: # don't duplicate possible hands
-                legal_plays.append([card])
+        return plays
 
-        # now check any of the cards are animal companions and - if so - have legal plays for animal pair companions
-        for card in cards:
-            # TODO - change ace rank from 14 to 1
-            if card.rank == 1:
-                cards_copy = deepcopy(cards)
-                cards_copy.remove(card)
-                for companion in cards_copy:
-                    if companion.rank != 1:
-                        animal_combo = [card, companion]
-                        # TODO - slightly inefficient since it brute forces checking for duplicates - my intuition says there is a more eloquent solution...
-                        if animal_combo not in legal_plays:
-                            legal_plays.append(animal_combo)
-
-        # now check for combos of two
-        two_combos = []
-        for card in cards:
-            if card.rank in [2, 3, 4, 5]:
-                cards_copy = deepcopy(cards)
-                cards_copy.remove(card)
-                combo = [card]
-                for combo_card in cards_copy:
-                    if card.rank == combo_card.rank:
-                        combo = [card, combo_card]
-                        combo.sort()
-                        # TODO - see previous todo
-                        if combo not in two_combos:
-                            two_combos.append(deepcopy(combo))
-
-        # take combos of two and check for combos of three
-        three_combos = []
-        if len(two_combos) != 0:
-            legal_plays += two_combos
-            for combo in two_combos:
-                for card in cards:
-                    if card.rank in [2, 3] and card.rank == combo[0].rank and card not in combo:
-                        three_combo = deepcopy(combo) + [card]
-                        three_combo.sort()
-                        if three_combo not in three_combos:
-                            three_combos.append(three_combo)
-
-        # take combos of three and check for combos of four (we can return this the second we find one since it's only possible to have one combo of four)
-        four_combo = []
-        if len(three_combos) != 0:
-            legal_plays += three_combos
-            for combo in three_combos:
-                if len(four_combo) == 0:
-                    for card in cards:
-                        if card.rank == 2 and card.rank == combo[0].rank and card not in combo:
-                            four_combo = deepcopy(combo) + [card]
-                            legal_plays += [four_combo]
-
-        # return an extra 'None' type is for yielding
-        # NOTE - you can't yield if every other player before you has also yielded
-        if self.consecutive_yields < len(self.players) - 1:
-            return legal_plays + [None]
-
-        return legal_plays
+    # what the legal plays of a hand depend on - (hand mask, can yield)
+    # NOTE - you can't yield if every other player before you has also yielded
+    def legalPlaysKey(self, cards=None):
+        return maskOf(cards), self.consecutive_yields < len(self.players) - 1
 
     # take the current game state and determine whether an end-state condition was met
     # NOTE - Result.BOSS_DEFEATED has added later to implemented rewards based on defeating bosses
+    # NOTE - the result is worked out once per move by nextState() - last_action is only for checking a different action
     def winner(self, last_action=None):
+        if not last_action:
+            return self.status
+        return self.calculateWinner(last_action)
+
+    def calculateWinner(self, last_action):
         # CONFIG - Boss Reward Check Parameter
         boss_condition = True
 
-        try:
-            if not last_action:
-                last_action = self.actions[-1]
-        except IndexError:
-            return Result.ALIVE # Game just started
-
         result = Result.ALIVE
 
         if last_action.player_died:
@@ -286,7 +396,7 @@ class RegicideBoard(Board):
 
     # takes the current game state and cards being played and determines whether the heart and/or diamond suit powers activate
     # NOTE - spade and clubs effects are written in the Boss class since they only apply to the current boss and not the current game state - this is a case of coupling that could be abstracted
-    def cardEffect(self, cards, ai = False):
+    def cardEffect(self, cards, ai = False, record = None):
 
         try:
             length = len(cards)
@@ -306,16 +416,18 @@ class RegicideBoard(Board):
                 diamond_check = True
 
         if heart_check:
-            self.applyHeart(power, ai)
+            self.applyHeart(power, ai, record)
 
         if diamond_check:
-            self.applyDaimond(power, ai)
+            self.applyDaimond(power, ai, record)
 
     # apply the heart suit power to the board based on the previously calculated 'power' (sum of rank) of played cards
     # NOTE - heart suit power moves cards from the discard pile to the tavern deck
-    def applyHeart(self, power, ai = False):
+    def applyHeart(self, power, ai = False, record = None):
         if len(self.discard.cards) != 0:
-            random.shuffle(self.discard.cards)
+            if record:
+                record.discard_order = self.discard.cards.copy()
+            self.discard.cards.shuffle()
             counter = 0
             drawn_cards = []
             while counter < power and len(self.discard.cards) != 0:
@@ -325,12 +437,15 @@ class RegicideBoard(Board):
 
             if not ai:
                 print("Cards being moved from the discard to tavern deck:", drawn_cards)
-            self.tavern.cards = drawn_cards + self.tavern.cards
+            self.tavern.cards.prepend(drawn_cards)
+
+            if record:
+                record.tavern_prepended = len(drawn_cards)
 
     # apply the heart suit power to the board based on the previously calculated 'power' (sum of rank) of played cards
     # NOTE - diamond suit power draws cards one at a time from the tavern deck and adds them to player hands' in turns -
     #  stops when all players have max hand size or number of drawn cards = power
-    def applyDaimond(self, power, ai = False):
+    def applyDaimond(self, power, ai = False, record = None):
         current_player = self.currentPlayer()
         counter = 0
         full = set([])
@@ -338,7 +453,13 @@ class RegicideBoard(Board):
             if len(self.players[current_player].hand) < self.hand_size:
                 if not ai:
                     print(self.players[current_player].name + " is drawing a card from the Tavern!")
+                if record:
+                    from_boss = len(self.tavern.boss) != 0
                 drawn_card = self.tavern.drawCard()
+                if record:
+                    if record.tavern_drawn is None:
+                        record.tavern_drawn = []
+                    record.tavern_drawn.append((drawn_card, from_boss))
                 self.players[current_player].hand.append(drawn_card)
                 counter += 1
             else:
@@ -349,52 +470,66 @@ class RegicideBoard(Board):
 
     # REFERENCE - https://github.com/melvinzhang/ismcts/blob/master/ISMCTS.py (GameState.CloneAndRandomize())
     def cloneAndRandomize(self, marker=None):
+        state = self.clone()
+        state.randomize(marker)
+        return state
+
+    # determinizes the board in place - hidden cards (tavern deck and other players' hands) are re-dealt at random
+    # NOTE - if undo is True a RegicideUndo record is returned so the original hidden cards can be put back with undo()
+    def randomize(self, marker=None, undo=False):
 
         # NOTE - usually self determine current player but have the optional parameter for ease of debugging
         if not marker:
             marker = self.currentPlayer()
 
-        state = deepcopy(self)
+        record = None
+        if undo:
+            record = RegicideUndo(self)
+            record.tavern_cards = self.tavern.cards
+            record.castle_cards = self.castle.cards.copy()
 
-        seen_cards = []
         # current player can see/know:
         ## their own hand
         ## boss cards on top of the tavern
         ## cards in the discard pile
         ## the current castle boss
         ## the remaining cards in the castle (just not in what order)
-        seen_cards += state.players[marker].hand if len(state.players[marker].hand) != 0 else []
-        seen_cards += state.tavern.boss if len(state.tavern.boss) != 0 else []
-        seen_cards += state.discard.cards if len(state.discard.cards) != 0 else []
-        seen_cards += [state.castle.boss] if state.castle.boss else []
-        seen_cards += state.castle.cards if len(state.castle.cards) != 0 else []
+        seen_mask = self.players[marker].hand.mask
+        seen_mask |= self.tavern.boss.mask
+        seen_mask |= self.discard.cards.mask
+        seen_mask |= maskOf(self.castle.boss)
+        seen_mask |= self.castle.cards.mask
 
-        unseen_cards = [card for card in Deck().create() if card not in seen_cards]
+        # NOTE - cards played against the current boss are public too - they're in play rather than in any hand
+        for player in self.players:
+            seen_mask |= player.played.mask
+
+        unseen_cards = cardsOf(FULL_MASK & ~seen_mask)
 
         random.shuffle(unseen_cards)
 
         # assign cards back into tavern deck
-        num_cards = len(state.tavern.cards)
-        state.tavern.cards = unseen_cards[:num_cards]
+        num_cards = len(self.tavern.cards)
+        self.tavern.cards = CardPile(unseen_cards[:num_cards])
         unseen_cards = unseen_cards[num_cards:]
 
         # assign cards back into players hand's
         for player in range(0, len(self.players)):
             if player != marker:
-                num_cards = len(state.players[player].hand)
-                state.players[player].hand = unseen_cards[:num_cards]
+                num_cards = len(self.players[player].hand)
+                self.players[player].hand = CardSet(unseen_cards[:num_cards])
                 unseen_cards = unseen_cards[num_cards:]
 
         # shuffle castle deck back together
-        castle = state.castle.cards if len(state.castle.cards) != 0 else None
+        castle = self.castle.cards if len(self.castle.cards) != 0 else None
 
         if castle:
-            random.shuffle(castle)
+            castle.shuffle()
             # FIXME - this function is deterministic and does not return a different valid castle state each time it is ran
             castle.sort(reverse=True) # order = S, H, D, C
-            state.castle.cards = castle
+            self.castle.cards = castle
 
-        return state
+        return record
 
     # print lengths of each players hand to the terminal
     def displayHandLengths(self):
@@ -417,14 +552,12 @@ class RegicideBoard(Board):
             for player in self.players:
                 hands.append(player.hand)
 
-        # flatten cards in player hands into one list
-        # REFERENCE - https://stackoverflow.com/questions/952914/how-do-i-make-a-flat-list-out-of-a-list-of-lists
-        cards_in_hands = [card for hand in hands for card in hand]
-
-        # check for diamond
-        diamonds = [card for card in cards_in_hands if card.suit == "D"]
+        # combine every hand into one mask and check it for diamonds
+        cards_in_hands = 0
+        for hand in hands:
+            cards_in_hands |= maskOf(hand)
 
-        if len(diamonds) != 0:
+        if cards_in_hands & SUIT_MASKS["D"]:
             return False
         else:
             return True
@@ -441,6 +574,14 @@ class RegicideBoard(Board):
         logging.info("Tavern=%s", self.tavern.cards)
         logging.info("Discard=%s", self.discard.cards)
 
+# seat that plays after action - the same player goes again after defeating a boss
+def nextPlayer(action, num_players):
+    if not action:
+        return 0
+    if action.boss_defeated:
+        return action.marker
+    return (action.marker + 1) % num_players
+
 # Enum class to make it easier to handle game state
 class Result(Enum):
     ALIVE = 0
@@ -455,6 +596,105 @@ def sumOfRanks(cards):
         total += card.rank
     return total
 
+# builds the legal plays of a hand mask - used by RegicideBoard.legalPlays() on a cache miss
+# NOTE - moves are built straight from the rank buckets of the hand mask - the caller's hand is never copied or sorted
+#  order: singles, animal companions (ace + non-ace), pairs (2-5), threes (2-3), four 2's, then None for yielding
+def generateLegalPlays(mask, can_yield):
+    hand = cardsOf(mask) # sorted list of the shared card objects
+
+    # return hand if player only has one card
+    if len(hand) == 1:
+        if can_yield:
+            return [hand, None]
+        return [hand]
+
+    # first simply append each card on their own
+    legal_plays = [[card] for card in hand]
+
+    # animal companions - aces are the lowest rank so they're always at the front of the sorted hand
+    num_aces = (mask & RANK_MASKS[1]).bit_count()
+    if num_aces:
+        for ace in hand[:num_aces]:
+            for companion in hand[num_aces:]:
+                legal_plays.append([ace, companion])
+
+    # combos are only possible on ranks 2-5 (total rank must be 10 or under)
+    # NOTE - each bucket is sorted so pairs/threes come out in the same order as the sorted combos
+    start = num_aces
+    buckets = []
+    for rank in [2, 3, 4, 5]:
+        size = (mask & RANK_MASKS[rank]).bit_count()
+        if size > 1:
+            buckets.append(hand[start:start + size])
+        start += size
+
+    if not buckets:
+        if can_yield:
+            legal_plays.append(None)
+        return legal_plays
+
+    # combos of two
+    for bucket in buckets:
+        size = len(bucket)
+        for i in range(size - 1):
+            for j in range(i + 1, size):
+                legal_plays.append([bucket[i], bucket[j]])
+
+    # combos of three (2's and 3's only)
+    for bucket in buckets:
+        size = len(bucket)
+        if size > 2 and bucket[0].rank <= 3:
+            for i in range(size - 2):
+                for j in range(i + 1, size - 1):
+                    for k in range(j + 1, size):
+                        legal_plays.append([bucket[i], bucket[j], bucket[k]])
+
+    # combo of four (only possible with four 2's)
+    if len(buckets[0]) == 4 and buckets[0][0].rank == 2:
+        legal_plays.append(buckets[0][:])
+
+    # return an extra 'None' type is for yielding
+    if can_yield:
+        legal_plays.append(None)
+
+    return legal_plays
+
+# rebuilds a board from RegicideBoard.toDict()
+def boardFromDict(data):
+    try:
+        board = RegicideBoard()
+        for player_data in data["players"]:
+            player = RegicidePlayer(player_data["name"])
+            player.hand = CardSet(mask=player_data["hand"])
+            player.played = CardSet(mask=player_data["played"])
+            board.players.append(player)
+
+        board.discard.cards = CardPile(CARDS[index] for index in data["discard"])
+        board.tavern.cards = CardPile(CARDS[index] for index in data["tavern"])
+        board.tavern.boss = CardPile(CARDS[index] for index in data["tavern_boss"])
+        board.castle.cards = CardPile(Boss(CARDS[index].rank, CARDS[index].suit) for index in data["castle"])
+
+        if data["boss"]:
+            card = CARDS[data["boss"]["card"]]
+            board.castle.boss = Boss(card.rank, card.suit)
+            board.castle.boss.health = data["boss"]["health"]
+            board.castle.boss.attack = data["boss"]["attack"]
+
+        board.powers = list(data["powers"])
+        board.hand_size = data["hand_size"]
+        board.consecutive_yields = data["consecutive_yields"]
+    except (KeyError, IndexError, TypeError, ValueError) as error:
+        raise Exception("Invalid board data! (" + repr(error) + ")")
+
+    if len(board.players) not in [2, 3, 4]:
+        raise Exception("Invalid amount of players! (2-4)")
+
+    # NOTE - set once the players are in place - the current player and result depend on them
+    board.setActions([RegicideAction(marker, [CARDS[index] for index in cards] if cards else None, boss_defeated, player_died)
+                      for marker, cards, boss_defeated, player_died in data["actions"]])
+
+    return board
+
 # testing functions
 def board():
     board = RegicideBoard()
@@ -479,6 +719,14 @@ def board():
     legal_plays = board.legalPlays(test_hand)
     assert len(legal_plays) == 15, "Given test hand should have 16 legal moves!"
 
+    # test the legal plays cache - the caller's hand isn't touched and the same hand in any order is one cache entry
+    unsorted_hand = test_hand[:]
+    hits = legal_plays_cache.hits
+    assert board.legalPlays(list(reversed(test_hand))) is legal_plays, "Same hand in a different order should be a cache hit!"
+    assert legal_plays_cache.hits == hits + 1, "Cache hit wasn't counted!"
+    assert test_hand == unsorted_hand, "legalPlays() shouldn't change the caller's hand!"
+    assert isinstance(legal_plays, tuple) and isinstance(legal_plays[0], tuple), "Cached legal plays should be immutable!"
+
     test_index = int(input("What test do you want to do? (0 - Game) (1 - CLone & Randomize): "))
 
     # Test the board starting up and taking two turns
@@ -523,6 +771,145 @@ def board():
     # print("")
     # print(board.players[board.currentPlayer()].name + "'s Turn: ...")
 
+# testing function - clone() has to give an independent copy and be faster than deepcopy()
+def boardClone():
+    board = RegicideBoard()
+    board.start(3)
+    for turn in range(6):
+        legal_plays = board.legalPlays(board.players[board.currentPlayer()].hand)
+        board.nextState(legal_plays[0], True)
+        if board.winner() in [Result.WIN, Result.LOSS]:
+            break
+
+    clone = board.clone()
+    assert clone.players[0].hand == board.players[0].hand, "Clone should have the same hands!"
+    assert clone.tavern.cards == board.tavern.cards, "Clone should have the same tavern deck!"
+    assert len(clone.actions) == len(board.actions), "Clone should have the same action history!"
+    assert clone.history is board.history, "Clones should share the action history instead of copying it!"
+
+    hand_mask = board.players[0].hand.mask
+    clone.players[0].hand.clear()
+    clone.tavern.cards.pop()
+    clone.castle.boss.health -= 1
+    assert board.players[0].hand.mask == hand_mask, "Changing the clone's hand shouldn't change the board!"
+    assert len(board.tavern.cards) == len(clone.tavern.cards) + 1, "Changing the clone's tavern shouldn't change the board!"
+    assert board.castle.boss.health == clone.castle.boss.health + 1, "Damaging the clone's boss shouldn't change the board!"
+
+    # REFERENCE - https://docs.python.org/3/library/timeit.html
+    import timeit
+    runs = 2000
+    deepcopy_time = timeit.timeit(lambda: deepcopy(board), number=runs) / runs
+    clone_time = timeit.timeit(lambda: board.clone(), number=runs) / runs
+    print("deepcopy(): {:.2f}us | clone(): {:.2f}us | {:.1f}x faster".format(deepcopy_time * 1e6, clone_time * 1e6, deepcopy_time / clone_time))
+    assert clone_time < deepcopy_time, "clone() should be faster than deepcopy()!"
+
+# testing function - every nextState() and randomize() has to be undone exactly
+def boardUndo():
+    # snapshot of everything nextState() can change
+    def signature(board):
+        return ([(player.hand.mask, player.played.mask) for player in board.players],
+                board.discard.cards.cards[:], board.tavern.cards.cards[:], board.tavern.boss.cards[:],
+                [(card.rank, card.suit) for card in board.castle.cards],
+                (board.castle.boss.rank, board.castle.boss.suit, board.castle.boss.health, board.castle.boss.attack) if board.castle.boss else None,
+                board.consecutive_yields, board.turnCount(), board.last_action, board.currentPlayer(), board.winner(), board.history)
+
+    for game in range(50):
+        random.seed(game)
+        board = RegicideBoard()
+        board.start(2 + game % 3)
+
+        while board.winner() not in [Result.WIN, Result.LOSS]:
+            legal_plays = board.legalPlays(board.players[board.currentPlayer()].hand)
+            if len(legal_plays) == 0:
+                break
+
+            before = signature(board)
+            for move in legal_plays:
+                record = board.nextState(move, True, undo=True)
+                board.undo(record)
+                assert signature(board) == before, "undo() didn't revert nextState()!"
+
+            record = board.randomize(None, True)
+            board.undo(record)
+            assert signature(board) == before, "undo() didn't revert randomize()!"
+
+            board.nextState(random.choice(legal_plays), True)
+
+            # the fields nextState() keeps have to match working them out from the whole history
+            actions = board.actions
+            assert board.currentPlayer() == nextPlayer(actions[-1], len(board.players)), "Current player is out of date!"
+            assert board.winner() == board.calculateWinner(actions[-1]), "Result is out of date!"
+            assert board.turnCount() == len(actions) and board.last_action is actions[-1], "History is out of date!"
+
+# testing function - a board sent through toDict() / JSON / boardFromDict() has to play out exactly like the original
+def boardSerialize():
+    import json
+
+    for game in range(20):
+        random.seed(game)
+        board = RegicideBoard()
+        board.start(2 + game % 3)
+
+        while board.winner() not in [Result.WIN, Result.LOSS]:
+            legal_plays = board.legalPlays(board.players[board.currentPlayer()].hand)
+            if len(legal_plays) == 0:
+                break
+
+            copy = boardFromDict(json.loads(json.dumps(board.toDict())))
+            assert copy.toDict() == board.toDict(), "Board didn't survive a round trip!"
+            assert publicHash(copy) == publicHash(board), "Copy's piles should hash the same!"
+            assert copy.currentPlayer() == board.currentPlayer() and copy.winner() == board.winner(), "Copy should be on the same turn!"
+
+            move = random.choice(legal_plays)
+            state = random.getstate()
+            board.nextState(move, True)
+            random.setstate(state)
+            copy.nextState(move, True)
+            assert copy.toDict() == board.toDict(), "Copy played the move differently!"
+
+    try:
+        boardFromDict({"players": []})
+        assert False, "Incomplete board data should be rejected!"
+    except Exception as error:
+        assert "Invalid board data" in str(error), "Incomplete board data should raise a board error!"
+
+# testing function - the incremental hash has to match a full hash after every move and undo
+def boardHash():
+    for game in range(30):
+        random.seed(game)
+        board = RegicideBoard()
+        board.start(2 + game % 3)
+        board.enableHashing()
+
+        while board.winner() not in [Result.WIN, Result.LOSS]:
+            legal_plays = board.legalPlays(board.players[board.currentPlayer()].hand)
+            if len(legal_plays) == 0:
+                break
+
+            before = board.zobrist
+            record = board.nextState(random.choice(legal_plays), True, undo=True)
+            assert board.zobrist == publicHash(board), "Incremental hash doesn't match the full hash!"
+            board.undo(record)
+            assert board.zobrist == before == publicHash(board), "undo() didn't restore the hash!"
+
+            board.nextState(random.choice(legal_plays), True)
+            assert board.zobrist == publicHash(board), "Incremental hash doesn't match the full hash!"
+
+    # determinizing the hidden cards keeps the information set of the seat it was done for
+    random.seed(0)
+    board = RegicideBoard()
+    board.start(3)
+    board.enableHashing()
+    other = board.clone()
+    assert board.infoSetHash(0) == other.infoSetHash(0), "Clones should hash the same!"
+    other.randomize(0)
+    assert board.infoSetHash(0) == other.infoSetHash(0), "Hidden cards shouldn't change seat 0's hash!"
+    assert board.infoSetHash(0) != board.infoSetHash(1), "Different seats should hash differently!"
+
 if __name__ == "__main__":
+    boardSerialize()
+    boardHash()
+    boardUndo()
+    boardClone()
     board()
     print("Everything Passed!")
\ No newline at end of file
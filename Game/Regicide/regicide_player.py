@@ -1,22 +1,32 @@
-# External Imports
-import random
-
 # Internal Imports
 from Cards.Base.card import Card
+from Cards.Base.card_set import CardSet
+from Cards.Base.card_set import cardsOf
 from Game.Base.player import Player
+from Game.Regicide.discard_solver import solveDiscard
 
 class RegicidePlayer(Player):
     def __init__(self, name):
         super().__init__(name)
-        # NOTE - recently played cards are stored in a temporary list before being added to the discard pile all at once when a boss is defeated
-        self.played = []
+        # NOTE - hands and played cards are bitmask CardSets - order doesn't matter and membership checks are a single AND
+        self.hand = CardSet()
+        # NOTE - recently played cards are stored in a temporary set before being added to the discard pile all at once when a boss is defeated
+        self.played = CardSet()
+
+    def setHand(self, hand):
+        self.hand = CardSet(hand)
+
+    # copies only the mutable card sets - name is shared
+    def clone(self):
+        player = RegicidePlayer.__new__(RegicidePlayer)
+        player.name = self.name
+        player.hand = self.hand.copy()
+        player.played = self.played.copy()
+        return player
 
     # takes players and returns an integer of their total 'health' based of the sum of the ranks of cards in their hand
     def calculateHealth(self):
-        health = 0
-        for card in self.hand:
-            health += card.rank
-        return health
+        return self.hand.health()
 
     # checks to see if card to be played is in the player's hand
     def setCardToPlayed(self, card):
@@ -24,10 +34,11 @@ class RegicidePlayer(Player):
             raise Exception("Card to be played is not in " + self.name + "'s hand!")
 
         self.hand.remove(card)
-        self.played.append(card)
+        self.played.add(card)
 
     # takes player state and total damage to be taken and returns either a false boolean value or list of cards used to defend player
-    def takeDamage(self, damage, ai=False):
+    # NOTE - defence is optional - the cards to discard (in order) instead of asking the player or solving for them (used to replay games)
+    def takeDamage(self, damage, ai=False, defence=None):
         if damage < 0:
             raise Exception("Damage taken by player cannot be negative!")
 
@@ -35,6 +46,16 @@ class RegicidePlayer(Player):
             discarded = []
             return discarded
 
+        # NOTE - the cheapest discard that blocks the damage (overshoot, diamonds, aces and combos lost) - see discard_solver.py
+        #  the solver checks if the player dies as well (None) so the hand's health isn't counted twice
+        if ai and defence is None:
+            discard = solveDiscard(self.hand.mask, damage)
+            if discard is None:
+                return False
+
+            self.hand.mask &= ~discard
+            return cardsOf(discard)
+
         if not ai:
             print(self.name + " is taking", damage, "damage!")
 
@@ -43,6 +64,13 @@ class RegicidePlayer(Player):
                 print(self.name, "died!")
             return False
 
+        if defence is not None:
+            if sum(card.rank for card in defence) < damage:
+                raise Exception("Defence doesn't cover the damage taken!")
+            for card in defence:
+                self.hand.remove(card)
+            return list(defence)
+
         defence = 0
         discarded = []
 
@@ -68,37 +96,6 @@ class RegicidePlayer(Player):
                 print(self.name, "died!")
                 return False
 
-            return discarded
-        else:
-
-            while defence < damage and len(self.hand) > 0:
-
-                if len(self.hand) == 0:
-                    # print(self.name, "died!")
-                    return False
-
-                # TODO - AI currently just selects a random card in it's hand - prioritise not disposing diamonds or face cards
-                non_diamond = [card for card in self.hand if card.suit != "D"]
-                face_ranks = ["J", "K", "Q"]
-                non_face = [card for card in self.hand if card.rank not in face_ranks]
-
-                selection = self.hand
-
-                if len(non_diamond) != 0 and len(non_face) != 0:
-                    selection = [card for card in self.hand if card in non_diamond and card in non_face]
-
-                    # NOTE - if the hand only contains diamonds and face cards - save diamonds
-                    if len(selection) == 0:
-                        selection = non_diamond
-
-                index = random.randint(0, len(selection) - 1)
-
-                card = selection[index]
-                self.hand.remove(card)
-                discarded.append(card)
-                defence += card.rank
-
-
             return discarded
 
 # input validation
@@ -128,6 +125,11 @@ def player():
     player.setHand(test_hand)
     assert len(player.hand) == 5, "Player hand expected to be set to 5!"
 
+    # test forcing which cards are used to defend (used when replaying games)
+    defence = [Card(10, "D"), Card(1, "S")]
+    assert player.takeDamage(11, True, defence) == defence and len(player.hand) == 3, "Forced defence should be discarded!"
+    player.setHand(test_hand)
+
     # test to see if the player takes damage correctly
     test_discard = player.takeDamage(1)
     assert len(test_discard) == 1, "Player should have only discarded one card!"
@@ -0,0 +1,258 @@
+# REFERENCE - https://docs.python.org/3/library/struct.html
+# REFERENCE - https://docs.python.org/3/library/random.html#random.getstate
+
+# External Imports
+import random
+import struct
+
+# Internal Imports
+from Cards.Base.card_set import CARDS
+from Cards.Base.card_set import maskOf
+from Cards.Base.card_set import cardsOf
+from Game.Regicide.regicide_board import RegicideBoard
+from Game.Regicide.regicide_board import Result
+
+# Compact binary game records - a whole game is the seed of the deal, the player count and a packed stream of moves
+# any position can be rebuilt by dealing from the seed and replaying the moves through nextState()
+# NOTE - the deal isn't the only randomness in a game - hearts shuffle the discard pile, so every move is played with its
+#  own 32 bit seed (GameRecord.play()) and the record keeps the seed if the discard pile was shuffled. the defence cards are
+#  kept too - human defence can't be repeated and AI defence depends on the discard solver's weights
+
+# file layout - RECORD_MAGIC + version byte, then one game after another
+#  game: GAME_HEADER (seed, players, result, moves, payload bytes) + payload
+#  move: MOVE word + SEED (only if the move shuffled the discard pile) + one byte per defence card (Card.index) in discard order
+#  word: bits 0-51 play mask (0 = yield) | 52-53 seat | 54 boss defeated | 55 player died | 56-59 defence cards | 60 shuffled
+RECORD_MAGIC = b"RGRC"
+RECORD_VERSION = 1
+GAME_HEADER = struct.Struct("<QBBHI")
+MOVE = struct.Struct("<Q")
+SEED = struct.Struct("<I")
+
+SEAT_SHIFT = 52
+BOSS_DEFEATED_BIT = 1 << 54
+PLAYER_DIED_BIT = 1 << 55
+DEFENCE_SHIFT = 56
+SHUFFLED_BIT = 1 << 60
+PLAY_MASK = (1 << 52) - 1
+
+# one recorded game - either being recorded (play()) or read back from a file (readRecords())
+class GameRecord:
+    def __init__(self, seed, num_players, result=Result.ALIVE, move_count=0, payload=None):
+        if num_players not in [2, 3, 4]:
+            raise Exception("Invalid amount of players! (2-4)")
+
+        self.seed = seed
+        self.num_players = num_players
+        self.result = result
+        self.move_count = move_count
+        self.payload = bytearray(payload) if payload else bytearray()
+
+    # the board the game starts from - same deal as ISMCTS/runner.py createBoard()
+    # NOTE - seeds the global generator like createBoard() does
+    def deal(self):
+        random.seed(self.seed)
+        board = RegicideBoard()
+        board.start(self.num_players)
+        return board
+
+    # plays a move on the real board and records it - used instead of board.nextState(play, ai, final)
+    # NOTE - the move draws its randomness from its own seed so replay() can repeat it - the game's stream only loses 32 bits per move
+    def play(self, board, play, ai=True, final=False):
+        move_seed = random.getrandbits(32)
+
+        caller_state = random.getstate()
+        random.seed(move_seed)
+        try:
+            undo_record = board.nextState(play, ai, final, undo=True)
+        finally:
+            random.setstate(caller_state)
+
+        action = board.last_action
+
+        # NOTE - defence is appended to the discard pile after the heart suit power has taken its cards
+        defence = []
+        if not action.boss_defeated and not action.player_died:
+            defence = board.discard.cards[undo_record.discard_len - undo_record.tavern_prepended:]
+
+        # NOTE - the seed is only needed to repeat a heart shuffle - everything else a move does is decided by the record
+        if undo_record.discard_order is None:
+            move_seed = None
+
+        self.addMove(action.marker, action.cards, action.boss_defeated, action.player_died, move_seed, defence)
+
+        result = board.winner()
+        if result == Result.WIN or result == Result.LOSS:
+            self.result = result
+
+        return board
+
+    # NOTE - move_seed is None if the move didn't use any randomness
+    def addMove(self, seat, cards, boss_defeated, player_died, move_seed, defence):
+        if len(defence) > 15:
+            raise Exception("Too many defence cards to record!")
+
+        word = maskOf(cards) | seat << SEAT_SHIFT | len(defence) << DEFENCE_SHIFT
+        if boss_defeated:
+            word |= BOSS_DEFEATED_BIT
+        if player_died:
+            word |= PLAYER_DIED_BIT
+        if move_seed is not None:
+            word |= SHUFFLED_BIT
+
+        self.payload += MOVE.pack(word)
+        if move_seed is not None:
+            self.payload += SEED.pack(move_seed)
+        self.payload += bytes(card.index for card in defence)
+        self.move_count += 1
+
+    # decodes the moves - (seat, cards, boss defeated, player died, move seed, defence) - cards is None for yielding
+    # NOTE - move seed is None for moves that didn't use any randomness
+    def moves(self):
+        payload = self.payload
+        offset = 0
+        for move in range(self.move_count):
+            word, = MOVE.unpack_from(payload, offset)
+            offset += MOVE.size
+
+            move_seed = None
+            if word & SHUFFLED_BIT:
+                move_seed, = SEED.unpack_from(payload, offset)
+                offset += SEED.size
+
+            count = word >> DEFENCE_SHIFT & 0b1111
+            defence = [CARDS[index] for index in payload[offset:offset + count]]
+            offset += count
+
+            mask = word & PLAY_MASK
+            yield (word >> SEAT_SHIFT & 0b11, cardsOf(mask) if mask else None,
+                   word & BOSS_DEFEATED_BIT != 0, word & PLAYER_DIED_BIT != 0, move_seed, defence)
+
+    # rebuilds the board after the first turns moves (every move if turns is None)
+    # NOTE - the caller's random stream is put back afterwards
+    def replay(self, turns=None):
+        caller_state = random.getstate()
+        try:
+            board = self.deal()
+            for turn, (seat, cards, boss_defeated, player_died, move_seed, defence) in enumerate(self.moves()):
+                if turns is not None and turn >= turns:
+                    break
+
+                if board.currentPlayer() != seat:
+                    raise Exception("Record doesn't match the replay! (turn " + str(turn) + ")")
+
+                if move_seed is not None:
+                    random.seed(move_seed)
+                board.nextState(cards, True, defence=defence)
+
+                action = board.last_action
+                if action.boss_defeated != boss_defeated or action.player_died != player_died:
+                    raise Exception("Record doesn't match the replay! (turn " + str(turn) + ")")
+        finally:
+            random.setstate(caller_state)
+
+        return board
+
+    def toBytes(self):
+        return GAME_HEADER.pack(self.seed, self.num_players, self.result.value, self.move_count, len(self.payload)) + bytes(self.payload)
+
+# appends games to a record file - the file header is written when it's opened
+class RecordWriter:
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.file.write(RECORD_MAGIC + bytes([RECORD_VERSION]))
+        self.games = 0
+
+    def write(self, record):
+        self.file.write(record.toBytes())
+        self.games += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+# streams the games of a record file - moves are only decoded when moves() or replay() is called
+def readRecords(path):
+    with open(path, "rb") as file:
+        header = file.read(len(RECORD_MAGIC) + 1)
+        if header[:len(RECORD_MAGIC)] != RECORD_MAGIC:
+            raise Exception("Not a Regicide record file!")
+        if header[-1] != RECORD_VERSION:
+            raise Exception("Unsupported record version: " + str(header[-1]))
+
+        while True:
+            game_header = file.read(GAME_HEADER.size)
+            if not game_header:
+                return
+            if len(game_header) < GAME_HEADER.size:
+                raise Exception("Record file ends in the middle of a game!")
+
+            seed, num_players, result, move_count, length = GAME_HEADER.unpack(game_header)
+            payload = file.read(length)
+            if len(payload) < length:
+                raise Exception("Record file ends in the middle of a game!")
+
+            yield GameRecord(seed, num_players, Result(result), move_count, payload)
+
+# testing function - every position of a recorded game has to come back exactly from its record
+def gameRecord():
+    import os
+    import tempfile
+    import time
+
+    records = []
+    positions = []
+    for game in range(30):
+        record = GameRecord(game, 2 + game % 3)
+        board = record.deal()
+        snapshots = [board.toDict()]
+
+        # NOTE - the game's own stream picks the moves (like a search would) - only play() touches the move seeds
+        rng = random.Random(game)
+        while board.winner() not in [Result.WIN, Result.LOSS]:
+            legal_plays = board.legalPlays(board.players[board.currentPlayer()].hand)
+            if len(legal_plays) == 0:
+                break
+            record.play(board, rng.choice(legal_plays))
+            snapshots.append(board.toDict())
+
+        records.append(record)
+        positions.append(snapshots)
+
+    path = os.path.join(tempfile.mkdtemp(), "games.rgr")
+    with RecordWriter(path) as writer:
+        for record in records:
+            writer.write(record)
+
+    moves = sum(record.move_count for record in records)
+    size = os.path.getsize(path)
+
+    start_time = time.perf_counter()
+    loaded = list(readRecords(path))
+    read_time = time.perf_counter() - start_time
+
+    assert len(loaded) == len(records), "Every game should be read back!"
+    for record, snapshots in zip(loaded, positions):
+        assert record.move_count == len(snapshots) - 1, "Move count doesn't match!"
+        assert record.replay().toDict() == snapshots[-1], "Replayed game doesn't end in the same position!"
+        for turn in range(0, len(snapshots), 7):
+            assert record.replay(turn).toDict() == snapshots[turn], "Replayed position doesn't match turn " + str(turn) + "!"
+
+    assert loaded[0].result == records[0].result, "Result should be kept!"
+
+    caller_state = random.getstate()
+    loaded[0].replay()
+    assert random.getstate() == caller_state, "replay() shouldn't change the caller's random stream!"
+
+    print("Games: {} | Moves: {} | Bytes: {} ({:.1f} per move) | Read: {:.0f} games/s".format(
+        len(records), moves, size, size / moves, len(records) / read_time))
+
+    os.remove(path)
+
+if __name__ == "__main__":
+    gameRecord()
+    print("Everything Passed!")
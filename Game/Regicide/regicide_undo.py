@@ -0,0 +1,36 @@
+# REFERENCE - https://www.chessprogramming.org/Unmake_Move
+
+# Undo record for a single RegicideBoard.nextState() (or randomize()) call - passed back into RegicideBoard.undo()
+# NOTE - hands are stored as masks so snapshotting every player is a handful of integers
+#  everything else only records what actually moved:
+#  cards prepended to/drawn from the tavern, how long the discard pile was and the discard order before a heart shuffle
+class RegicideUndo:
+    # NOTE - one record is made per rollout step so the attributes are fixed to keep it small and quick to build
+    __slots__ = ("hands", "played", "consecutive_yields", "boss", "boss_attack", "boss_health", "action", "castle_card",
+                 "discard_len", "discard_order", "tavern_prepended", "tavern_drawn", "tavern_boss_added",
+                 "tavern_cards", "castle_cards", "zobrist", "current_player", "status")
+
+    def __init__(self, board):
+        self.hands = [player.hand.mask for player in board.players]
+        self.played = [player.played.mask for player in board.players]
+        self.consecutive_yields = board.consecutive_yields
+        self.zobrist = board.zobrist
+        self.current_player = board.current_player
+        self.status = board.status
+
+        # boss in play - attack and health are the only values a play changes
+        self.boss = board.castle.boss
+        self.boss_attack = self.boss.attack if self.boss else 0
+        self.boss_health = self.boss.health if self.boss else 0
+
+        self.action = False # True once an action has been appended to board.actions
+        self.castle_card = None # card popped from the castle when the next boss was drawn
+        self.discard_len = len(board.discard.cards)
+        self.discard_order = None # copy of the discard pile before the heart suit power shuffled it
+        self.tavern_prepended = 0 # number of cards the heart suit power put at the bottom of the tavern
+        self.tavern_drawn = None # (card, drawn from the tavern boss pile) for every diamond draw
+        self.tavern_boss_added = False # perfect hit put the boss on top of the tavern
+
+        # NOTE - only set by randomize() - the determinized piles replace the originals so the originals are kept whole
+        self.tavern_cards = None
+        self.castle_cards = None
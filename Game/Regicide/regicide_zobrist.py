@@ -0,0 +1,100 @@
+# REFERENCE - https://www.chessprogramming.org/Zobrist_Hashing
+# REFERENCE - https://www.chessprogramming.org/Transposition_Table
+
+# External Imports
+import random
+
+# Zobrist keys for the parts of a Regicide board a seat can observe -
+# own hand, cards in play, discard pile, tavern-top bosses, castle contents, boss in play (health/attack) and yield count
+# NOTE - the keys come from their own seeded generator so hashes are the same every run and the game's RNG isn't touched
+_generator = random.Random(0x5EED)
+
+def _keys(count):
+    return [_generator.getrandbits(64) for key in range(count)]
+
+# one key per card (see Card.index) for every set of cards that is hashed
+HAND, PLAYED, DISCARD, TAVERN_BOSS, CASTLE = range(5)
+CARD_KEYS = [_keys(52) for part in range(5)]
+
+BOSS_KEYS = _keys(52)
+BOSS_HEALTH_KEYS = _keys(40 + 1)
+BOSS_ATTACK_KEYS = _keys(20 + 1)
+YIELD_KEYS = _keys(4)
+SEAT_KEYS = _keys(4)
+HAND_SIZE_KEYS = [_keys(52 + 1) for seat in range(4)]
+
+# NOTE - a mask is hashed a byte at a time - every table entry is the XOR of the card keys of the bits in that byte,
+#  so hashing a mask is 7 lookups instead of one per card and XOR-ing the masks of two sets gives the hash of what changed
+def _byteTables(card_keys):
+    tables = []
+    for chunk in range(7):
+        table = [0] * 256
+        for byte in range(256):
+            key = 0
+            for bit in range(8):
+                index = chunk * 8 + bit
+                if byte >> bit & 1 and index < 52:
+                    key ^= card_keys[index]
+            table[byte] = key
+        tables.append(table)
+    return tables
+
+MASK_TABLES = [_byteTables(card_keys) for card_keys in CARD_KEYS]
+
+def maskKey(part, mask):
+    tables = MASK_TABLES[part]
+    key = 0
+    chunk = 0
+    while mask:
+        key ^= tables[chunk][mask & 0xFF]
+        mask >>= 8
+        chunk += 1
+    return key
+
+# (discard, played, tavern boss, castle, boss index, boss health, boss attack, yields) - everything publicHash() reads
+def publicParts(board):
+    played = 0
+    for player in board.players:
+        played |= player.played.mask
+
+    boss = board.castle.boss
+    if boss:
+        boss_parts = (boss.index, boss.health, boss.attack)
+    else:
+        boss_parts = (-1, 0, 0)
+
+    return (board.discard.cards.mask, played, board.tavern.boss.mask, board.castle.cards.mask) + boss_parts + (board.consecutive_yields,)
+
+def bossKey(index, health, attack):
+    if index < 0:
+        return 0
+    return BOSS_KEYS[index] ^ BOSS_HEALTH_KEYS[health] ^ BOSS_ATTACK_KEYS[attack]
+
+# full hash of the public parts of a board
+def publicHash(board):
+    discard, played, tavern_boss, castle, boss, health, attack, yields = publicParts(board)
+    return (maskKey(DISCARD, discard) ^ maskKey(PLAYED, played) ^ maskKey(TAVERN_BOSS, tavern_boss) ^
+            maskKey(CASTLE, castle) ^ bossKey(boss, health, attack) ^ YIELD_KEYS[min(yields, 3)])
+
+# incremental update - only the keys of what changed between the old and new parts are XOR-ed in
+def updateHash(key, old, new):
+    if old[0] != new[0]:
+        key ^= maskKey(DISCARD, old[0] ^ new[0])
+    if old[1] != new[1]:
+        key ^= maskKey(PLAYED, old[1] ^ new[1])
+    if old[2] != new[2]:
+        key ^= maskKey(TAVERN_BOSS, old[2] ^ new[2])
+    if old[3] != new[3]:
+        key ^= maskKey(CASTLE, old[3] ^ new[3])
+    if old[4:7] != new[4:7]:
+        key ^= bossKey(*old[4:7]) ^ bossKey(*new[4:7])
+    if old[7] != new[7]:
+        key ^= YIELD_KEYS[min(old[7], 3)] ^ YIELD_KEYS[min(new[7], 3)]
+    return key
+
+# hash of the information set of seat - the public hash plus the seat's own hand and every hand size
+def infoSetKey(public_key, board, seat):
+    key = public_key ^ maskKey(HAND, board.players[seat].hand.mask) ^ SEAT_KEYS[seat]
+    for other, player in enumerate(board.players):
+        key ^= HAND_SIZE_KEYS[other][len(player.hand)]
+    return key
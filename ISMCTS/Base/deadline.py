@@ -0,0 +1,70 @@
+# REFERENCE - https://docs.python.org/3/library/time.html#time.perf_counter
+# REFERENCE - https://www.chessprogramming.org/Time_Management
+
+# External Imports
+import time
+from math import inf
+
+# CONFIG - how far past the deadline a search may run (s) - the clock is read just often enough to stay inside it
+DEADLINE_SLACK = 0.002
+
+# CONFIG - iterations timed one by one at the start of every search before the check interval is stretched
+CALIBRATION_ITERATIONS = 4
+
+# Deadline scheduler for the search loop - replaces reading the Timer on every iteration
+# the time per iteration is calibrated from the current search and the clock is only read every N iterations,
+# where N iterations take about as long as the slack - so a search never runs more than the slack over max_time
+# NOTE - an iteration that probably wouldn't finish before the deadline isn't started, so with a steady
+#  iteration time the search stops before max_time and the best root child so far is played
+class DeadlineScheduler:
+    def __init__(self, max_time, slack=DEADLINE_SLACK):
+        if max_time < 0:
+            raise Exception("Search deadline can't be negative!")
+
+        self.max_time = max_time
+        self.slack = slack
+        self.start_time = time.perf_counter()
+        self.next_check = 0 # iteration count the clock is next read at
+        self.iteration_time = 0.0 # calibrated seconds per iteration
+        self.checks = 0 # how many times the clock was read
+        self.elapsed = 0.0
+
+        # NOTE - without a time limit the clock never needs reading
+        if max_time == inf:
+            self.next_check = inf
+
+    # True once the search should stop - iterations is the number of iterations completed so far
+    def expired(self, iterations):
+        if iterations < self.next_check:
+            return False
+
+        self.checks += 1
+        self.elapsed = time.perf_counter() - self.start_time
+
+        if self.elapsed >= self.max_time:
+            return True
+
+        # NOTE - the first iterations are timed one at a time (fresh trees are slower to grow than later on)
+        if iterations < CALIBRATION_ITERATIONS:
+            if iterations > 0:
+                self.iteration_time = self.elapsed / iterations
+            self.next_check = iterations + 1
+            return False
+
+        self.iteration_time = self.elapsed / iterations
+        remaining = self.max_time - self.elapsed
+
+        # don't start an iteration that would most likely finish after the deadline
+        if self.iteration_time > remaining:
+            return True
+
+        # read the clock again once the slack (or what's left of the budget) has probably been used up
+        step = int(min(self.slack, remaining) / self.iteration_time) if self.iteration_time > 0 else 1
+        self.next_check = iterations + max(1, step)
+
+        return False
+
+    # elapsed time since the scheduler was created - reads the clock
+    def stop(self):
+        self.elapsed = time.perf_counter() - self.start_time
+        return self.elapsed
@@ -43,4 +43,13 @@ class Node:
         pass
 
     def resetNode(self):
+        pass
+
+    def findChild(self, action):
+        pass
+
+    def reRoot(self, state):
+        pass
+
+    def release(self):
         pass
\ No newline at end of file
@@ -0,0 +1,80 @@
+# REFERENCE - https://docs.python.org/3/library/time.html#time.perf_counter
+
+# Per-decision search statistics - time and call counts for every phase of an iteration plus the shape of the tree
+# NOTE - only counters are kept (no per-call logging) so it's cheap enough to always be on -
+#  the tree is only walked once per decision in finish()
+class SearchStats:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.selection_time = 0.0
+        self.selection_calls = 0
+        self.expansion_time = 0.0
+        self.expansion_calls = 0
+        self.determinization_time = 0.0
+        self.determinization_calls = 0
+        self.rollout_time = 0.0
+        self.rollout_calls = 0
+        self.rollout_moves = 0 # moves played over every rollout - used for the mean rollout length
+        self.rollout_cutoffs = 0 # rollouts cut off and scored by the static evaluation
+        self.backprop_time = 0.0
+        self.backprop_calls = 0
+        self.moves_generated = 0 # legal moves put in node move lists - all of them or one at a time with progressive widening
+        self.moves_expanded = 0 # moves that became a branch
+
+        self.run_count = 0
+        self.dud_runs = 0
+        self.elapsed = 0.0
+        self.clock_checks = 0 # times the deadline scheduler read the clock
+        self.tree_size = 0
+        self.max_depth = 0
+        self.root_visits = [] # (action, visits, mean ranking) of every root child
+
+    def meanRolloutLength(self):
+        if self.rollout_calls == 0:
+            return 0.0
+        return self.rollout_moves / self.rollout_calls
+
+    # walks the tree once the search is done - tree size, depth and the visit distribution of the root
+    def finish(self, root_node, run_count, dud_runs, elapsed):
+        self.run_count = run_count
+        self.dud_runs = dud_runs
+        self.elapsed = elapsed
+
+        self.tree_size = 0
+        self.max_depth = 0
+        stack = [root_node]
+        while stack:
+            node = stack.pop()
+            self.tree_size += 1
+            self.max_depth = max(self.max_depth, node.depth - root_node.depth)
+            stack += node.branches
+
+        self.root_visits = [(child.getGameAction(), child.visits, child.ranking / child.visits) for child in root_node.branches]
+
+    def summary(self):
+        return ("Selection: {:.4f}s | Expansion: {:.4f}s | Determinization: {:.4f}s | Rollout: {:.4f}s | Backprop: {:.4f}s\n"
+                "Tree Size: {} | Max Depth: {} | Mean Rollout Length: {:.2f} | Rollout Cutoffs: {} | Moves Generated: {} | Moves Expanded: {}").format(
+            self.selection_time, self.expansion_time, self.determinization_time, self.rollout_time, self.backprop_time,
+            self.tree_size, self.max_depth, self.meanRolloutLength(), self.rollout_cutoffs, self.moves_generated, self.moves_expanded)
+
+    def toDict(self):
+        return {
+            "run_count": self.run_count,
+            "dud_runs": self.dud_runs,
+            "elapsed": self.elapsed,
+            "clock_checks": self.clock_checks,
+            "selection": {"time": self.selection_time, "calls": self.selection_calls},
+            "expansion": {"time": self.expansion_time, "calls": self.expansion_calls},
+            "determinization": {"time": self.determinization_time, "calls": self.determinization_calls},
+            "rollout": {"time": self.rollout_time, "calls": self.rollout_calls},
+            "backprop": {"time": self.backprop_time, "calls": self.backprop_calls},
+            "tree_size": self.tree_size,
+            "max_depth": self.max_depth,
+            "mean_rollout_length": self.meanRolloutLength(),
+            "rollout_cutoffs": self.rollout_cutoffs,
+            "moves_generated": self.moves_generated,
+            "moves_expanded": self.moves_expanded,
+            "root_visits": [{"action": repr(action), "visits": visits, "mean": mean} for action, visits, mean in self.root_visits]
+        }
@@ -19,14 +19,17 @@ class Timer:
 
         self._start_time = time.perf_counter()
 
-    def stop(self):
+    def stop(self, verbose=True):
         """Stop the timer, and report the elapsed time"""
         if self._start_time is None:
             raise TimerError(f"Timer is not running. Use .start() to start it")
 
         elapsed_time = time.perf_counter() - self._start_time
         self._start_time = None
-        print(f"Elapsed time: {elapsed_time:0.4f} seconds")
+        if verbose:
+            print(f"Elapsed time: {elapsed_time:0.4f} seconds")
+
+        return elapsed_time
 
     def check(self): # Return the currently elapsed time...
         """Stop the timer, and report the elapsed time"""
@@ -0,0 +1,282 @@
+# REFERENCE - https://numpy.org/doc/stable/user/basics.indexing.html
+# REFERENCE - https://docs.python.org/3/library/array.html
+# REFERENCE - https://github.com/melvinzhang/ismcts/blob/master/ISMCTS.py
+
+# External Imports
+import random
+from array import array
+from math import sqrt
+from math import log
+from math import inf
+
+try:
+    import numpy as np
+except ImportError: # NOTE - NumPy is optional - without it the columns are standard library arrays and UCT is a plain loop
+    np = None
+
+# Internal Imports
+from Cards.Base.card_set import maskOf
+from Cards.Base.card_set import cardsOf
+from Game.Regicide.regicide_board import Result
+from Game.Regicide.legal_plays_cache import LegalPlaysCache
+from ISMCTS.Game.regicide_node import RegicideNode
+from ISMCTS.Game.regicide_node import playout
+from ISMCTS.Game.regicide_node import calculateRewards
+
+# move id of yielding (None) - card masks only use the low 52 bits so this can never clash with a real play
+YIELD_MOVE = 1 << 52
+
+# CONFIG - move ids of a hand's legal plays - same key and size as the legal plays cache
+legal_ids_cache = LegalPlaysCache()
+
+def moveId(move):
+    if not move:
+        return YIELD_MOVE
+    return maskOf(move)
+
+# NOTE - a tuple like the moves legalPlays() returns so the move can be compared with them
+def moveFromId(move_id):
+    if move_id == YIELD_MOVE:
+        return None
+    return tuple(cardsOf(move_id))
+
+# the set of move ids of the legal plays of cards on board - cached per hand like legalPlays()
+def legalIds(board, cards):
+    key = board.legalPlaysKey(cards)
+    ids = legal_ids_cache.get(key)
+    if ids is None:
+        ids = frozenset(moveId(move) for move in board.legalPlays(cards))
+        legal_ids_cache.put(key, ids)
+    return ids
+
+# Array-backed search tree - an alternative store to a tree of RegicideNode objects
+# every node is one row across a set of columns (visits, reward sum, parent, first child, number of children, move id)
+# children of a node are allocated together so they sit next to each other and UCT is one slice of each column
+# NOTE - nodes don't store a game state - one board is walked down from the root with undo records every iteration,
+#  the same Select -> Expand -> Simulate -> Backpropagate steps as RegicideNode are kept (random selection by default)
+# NOTE - this is a memory store, not a faster one - replaying the path's moves (nextState() and undo()) costs more than
+#  RegicideNode's stored boards, so an iteration is ~25% slower for ~1/65 of the memory per node. use it when the tree
+#  wouldn't fit in memory otherwise
+class ArrayTree:
+    def __init__(self, state, selection_heuristics=False, UCT_exploration=0.7, simulation_heuristics=False, chunk=4096):
+        self.board = state.clone()
+        self.selection_heuristics = selection_heuristics
+        self.UCT_exploration = UCT_exploration
+        self.simulation_heuristics = simulation_heuristics
+        self.chunk = chunk
+
+        self.size = 0
+        self.capacity = 0
+
+        if np is not None:
+            self.visits = np.zeros(0, dtype=np.int64)
+            self.reward = np.zeros(0, dtype=np.float64)
+            self.parent = np.zeros(0, dtype=np.int32)
+            self.first_child = np.zeros(0, dtype=np.int32)
+            self.num_children = np.zeros(0, dtype=np.int32)
+            self.move = np.zeros(0, dtype=np.int64)
+        else:
+            self.visits = array("q")
+            self.reward = array("d")
+            self.parent = array("l")
+            self.first_child = array("l")
+            self.num_children = array("l")
+            self.move = array("q")
+
+        # NOTE - rollout moves are picked by the same heuristics RegicideNode uses - the policy node only ever reads self.board
+        self.policy = RegicideNode()
+        self.policy.game_state = self.board
+
+        self.allocate(1, -1, [None]) # root
+
+    # grows every column by at least one chunk
+    def grow(self, needed):
+        extra = max(self.chunk, needed)
+        if np is not None:
+            self.visits = np.concatenate((self.visits, np.zeros(extra, dtype=np.int64)))
+            self.reward = np.concatenate((self.reward, np.zeros(extra, dtype=np.float64)))
+            self.parent = np.concatenate((self.parent, np.zeros(extra, dtype=np.int32)))
+            self.first_child = np.concatenate((self.first_child, np.zeros(extra, dtype=np.int32)))
+            self.num_children = np.concatenate((self.num_children, np.zeros(extra, dtype=np.int32)))
+            self.move = np.concatenate((self.move, np.zeros(extra, dtype=np.int64)))
+        else:
+            zeros = [0] * extra
+            self.visits.extend(zeros)
+            self.reward.extend([0.0] * extra)
+            self.parent.extend(zeros)
+            self.first_child.extend(zeros)
+            self.num_children.extend(zeros)
+            self.move.extend(zeros)
+        self.capacity += extra
+
+    # adds count nodes in one block under parent and returns the index of the first one
+    def allocate(self, count, parent, moves):
+        if self.size + count > self.capacity:
+            self.grow(self.size + count - self.capacity)
+
+        first = self.size
+        for offset in range(count):
+            self.parent[first + offset] = parent
+            self.move[first + offset] = moveId(moves[offset])
+        self.size += count
+
+        if parent >= 0:
+            self.first_child[parent] = first
+            self.num_children[parent] = count
+
+        return first
+
+    # iterative backpropagation - every result is added to every node on the path
+    def Backpropagate(self, path, results):
+        if np is not None:
+            for result in results:
+                self.visits[path] += 1
+                self.reward[path] += result
+        else:
+            for result in results:
+                for node in path:
+                    self.visits[node] += 1
+                    self.reward[node] += result
+
+    # returns the children of node whose move is one of legal_ids (see legalIds())
+    # NOTE - the node's slice of the move column is read in one go - per element NumPy indexing is slower than a list
+    def availableChildren(self, node, legal_ids):
+        first = int(self.first_child[node])
+        count = int(self.num_children[node])
+
+        moves = self.move[first:first + count]
+        if np is not None:
+            moves = moves.tolist()
+
+        return [first + offset for offset in range(count) if moves[offset] in legal_ids]
+
+    # vectorized UCT over the available children of node - returns the index of the best child
+    def selectUCT(self, node, children):
+        exploration = self.UCT_exploration
+
+        if np is not None:
+            children = np.array(children)
+            visits = self.visits[children].astype(np.float64)
+            rankings = self.reward[children] / visits + exploration * np.sqrt(log(self.visits[node]) / visits)
+            return int(children[int(np.argmax(rankings))])
+
+        parent_log = log(self.visits[node])
+        max_rank = -inf
+        selection = children[0]
+        for child in children:
+            rank = self.reward[child] / self.visits[child] + exploration * sqrt(parent_log / self.visits[child])
+            if rank > max_rank:
+                max_rank = rank
+                selection = child
+        return selection
+
+    # one Select -> Expand -> Simulate -> Backpropagate iteration - returns False on a dud run (nothing expanded)
+    def iterate(self):
+        board = self.board
+        undo_records = []
+        path = [0]
+        node = 0
+
+        try:
+            while True:
+                # Select - walk down while every available child of the node has been visited
+                hand = board.players[board.currentPlayer()].hand
+                legal_plays = board.legalPlays(hand)
+
+                if len(legal_plays) == 0:
+                    return False
+
+                if self.num_children[node] == 0:
+                    self.allocate(len(legal_plays), node, legal_plays)
+
+                children = self.availableChildren(node, legalIds(board, hand))
+
+                if len(children) == 0:
+                    return False
+
+                if np is not None:
+                    visits = self.visits[children].tolist()
+                else:
+                    visits = [self.visits[child] for child in children]
+                untried = [child for child, child_visits in zip(children, visits) if child_visits == 0]
+
+                if untried:
+                    # Expand - a random unvisited child
+                    child = untried[random.randint(0, len(untried) - 1)]
+                    undo_records.append(board.nextState(moveFromId(int(self.move[child])), True, undo=True))
+                    path.append(child)
+                    self.Simulate(board, path, undo_records)
+                    return True
+
+                if self.selection_heuristics:
+                    child = self.selectUCT(node, children)
+                else:
+                    child = children[random.randint(0, len(children) - 1)]
+
+                undo_records.append(board.nextState(moveFromId(int(self.move[child])), True, undo=True))
+                path.append(child)
+                node = child
+
+                winner = board.winner()
+                if winner == Result.WIN or winner == Result.LOSS:
+                    # NOTE - a terminal node is only simulated once (like RegicideNode) - after that it's a dud
+                    return False
+        finally:
+            for record in reversed(undo_records):
+                board.undo(record)
+
+    # simulates from the expanded child (last node on the path) and backpropagates the results
+    def Simulate(self, board, path, undo_records):
+        depth = len(path) - 1
+        winner = board.winner()
+
+        if winner == Result.WIN or winner == Result.LOSS:
+            self.Backpropagate(path, calculateRewards(winner, depth))
+            return
+
+        diamond_check = board.diamondCheck()
+        undo_records.append(board.randomize(board.currentPlayer(), True))
+
+        if self.simulation_heuristics:
+            choose_move = lambda possible_moves: self.policy.determineSimulationMove(possible_moves, False, True, True, True)
+        else:
+            choose_move = lambda possible_moves: self.policy.determineSimulationMove(possible_moves, True, False, False, False)
+
+        winner, boss_bonus, surviving_turns, stuck = playout(board, undo_records, choose_move)
+
+        if stuck:
+            self.Backpropagate(path, calculateRewards(Result.LOSS, depth, boss_bonus, surviving_turns))
+        else:
+            self.Backpropagate(path, calculateRewards(winner, depth, boss_bonus, surviving_turns, diamond_check))
+
+    # returns the move of the root child with the highest average reward
+    def findHighestRankingAction(self):
+        count = int(self.num_children[0])
+        first = int(self.first_child[0])
+
+        max_ranking = -inf
+        best = -1
+        for child in range(first, first + count):
+            if self.visits[child] > 0:
+                rank = self.reward[child] / self.visits[child]
+                if rank > max_ranking:
+                    max_ranking = rank
+                    best = child
+
+        if best < 0:
+            raise Exception("Error: 'findHighestRankingAction()' called before any root child was visited!")
+
+        return moveFromId(int(self.move[best]))
+
+    # (move, reward sum, visits) for every root child - same shape as the root-parallel merge uses
+    def rootChildren(self):
+        count = int(self.num_children[0])
+        first = int(self.first_child[0])
+        return [(moveFromId(int(self.move[child])), float(self.reward[child]), int(self.visits[child]))
+                for child in range(first, first + count)]
+
+    # bytes used by the node columns (allocated capacity, not just used rows)
+    def memoryUsage(self):
+        if np is not None:
+            return sum(column.nbytes for column in [self.visits, self.reward, self.parent, self.first_child, self.num_children, self.move])
+        return sum(column.itemsize * len(column) for column in [self.visits, self.reward, self.parent, self.first_child, self.num_children, self.move])
@@ -0,0 +1,418 @@
+# REFERENCE - https://numpy.org/doc/stable/user/basics.broadcasting.html
+# REFERENCE - https://www.chessprogramming.org/Bitboards
+# REFERENCE - https://github.com/melvinzhang/ismcts/blob/master/ISMCTS.py
+
+# External Imports
+import random
+
+try:
+    import numpy as np
+except ImportError: # NOTE - NumPy is optional - without it Simulate() only ever plays one rollout at a time
+    np = None
+
+# Internal Imports
+from Cards.Base.card_set import FULL_MASK
+from Cards.Base.card_set import maskOf
+from Cards.Base.card_set import cardsOf
+from Game.Regicide.regicide_board import Result
+from Game.Regicide.discard_solver import solveDiscard
+
+AVAILABLE = np is not None
+
+# Batched random rollouts - K determinizations of one board are encoded as integer arrays and played in lockstep,
+# every lane is advanced one turn per step so the work per turn is a handful of NumPy operations over all K lanes
+# NOTE - the rules are the same as RegicideBoard.nextState() with ai=True and the random simulation policy:
+#  hands, played cards and the discard pile are 52-bit masks (the discard pile is only ever drawn from after a shuffle
+#  so its order never matters), the tavern is a ring buffer of card indexes (bottom -> top) and the castle order is
+#  shared by every lane since randomize() always sorts it the same way
+# NOTE - a perfect hit boss goes on top of the tavern and hearts go under it, so the tavern boss pile and the tavern
+#  deck are one ring buffer - drawing from the top takes the boss pile first just like Tavern.drawCard()
+
+TAVERN_SIZE = 64 # ring buffer length - larger than the 52 cards that could ever be in the tavern
+SUIT_BITS = {"C": 1, "D": 2, "H": 4, "S": 8}
+
+# result codes used inside the arrays - converted back to Result when the batch finishes
+ALIVE, WIN, LOSS, BOSS_DEFEATED = 0, 1, 2, 3
+RESULTS = {ALIVE: Result.ALIVE, WIN: Result.WIN, LOSS: Result.LOSS, BOSS_DEFEATED: Result.BOSS_DEFEATED}
+
+# boss rank -> (attack, health) - same values as Boss.__init__()
+BOSS_STATS = {11: (10, 20), 12: (15, 30), 13: (20, 40)}
+
+# every play legalPlays() can ever return - a play is legal when all of its cards are in the hand
+# NOTE - singles (any card), animal companions (ace + non-ace), pairs of 2-5, threes of 2-3 and four 2's
+def allPlays():
+    plays = [[index] for index in range(52)]
+
+    aces = [index for index in range(52) if index // 4 == 0]
+    for ace in aces:
+        for companion in range(4, 52):
+            plays.append([ace, companion])
+
+    for rank in [2, 3, 4, 5]:
+        bucket = [(rank - 1) * 4 + suit for suit in range(4)]
+        for i in range(4):
+            for j in range(i + 1, 4):
+                plays.append([bucket[i], bucket[j]])
+
+    for rank in [2, 3]:
+        bucket = [(rank - 1) * 4 + suit for suit in range(4)]
+        for i in range(4):
+            for j in range(i + 1, 4):
+                for k in range(j + 1, 4):
+                    plays.append([bucket[i], bucket[j], bucket[k]])
+
+    plays.append([suit for suit in range(4)]) # four 2's
+
+    return plays
+
+# bit per suit (see SUIT_BITS) in a play of card indexes
+def playSuits(play):
+    suits = 0
+    for index in play:
+        suits |= 1 << (index % 4)
+    return suits
+
+if np is not None:
+    PLAYS = allPlays()
+    PLAY_MASKS = np.array([sum(1 << index for index in play) for play in PLAYS], dtype=np.int64)
+    PLAY_POWER = np.array([sum(index // 4 + 1 for index in play) for play in PLAYS], dtype=np.int64)
+    PLAY_SUITS = np.array([playSuits(play) for play in PLAYS], dtype=np.int64)
+    YIELD = len(PLAYS) # column of the yield move in the legal move matrix
+
+    SHIFTS = np.arange(52, dtype=np.int64)
+    RANKS = SHIFTS // 4 + 1
+
+# (..., 52) boolean matrix of which cards are in each mask
+def bitsOf(masks):
+    return (masks[..., None] >> SHIFTS) & 1 == 1
+
+class BatchRollout:
+    def __init__(self, state, marker, lanes, rng=None):
+        if np is None:
+            raise Exception("Batched rollouts need NumPy!")
+
+        self.lanes = lanes
+        self.num_players = len(state.players)
+        self.hand_size = state.hand_size
+
+        # NOTE - the RNG stream is drawn from the global random module so seeded games stay reproducible
+        self.rng = rng if rng is not None else np.random.default_rng(random.getrandbits(64))
+
+        self.determinize(state, marker)
+
+    # same determinization as RegicideBoard.randomize() - done once per lane
+    def determinize(self, state, marker):
+        K = self.lanes
+        rng = self.rng
+
+        seen_mask = state.players[marker].hand.mask
+        seen_mask |= state.tavern.boss.mask
+        seen_mask |= state.discard.cards.mask
+        seen_mask |= maskOf(state.castle.boss)
+        seen_mask |= state.castle.cards.mask
+        played = 0
+        for player in state.players:
+            played |= player.played.mask
+        seen_mask |= played
+
+        unseen = np.array([card.index for card in cardsOf(FULL_MASK & ~seen_mask)], dtype=np.int64)
+
+        # one permutation of the unseen cards per lane
+        order = np.argsort(rng.random((K, len(unseen))), axis=1)
+        dealt = unseen[order]
+
+        # tavern - the determinized deck at the bottom, the (known) boss pile on top
+        tavern_cards = len(state.tavern.cards)
+        tavern_boss = [card.index for card in state.tavern.boss]
+        self.tavern = np.zeros((K, TAVERN_SIZE), dtype=np.int64)
+        self.tavern[:, :tavern_cards] = dealt[:, :tavern_cards]
+        self.tavern[:, tavern_cards:tavern_cards + len(tavern_boss)] = tavern_boss
+        self.tavern_start = np.zeros(K, dtype=np.int64)
+        self.tavern_len = np.full(K, tavern_cards + len(tavern_boss), dtype=np.int64)
+
+        self.hands = np.zeros((K, self.num_players), dtype=np.int64)
+        offset = tavern_cards
+        for seat, player in enumerate(state.players):
+            if seat == marker:
+                self.hands[:, seat] = player.hand.mask
+            else:
+                size = len(player.hand)
+                cards = dealt[:, offset:offset + size]
+                self.hands[:, seat] = np.bitwise_or.reduce(np.left_shift(1, cards), axis=1) if size else 0
+                offset += size
+
+        self.played = np.full(K, played, dtype=np.int64)
+        self.discard = np.full(K, state.discard.cards.mask, dtype=np.int64)
+
+        # NOTE - randomize() sorts the castle so every determinization has the same castle order
+        self.castle = np.array([card.index for card in sorted(state.castle.cards.cards, reverse=True)], dtype=np.int64)
+        self.castle_len = np.full(K, len(self.castle), dtype=np.int64)
+
+        boss = state.castle.boss
+        self.boss = np.full(K, boss.index, dtype=np.int64)
+        self.boss_attack = np.full(K, boss.attack, dtype=np.int64)
+        self.boss_health = np.full(K, boss.health, dtype=np.int64)
+
+        self.current = np.full(K, state.currentPlayer(), dtype=np.int64)
+        self.yields = np.full(K, state.consecutive_yields, dtype=np.int64)
+
+        self.active = np.ones(K, dtype=bool)
+        self.winner = np.full(K, ALIVE, dtype=np.int64)
+        self.stuck = np.zeros(K, dtype=bool)
+        self.boss_bonus = np.zeros(K, dtype=np.int64)
+        self.surviving_turns = np.zeros(K, dtype=np.int64)
+
+    # plays every lane to the end - returns (winner, boss_bonus, surviving_turns, stuck) per lane like playout()
+    def run(self):
+        while self.active.any():
+            self.step(np.flatnonzero(self.active))
+
+        return [(RESULTS[int(winner)], int(boss_bonus), int(surviving_turns), bool(stuck))
+                for winner, boss_bonus, surviving_turns, stuck
+                in zip(self.winner, self.boss_bonus, self.surviving_turns, self.stuck)]
+
+    # one turn for every lane in lanes
+    def step(self, lanes):
+        rng = self.rng
+        current = self.current[lanes]
+        hand = self.hands[lanes, current]
+
+        # legal plays - one column per possible play plus yielding
+        legal = np.empty((len(lanes), YIELD + 1), dtype=bool)
+        legal[:, :YIELD] = hand[:, None] & PLAY_MASKS == PLAY_MASKS
+        legal[:, YIELD] = self.yields[lanes] < self.num_players - 1
+
+        # NOTE - a player with no legal plays has lost the game for the adventurers
+        stuck = ~legal.any(axis=1)
+        if stuck.any():
+            self.finish(lanes[stuck], LOSS)
+            self.stuck[lanes[stuck]] = True
+            keep = ~stuck
+            lanes, current, hand, legal = lanes[keep], current[keep], hand[keep], legal[keep]
+            if len(lanes) == 0:
+                return
+
+        # uniform random move among the legal ones (same as the random simulation policy)
+        keys = rng.random(legal.shape)
+        keys[~legal] = -1.0
+        choice = np.argmax(keys, axis=1)
+
+        yielded = choice == YIELD
+        died = np.zeros(len(lanes), dtype=bool)
+        defeated = np.zeros(len(lanes), dtype=bool)
+
+        # yielding
+        if yielded.any():
+            self.yields[lanes[yielded]] += 1
+
+        # playing cards
+        playing = ~yielded
+        if playing.any():
+            rows = lanes[playing]
+            seats = current[playing]
+            play = choice[playing]
+            play_mask = PLAY_MASKS[play]
+
+            self.hands[rows, seats] &= ~play_mask
+            self.played[rows] |= play_mask
+            self.yields[rows] = 0
+
+            power = PLAY_POWER[play]
+            boss_suit = np.left_shift(1, self.boss[rows] % 4)
+            suits = PLAY_SUITS[play] & ~boss_suit
+
+            # boss.cardEffect() - spades lower the attack, clubs double the damage
+            spades = suits & SUIT_BITS["S"] != 0
+            self.boss_attack[rows] = np.where(spades, np.maximum(0, self.boss_attack[rows] - power), self.boss_attack[rows])
+            damage = np.where(suits & SUIT_BITS["C"] != 0, power * 2, power)
+            health = self.boss_health[rows] - damage
+            perfect = health == 0
+            self.boss_health[rows] = np.maximum(0, health)
+
+            # board.cardEffect() - hearts then diamonds
+            hearts = suits & SUIT_BITS["H"] != 0
+            if hearts.any():
+                self.applyHeart(rows[hearts], power[hearts])
+
+            diamonds = suits & SUIT_BITS["D"] != 0
+            if diamonds.any():
+                self.applyDiamond(rows[diamonds], seats[diamonds], power[diamonds])
+
+            boss_down = self.boss_health[rows] == 0
+            if boss_down.any():
+                self.defeatBoss(rows[boss_down], perfect[boss_down])
+            defeated[playing] = boss_down
+
+        # everyone who didn't defeat the boss takes damage
+        defending = ~defeated
+        if defending.any():
+            died[defending] = self.takeDamage(lanes[defending], current[defending])
+
+        # winner() - same order of checks
+        result = np.where(died, LOSS, ALIVE)
+        attack = self.boss_attack[lanes]
+        boss_left = self.boss[lanes] >= 0
+        empty_hand = (self.hands[lanes] == 0).any(axis=1)
+        result = np.where(boss_left & empty_hand & (attack != 0), LOSS, result)
+        result = np.where(defeated, BOSS_DEFEATED, result)
+        result = np.where(defeated & ~boss_left, WIN, result)
+
+        surviving = (result == ALIVE) | (result == BOSS_DEFEATED)
+        self.surviving_turns[lanes[surviving]] += 1
+        self.boss_bonus[lanes[result == BOSS_DEFEATED]] += 1
+
+        over = (result == WIN) | (result == LOSS)
+        if over.any():
+            self.finish(lanes[over], result[over])
+
+        # the player who defeats a boss starts against the next one
+        self.current[lanes] = np.where(defeated, current, (current + 1) % self.num_players)
+
+    def finish(self, lanes, result):
+        self.winner[lanes] = result
+        self.active[lanes] = False
+
+    # heart suit power - up to power random cards from the discard pile go under the tavern
+    def applyHeart(self, rows, power):
+        discard_bits = bitsOf(self.discard[rows])
+        count = np.minimum(power, discard_bits.sum(axis=1))
+        if not count.any():
+            return
+
+        # NOTE - shuffling the discard and drawing from the top is a random subset in a random order
+        keys = self.rng.random(discard_bits.shape)
+        keys[~discard_bits] = 2.0
+        drawn = np.argsort(keys, axis=1)[:, :count.max()]
+
+        valid = np.arange(drawn.shape[1]) < count[:, None]
+        positions = (self.tavern_start[rows, None] - count[:, None] + np.arange(drawn.shape[1])) % TAVERN_SIZE
+
+        lane_index = np.broadcast_to(rows[:, None], drawn.shape)
+        self.tavern[lane_index[valid], positions[valid]] = drawn[valid]
+        self.tavern_start[rows] = (self.tavern_start[rows] - count) % TAVERN_SIZE
+        self.tavern_len[rows] += count
+
+        drawn_mask = np.bitwise_or.reduce(np.where(valid, np.left_shift(1, drawn), 0), axis=1)
+        self.discard[rows] &= ~drawn_mask
+
+    # diamond suit power - players draw in turn (starting with the current player) until power cards are drawn,
+    # every hand is full or the tavern is empty
+    # NOTE - going round the table hand_size times and skipping full hands deals the same cards as applyDaimond(),
+    #  so every (round, seat) slot is laid out in turn order and the first min(power, tavern) open slots draw from the top
+    def applyDiamond(self, rows, seats, power):
+        num_players = self.num_players
+        lanes = np.arange(len(rows))
+
+        slot_seats = (seats[:, None] + np.tile(np.arange(num_players), self.hand_size)) % num_players
+        slot_rounds = np.repeat(np.arange(self.hand_size), num_players)
+
+        need = self.hand_size - bitsOf(self.hands[rows]).sum(axis=2)
+        open_slots = need[lanes[:, None], slot_seats] > slot_rounds
+
+        draw_number = np.cumsum(open_slots, axis=1) - 1
+        limit = np.minimum(power, self.tavern_len[rows])
+        drawing = open_slots & (draw_number < limit[:, None])
+
+        top = self.tavern_start[rows] + self.tavern_len[rows] - 1
+        positions = (top[:, None] - draw_number) % TAVERN_SIZE
+        cards = np.where(drawing, np.left_shift(1, self.tavern[rows[:, None], positions]), 0)
+
+        for seat in range(num_players):
+            self.hands[rows, seat] |= np.bitwise_or.reduce(np.where(slot_seats == seat, cards, 0), axis=1)
+        self.tavern_len[rows] -= drawing.sum(axis=1)
+
+    # played cards go to the discard, the boss goes on top of the tavern (perfect hit) or to the discard,
+    # then the next boss is drawn from the castle
+    def defeatBoss(self, rows, perfect):
+        self.discard[rows] |= self.played[rows]
+        self.played[rows] = 0
+
+        boss = self.boss[rows]
+        if perfect.any():
+            perfect_rows = rows[perfect]
+            top = (self.tavern_start[perfect_rows] + self.tavern_len[perfect_rows]) % TAVERN_SIZE
+            self.tavern[perfect_rows, top] = boss[perfect]
+            self.tavern_len[perfect_rows] += 1
+        self.discard[rows[~perfect]] |= np.left_shift(1, boss[~perfect])
+
+        # NOTE - a boss index of -1 means the castle is empty (the adventurers have won)
+        left = self.castle_len[rows] > 0
+        self.boss[rows[~left]] = -1
+
+        drawing = rows[left]
+        if len(drawing):
+            self.castle_len[drawing] -= 1
+            new_boss = self.castle[self.castle_len[drawing]]
+            self.boss[drawing] = new_boss
+            for rank, (attack, health) in BOSS_STATS.items():
+                is_rank = new_boss // 4 + 1 == rank
+                self.boss_attack[drawing[is_rank]] = attack
+                self.boss_health[drawing[is_rank]] = health
+
+    # RegicidePlayer.takeDamage() with ai=True - every defending lane discards the cards solveDiscard() picks for its hand -
+    # returns which lanes died
+    # NOTE - the solver works on one hand at a time (memoized on hand and damage) so this is a loop over the defending lanes
+    def takeDamage(self, rows, seats):
+        damage = self.boss_attack[rows]
+        hands = self.hands[rows, seats]
+        health = bitsOf(hands) @ RANKS
+
+        died = (damage != 0) & (damage >= health)
+
+        defending = np.flatnonzero((damage != 0) & ~died)
+        if len(defending) != 0:
+            discards = np.array([solveDiscard(int(hand), int(attack)) for hand, attack in zip(hands[defending], damage[defending])], dtype=np.int64)
+            hands[defending] &= ~discards
+            self.discard[rows[defending]] |= discards
+
+        self.hands[rows, seats] = hands
+
+        return died
+
+# plays lanes random rollouts from state (determinized for marker) and returns one playout() tuple per rollout
+# NOTE - state isn't changed
+def batchPlayout(state, marker, lanes):
+    return BatchRollout(state, marker, lanes).run()
+
+# testing function - batched rollouts should score like the same number of sequential ones
+def batchRollout():
+    import time
+    from ISMCTS.runner import createBoard
+    from ISMCTS.Game.regicide_node import playout
+
+    state = createBoard(1, 2)
+    signature = (state.players[0].hand.mask, state.players[1].hand.mask, state.tavern.cards.cards[:], state.castle.boss.health)
+
+    lanes = 2000
+    marker = state.currentPlayer()
+
+    start_time = time.perf_counter()
+    batch = batchPlayout(state, marker, lanes)
+    batch_time = time.perf_counter() - start_time
+    assert len(batch) == lanes, "One result per lane expected!"
+    assert signature == (state.players[0].hand.mask, state.players[1].hand.mask, state.tavern.cards.cards[:], state.castle.boss.health), "batchPlayout() shouldn't change the state!"
+
+    start_time = time.perf_counter()
+    sequential = []
+    for rollout in range(lanes):
+        undo_records = [state.randomize(marker, True)]
+        sequential.append(playout(state, undo_records, lambda moves: moves[random.randint(0, len(moves) - 1)]))
+        for record in reversed(undo_records):
+            state.undo(record)
+    sequential_time = time.perf_counter() - start_time
+
+    batch_bosses = sum(result[1] for result in batch) / lanes
+    sequential_bosses = sum(result[1] for result in sequential) / lanes
+    batch_turns = sum(result[2] for result in batch) / lanes
+    sequential_turns = sum(result[2] for result in sequential) / lanes
+
+    print("Bosses: batch {:.3f} | sequential {:.3f}".format(batch_bosses, sequential_bosses))
+    print("Turns: batch {:.3f} | sequential {:.3f}".format(batch_turns, sequential_turns))
+    print("Rollouts/s: batch {:.0f} | sequential {:.0f}".format(lanes / batch_time, lanes / sequential_time))
+
+    assert abs(batch_turns - sequential_turns) < 0.1 * sequential_turns + 0.2, "Batched rollouts play a different game!"
+    assert abs(batch_bosses - sequential_bosses) < 0.1 * sequential_bosses + 0.1, "Batched rollouts defeat a different number of bosses!"
+
+if __name__ == "__main__":
+    batchRollout()
+    print("Everything Passed!")
@@ -0,0 +1,151 @@
+# REFERENCE - https://www.chessprogramming.org/Bitboards
+
+# External Imports
+import random
+
+# Internal Imports
+from Game.Regicide.legal_plays_cache import LegalPlaysCache
+
+# Move-feature kernel shared by the expansion and simulation heuristics (RegicideNode.determineExpansionMove() and
+# determineSimulationMove()) - every move is described by one int and the heuristics filter moves with one mask test
+# NOTE - the features of a hand's legal plays are worked out once and cached next to them (same key as legalPlays()) and so
+#  are the moves each heuristic wants - a heuristic rollout move costs a cache lookup instead of rebuilding lists of moves
+
+# feature bits of a move
+#  bits 0-3 suits in the move (C D H S) | 4 combo (2+ cards of one rank) | 5 animal companion | 6 more than one card
+#  7 yield | 8-10 number of cards | 11-15 rank sum
+SUIT_BITS = {"C": 1, "D": 2, "H": 4, "S": 8}
+COMBO = 1 << 4
+COMPANION = 1 << 5
+MULTI = 1 << 6
+YIELD = 1 << 7
+SIZE_SHIFT = 8
+SUM_SHIFT = 11
+
+# CONFIG - number of (hand, can yield) keys whose features are kept - same size as the legal plays cache
+features_cache = LegalPlaysCache()
+
+# NOTE - wanted moves of a hand's legal plays for every (boss suit, checks) a rollout has used on it
+wanted_cache = LegalPlaysCache()
+
+# the feature record of a single move (a tuple/list of cards or None for yielding)
+def moveFeatures(move):
+    if not move:
+        return YIELD
+
+    features = len(move) << SIZE_SHIFT | sum(card.rank for card in move) << SUM_SHIFT
+    for card in move:
+        features |= SUIT_BITS[card.suit]
+
+    if len(move) > 1:
+        features |= MULTI
+        if move[0].rank == 1 or move[1].rank == 1:
+            features |= COMPANION
+        else:
+            features |= COMBO
+
+    return features
+
+# features of state.legalPlays(cards) - a tuple in the same order as the moves
+def playFeatures(state, cards):
+    key = state.legalPlaysKey(cards)
+    features = features_cache.get(key)
+    if features is None:
+        features = tuple(moveFeatures(move) for move in state.legalPlays(cards))
+        features_cache.put(key, features)
+    return features
+
+# the (mask, wanted) pair a move's features are tested with - feature & mask == wanted
+# NOTE - combo_check wants plays of more than one card (combos and animal companions), suit_check wants plays without a card
+#  of the boss's suit. yielding is never wanted by either
+def heuristicMasks(boss_suit, combo_check, suit_check):
+    mask = YIELD
+    wanted = 0
+    if combo_check:
+        mask |= MULTI
+        wanted |= MULTI
+    if suit_check:
+        mask |= SUIT_BITS[boss_suit]
+    return mask, wanted
+
+# indexes of the moves (by their features) the heuristics want - none without a check turned on
+def wantedMoves(features, boss_suit, combo_check, suit_check):
+    if not combo_check and not suit_check:
+        return ()
+
+    mask, wanted = heuristicMasks(boss_suit, combo_check, suit_check)
+    return tuple(index for index, feature in enumerate(features) if feature & mask == wanted)
+
+# wantedMoves() of state.legalPlays(cards) - cached per hand and check
+def wantedPlays(state, cards, boss_suit, combo_check, suit_check):
+    key = state.legalPlaysKey(cards) + (boss_suit, combo_check, suit_check)
+    indexes = wanted_cache.get(key)
+    if indexes is None:
+        indexes = wantedMoves(playFeatures(state, cards), boss_suit, combo_check, suit_check)
+        wanted_cache.put(key, indexes)
+    return indexes
+
+# picks a random move out of the wanted ones (indexes into moves) - any move if none are wanted
+# NOTE - draws from the random module exactly like the list based heuristics did, so the same seed picks the same moves
+#  (with a single move the heuristics picked from every move - that's the same randint(0, 0) either way)
+def chooseMove(moves, wanted=()):
+    if wanted:
+        return moves[wanted[random.randint(0, len(wanted) - 1)]]
+    return moves[random.randint(0, len(moves) - 1)]
+
+# testing function - the kernel picks exactly what the old list based heuristics picked
+def heuristicKernel():
+    from Cards.Base.card import Card
+    from Game.Regicide.regicide_board import RegicideBoard
+
+    # NOTE - the heuristics before the kernel (determineSimulationMove() with its duplicate check left out - it compared
+    #  card.suit == other_card.suit and card.suit != other_card.suit so it never removed a combo)
+    def listHeuristic(possible_moves, boss_suit, combo_check, suit_check):
+        combos = []
+        if combo_check and len(possible_moves) > 1:
+            combos = [move for move in possible_moves if move and len(move) > 1]
+
+        other_suit = []
+        if suit_check and len(possible_moves) > 1:
+            other_suit = [move for move in possible_moves if move and all(card.suit != boss_suit for card in move)]
+
+        if suit_check and combo_check:
+            moves = [move for move in possible_moves if move in combos and move in other_suit]
+        elif combo_check:
+            moves = combos
+        elif suit_check:
+            moves = other_suit
+        else:
+            moves = possible_moves
+
+        if len(moves) > 0:
+            return moves[random.randint(0, len(moves) - 1)]
+        return possible_moves[random.randint(0, len(possible_moves) - 1)]
+
+    assert moveFeatures(None) == YIELD, "Yielding should only have the yield bit!"
+    assert moveFeatures((Card(1, "H"), Card(9, "S"))) & (COMPANION | MULTI | COMBO) == COMPANION | MULTI, "Ace + 9 is an animal companion!"
+    assert moveFeatures((Card(3, "H"), Card(3, "S"))) >> SUM_SHIFT == 6, "Rank sum should be kept!"
+
+    board = RegicideBoard()
+    board.start(2)
+    rng = random.Random(4)
+    for trial in range(300):
+        hand = rng.sample([Card(rank, suit) for rank in range(1, 11) for suit in "CDHS"], rng.randint(1, 8))
+        board.consecutive_yields = rng.randint(0, 1)
+        moves = board.legalPlays(hand)
+        features = playFeatures(board, hand)
+
+        for boss_suit in "CDHS":
+            for combo_check, suit_check in [(True, True), (True, False), (False, True), (False, False)]:
+                random.seed(trial)
+                expected = listHeuristic(moves, boss_suit, combo_check, suit_check)
+                random.seed(trial)
+                assert chooseMove(moves, wantedMoves(features, boss_suit, combo_check, suit_check)) == expected, "Kernel picked a different move!"
+                random.seed(trial)
+                assert chooseMove(moves, wantedPlays(board, hand, boss_suit, combo_check, suit_check)) == expected, "Cached kernel picked a different move!"
+
+    assert playFeatures(board, hand) is features, "Features of a hand should be cached!"
+
+if __name__ == "__main__":
+    heuristicKernel()
+    print("Everything Passed!")
@@ -1,14 +1,29 @@
 # External Imports
 import random
-from copy import deepcopy
+from time import perf_counter
 from math import sqrt
 from math import log
 from math import inf
+from math import ceil
 
-from Game.Regicide.regicide_action import RegicideAction
 # Internal Imports
 from ISMCTS.Base.node import Node
 from Game.Regicide.regicide_board import Result
+from ISMCTS.Game import batch_rollout
+from ISMCTS.Game.heuristic_kernel import chooseMove
+from ISMCTS.Game.heuristic_kernel import moveFeatures
+from ISMCTS.Game.heuristic_kernel import wantedMoves
+from ISMCTS.Game.heuristic_kernel import wantedPlays
+from ISMCTS.Game.static_eval import evaluatePosition
+
+# CONFIG - Any end state that results in a win is dramatically prioritised
+WIN_REWARD = 1000000000
+# CONFIG - AI is impartial to losses - only considering  the defeating of bosses
+LOSS_PUNISHMENT = 0
+# CONFIG - moves that result in instant death or immediately leave players with no diamonds are heavily punished
+INSTANT_LOSS_PUNISHMENT = -1000000000
+
+REWARDS = (WIN_REWARD, LOSS_PUNISHMENT, INSTANT_LOSS_PUNISHMENT)
 
 class RegicideNode(Node):
     def __init__(self):
@@ -31,6 +46,62 @@ class RegicideNode(Node):
         self.expansion_heuristics = False
         self.simulation_heuristics = False
 
+        # CONFIG - random rollouts played per Simulate() - more than one plays them in lockstep with NumPy (see batch_rollout.py)
+        self.rollout_batch = 1
+
+        # CONFIG - progressive widening - a node may only have ceil(widening_constant * visits ^ widening_exponent) branches
+        #  and its legal moves are drawn lazily, one more each time it's allowed another branch (see canExpand())
+        # NOTE - moves are drawn in a random order - there's only ever one move waiting to be expanded so expansion heuristics
+        #  don't get a choice. widening in the order moves are generated (lowest singles first) played far worse
+        self.progressive_widening = False
+        self.widening_constant = 2.0
+        self.widening_exponent = 0.5
+
+        # CONFIG - rollout cutoff - a rollout stops after rollout_cutoff moves (None plays to the end of the game) or once the
+        #  boss in play falls (boss_cutoff) and where it stopped is scored by evaluatePosition() (see ISMCTS/Game/static_eval.py)
+        # NOTE - batched rollouts always play to the end of the game
+        self.rollout_cutoff = None
+        self.boss_cutoff = False
+
+        # CONFIG - leaf parallelization - a LeafPool (see ISMCTS/leaf_parallel.py) that plays every Simulate()'s rollouts on
+        #  worker processes instead of one rollout in this process - None plays them here
+        self.leaf_pool = None
+
+        # NOTE - the lazy legal moves that haven't been drawn yet - None once every move has been drawn
+        self.move_generator = None
+
+        # NOTE - set by growTree() when a transposition table is used - twins is the list of nodes sharing this node's statistics
+        self.transpositions = None
+        self.twins = None
+
+        # NOTE - True after a re-root until the node is next selected - the branches' boards are from the old sample and get
+        #  rebuilt from this node's board then (see refreshBranches())
+        self.stale_branches = False
+
+        # NOTE - SearchStats shared by every node of the tree - None if the search isn't instrumented
+        self.search_stats = None
+
+        # CONFIG - (win reward, loss punishment, instant loss punishment) - see calculateRewards()
+        self.rewards = REWARDS
+
+    # copies the search settings of node (heuristic toggles, rewards, rollouts and shared tables) - every child inherits them
+    # NOTE - only the root is configured (see ISMCTS/search.py SearchConfig) so the rest of the tree has to follow it
+    def inheritSettings(self, node):
+        self.selection_heuristics = node.selection_heuristics
+        self.UCT_exploration = node.UCT_exploration
+        self.expansion_heuristics = node.expansion_heuristics
+        self.simulation_heuristics = node.simulation_heuristics
+        self.rewards = node.rewards
+        self.rollout_batch = node.rollout_batch
+        self.progressive_widening = node.progressive_widening
+        self.widening_constant = node.widening_constant
+        self.widening_exponent = node.widening_exponent
+        self.rollout_cutoff = node.rollout_cutoff
+        self.boss_cutoff = node.boss_cutoff
+        self.leaf_pool = node.leaf_pool
+        self.transpositions = node.transpositions
+        self.search_stats = node.search_stats
+
     # setters
     def setGameState(self, new_state=None, new_action=None):
         self.game_action = new_action  # action that got us to this state
@@ -50,7 +121,19 @@ class RegicideNode(Node):
         self.depth = depth
 
     def generate_possible_moves(self, cards=None):
-        self.available_moves = self.game_state.legalPlays(cards)
+        if self.progressive_widening:
+            # NOTE - only the moves the node is allowed to expand are drawn - the first one is drawn straight away
+            #  since a node without any legal moves is an end state
+            self.available_moves = []
+            self.move_generator = randomOrder(self.game_state.legalPlays(cards))
+            self.canExpand()
+        else:
+            # NOTE - legalPlays() returns a shared (cached) tuple - the node removes moves as it expands so it keeps its own list
+            self.available_moves = list(self.game_state.legalPlays(cards))
+            self.move_generator = None
+
+            if self.search_stats:
+                self.search_stats.moves_generated += len(self.available_moves)
 
         if len(self.available_moves) == 0:
             self.end_state = True
@@ -58,6 +141,39 @@ class RegicideNode(Node):
         if self.game_state.winner() != Result.ALIVE and self.game_state.winner() != Result.BOSS_DEFEATED:
             self.end_state = True
 
+    # number of branches the node may have with its current visits (progressive widening)
+    def wideningLimit(self):
+        return max(1, ceil(self.widening_constant * self.visits ** self.widening_exponent))
+
+    # True if the node can be expanded right now - with progressive widening the node has to be allowed another branch
+    #  and the next move is only drawn once it is
+    def canExpand(self):
+        if not self.progressive_widening:
+            return len(self.available_moves) > 0
+
+        if len(self.branches) >= self.wideningLimit():
+            return False
+        if self.available_moves:
+            return True
+        if self.move_generator is None:
+            return False
+
+        try:
+            move = next(self.move_generator)
+        except StopIteration:
+            self.move_generator = None
+            return False
+
+        self.available_moves.append(move)
+        if self.search_stats:
+            self.search_stats.moves_generated += 1
+
+        return True
+
+    # True if the node has moves that haven't been expanded yet - drawn or not
+    def hasMoves(self):
+        return len(self.available_moves) > 0 or self.move_generator is not None
+
     # getters
     # NOTE - All these getters are redundant since variables in node are not set to private
     def getGameState(self):
@@ -74,10 +190,13 @@ class RegicideNode(Node):
     def Select(self):
         exploration = self.UCT_exploration
 
+        if self.stale_branches:
+            self.refreshBranches()
+
         # Prioritise a node if it has no branches
         # Condition has to be 'or'
         # TODO - Optimization could be made to prevent dud selections...
-        if len(self.branches) == 0 or len(self.available_moves) > 0:
+        if len(self.branches) == 0 or self.canExpand():
             return self
         else:
             if not self.selection_heuristics:
@@ -89,7 +208,7 @@ class RegicideNode(Node):
                 rankings = []
                 child_index = []
                 for child in self.branches:
-                    if child.available_moves:
+                    if child.hasMoves():
                         rank = float(child.ranking) / float(child.visits) + exploration * sqrt(log(child.parent.visits) / float(child.visits))
                         rankings.append(rank)
                         child_index.append(self.branches.index(child))
@@ -108,7 +227,7 @@ class RegicideNode(Node):
         # NOTE - ensure that the function has the correct available_moves
         #self.generate_possible_moves(self.getGameState().players[self.active_player].hand)
 
-        if self.end_state or len(self.available_moves) == 0:
+        if self.end_state or not self.canExpand():
             #raise Exception("Invalid Expand!")
             #print("Trying to expand an end state!")
             return None
@@ -125,97 +244,177 @@ class RegicideNode(Node):
 
             self.available_moves.remove(move)
 
-            child_node = RegicideNode()
-            child_node.setGameState(deepcopy(self.game_state), deepcopy(move))
-            child_node.setParent(self)
-            child_node.setDepth(self.depth + 1)
-
             # NOTE - Band-aid fix - if move isn't a list - turn it into a list
+            played_move = move
             try:
-                length = len(move)
+                length = len(played_move)
             except TypeError:
-                if move:
-                    move = [move]
+                if played_move:
+                    played_move = [played_move]
+
+            # NOTE - the move is played before the child gets the board so it only generates (and counts) its own legal moves
+            game_state = self.game_state.clone()
+            game_state.nextState(played_move, True)
+
+            child_node = RegicideNode()
+            # NOTE - settings first so the child generates its moves the way the tree does (eagerly or lazily)
+            child_node.inheritSettings(self)
+            # NOTE - moves are fresh lists of immutable cards so the child can own the move without copying it
+            child_node.setGameState(game_state, move)
+            child_node.setParent(self)
+            child_node.setDepth(self.depth + 1)
 
-            child_node.game_state.nextState(move, True)
+            # NOTE - keyed on what the player who made the move can see afterwards
+            if self.transpositions is not None:
+                self.transpositions.share(child_node, child_node.game_state.infoSetHash(self.active_player))
 
             self.branches.append(child_node)
+            if self.search_stats:
+                self.search_stats.moves_expanded += 1
 
             return child_node
 
     def Simulate(self):
-        game_state_copy = deepcopy(self.getGameState())
-        game_action_copy = deepcopy(self.getGameAction())
-
-        next_turn = self.getGameState().currentPlayer()
+        game_state = self.getGameState()
 
-        # Determinize
-        random_game_state = self.getGameState().cloneAndRandomize(next_turn)
+        next_turn = game_state.currentPlayer()
 
         # CONFIG - check if players have any diamonds
-        diamond_check = self.getGameState().diamondCheck()
+        diamond_check = game_state.diamondCheck()
 
-        winner = self.getGameState().winner()
+        winner = game_state.winner()
 
         boss_bonus = 0
         surviving_turns = 0
 
-        self.end_state = False
+        stats = self.search_stats
 
         if winner == Result.WIN or winner == Result.LOSS:
             # TODO - band-aid fix - I think the selection algorithm is choosing branches which already are finished game-states so I need to set available branches of that node type to none.
             self.available_moves = []
+            self.move_generator = None
+            start_time = perf_counter()
             self.calculateResult(winner)
+            if stats:
+                stats.backprop_time += perf_counter() - start_time
+                stats.backprop_calls += 1
             return
 
-        while not self.end_state:
-            possible_moves = deepcopy(random_game_state.legalPlays(random_game_state.players[random_game_state.currentPlayer()].hand))
+        # NOTE - batched rollouts only play the random policy - heuristic simulations stay one at a time
+        #  determinization happens inside the batch so it's counted as rollout time
+        if self.rollout_batch > 1 and batch_rollout.AVAILABLE and not self.simulation_heuristics:
+            start_time = perf_counter()
+            results = batch_rollout.batchPlayout(game_state, next_turn, self.rollout_batch)
+            rollout_end = perf_counter()
 
-            # NOTE - end the simulation immediately if the players lose thanks to the initial expansion move
-            if len(possible_moves) == 0:
-                self.end_state = False
-                self.calculateResult(Result.LOSS, boss_bonus, surviving_turns) # boss_bonus & surviving_turns initially 0
-                self.setGameState(game_state_copy, game_action_copy)
-                return
+            for winner, boss_bonus, surviving_turns, stuck in results:
+                if stuck:
+                    self.calculateResult(Result.LOSS, boss_bonus, surviving_turns)
+                else:
+                    self.calculateResult(winner, boss_bonus, surviving_turns, diamond_check)
 
-            else:
+            if stats:
+                stats.rollout_time += rollout_end - start_time
+                stats.rollout_calls += len(results)
+                stats.rollout_moves += sum(rolloutLength(result) for result in results)
+                stats.backprop_time += perf_counter() - rollout_end
+                stats.backprop_calls += len(results)
 
-                if self.simulation_heuristics:
-                    move = self.determineSimulationMove(possible_moves, False, True, True, True)
-                else:
-                    move = self.determineSimulationMove(possible_moves, True, False, False, False)
+            return
+
+        # NOTE - leaf parallelization - the rollouts are played on a worker pool (see ISMCTS/leaf_parallel.py) and their
+        #  rewards come back as one sum and count, so the path is only walked once however many rollouts were played
+        if self.leaf_pool is not None:
+            start_time = perf_counter()
+            total, count, rollouts, moves, cutoffs = self.leaf_pool.simulate(self, diamond_check)
+            rollout_end = perf_counter()
+
+            self.Backpropagate(total, count)
 
-                # NOTE - Band-aid fix - if move isn't a list - turn it into a list
-                try:
-                    length = len(move)
-                except TypeError:
-                    if move:
-                        move = [move]
+            if stats:
+                stats.rollout_time += rollout_end - start_time
+                stats.rollout_calls += rollouts
+                stats.rollout_moves += moves
+                stats.rollout_cutoffs += cutoffs
+                stats.backprop_time += perf_counter() - rollout_end
+                stats.backprop_calls += 1
 
-                random_game_state.nextState(move, True)
+            return
+
+        rewards = self.rollout(diamond_check)
+
+        start_time = perf_counter()
+        for result in rewards:
+            self.Backpropagate(result)
+
+        if stats:
+            stats.backprop_time += perf_counter() - start_time
+            stats.backprop_calls += 1
 
-            winner = random_game_state.winner()
+    # plays one rollout from a determinization of the node's board and returns the rewards to backpropagate (see calculateRewards())
+    # NOTE - diamond_check is game_state.diamondCheck() from before the board was determinized (see Simulate())
+    def rollout(self, diamond_check):
+        game_state = self.game_state
+        stats = self.search_stats
 
-            if winner == Result.ALIVE:
-                surviving_turns += 1
+        # Determinize - the node's own board is randomized and played forward in place then every change is undone
+        # NOTE - no board is copied per simulation - each nextState() returns an undo record instead
+        start_time = perf_counter()
+        undo_records = [game_state.randomize(game_state.currentPlayer(), True)]
+        determinization_end = perf_counter()
 
-            elif winner == Result.BOSS_DEFEATED:
-                surviving_turns += 1
-                boss_bonus += 1
+        # NOTE - rollout states are never looked up in the transposition table so the hash isn't kept up to date during them
+        zobrist = game_state.zobrist
+        game_state.zobrist = None
+
+        if self.simulation_heuristics:
+            choose_move = lambda possible_moves: self.determineSimulationMove(possible_moves, False, True, True, True)
+        else:
+            choose_move = lambda possible_moves: self.determineSimulationMove(possible_moves, True, False, False, False)
+
+        estimate = None
+        try:
+            winner, boss_bonus, surviving_turns, stuck = playout(game_state, undo_records, choose_move, self.rollout_cutoff, self.boss_cutoff)
 
-            # redundant conditions but kept for readability
-            elif winner == Result.LOSS or winner == Result.WIN: # i.e not ALIVE or BOSS_DEFEATED
-                self.calculateResult(winner, boss_bonus, surviving_turns, diamond_check)
-                self.end_state = False
-                self.setGameState(game_state_copy, game_action_copy)
-                return
+            # NOTE - a cut off rollout is scored before its moves are undone
+            if winner == Result.ALIVE or winner == Result.BOSS_DEFEATED:
+                estimate = evaluatePosition(game_state)
+        finally:
+            for record in reversed(undo_records):
+                game_state.undo(record)
+            game_state.zobrist = zobrist
 
-    def Backpropagate(self, result):
-        self.ranking += result
-        self.visits += 1
+        rollout_end = perf_counter()
+
+        # NOTE - end the simulation immediately if the players lose thanks to the initial expansion move
+        if stuck:
+            rewards = calculateRewards(Result.LOSS, self.depth, boss_bonus, surviving_turns, rewards=self.rewards)
+        else:
+            rewards = calculateRewards(winner, self.depth, boss_bonus, surviving_turns, diamond_check, self.rewards, estimate)
+
+        if stats:
+            if estimate is not None:
+                stats.rollout_cutoffs += 1
+            stats.determinization_time += determinization_end - start_time
+            stats.determinization_calls += 1
+            stats.rollout_time += rollout_end - determinization_end
+            stats.rollout_calls += 1
+            stats.rollout_moves += rolloutLength((winner, boss_bonus, surviving_turns, stuck))
+
+        return rewards
+
+    # NOTE - result can be the sum of count rewards - every reward counts as a visit (see Simulate() with a leaf pool)
+    def Backpropagate(self, result, count = 1):
+        if self.twins:
+            for twin in self.twins:
+                twin.ranking += result
+                twin.visits += count
+        else:
+            self.ranking += result
+            self.visits += count
 
         if self.parent:
-            self.parent.Backpropagate(result)
+            self.parent.Backpropagate(result, count)
 
     # tree functions
     def findHighestRankingChild(self):
@@ -233,21 +432,9 @@ class RegicideNode(Node):
 
         return self.branches[max_index]
 
-    def calculateResult(self, winner, boss_bonus = 0, surviving_turns = 0, diamond_check = False):
-        # CONFIG - Any end state that results in a win is dramatically prioritised
-        reward = 1000000000
-        # CONFIG - AI is impartial to losses - only considering  the defeating of bosses
-        punishment = 0
-        if winner == Result.WIN:
-            # CONFIG - Don't need to add boss bonus since reward is so high
-            self.Backpropagate(reward)
-        elif winner == Result.LOSS:
-            # CONFIG - Heavily punish moves that result in instant death or that immediately leave players with no diamonds.
-            if (surviving_turns == 0 and self.depth == 1) or (diamond_check and self.depth == 1):
-                punishment = -1000000000
-                self.Backpropagate(punishment)
-
-            self.Backpropagate(punishment + boss_bonus + surviving_turns)
+    def calculateResult(self, winner, boss_bonus = 0, surviving_turns = 0, diamond_check = False, estimate = None):
+        for result in calculateRewards(winner, self.depth, boss_bonus, surviving_turns, diamond_check, self.rewards, estimate):
+            self.Backpropagate(result)
         return
 
     def resetNode(self):
@@ -257,151 +444,181 @@ class RegicideNode(Node):
         self.depth = 0
         self.available_moves = []
 
-    # heuristic functions
-    # NOTE - both determineExpansionMove() and determineSimulationMove() could be abstracted into one method
-    def determineExpansionMove(self, random_check = False, combo_check = False, suit_check = False, duplicate_check = False):
-        # NOTE - move is default set to first move in list
-        move = self.available_moves[0]
+    # returns the branch reached by playing action - None if that move was never expanded
+    def findChild(self, action):
+        for child in self.branches:
+            if child.game_action == action:
+                return child
+        return None
+
+    # turns this node into the root of the search for the real game state - used to reuse a subtree between turns
+    # NOTE - the node's state was only a sample of what the move could lead to (random discards, diamond draws)
+    #  so it's replaced with the real state, branches that aren't legal anymore are dropped and their statistics go with them
+    # NOTE - every node below was expanded on the old sample too - their boards are rebuilt from the real state one level
+    #  at a time as the next searches select them (see refreshBranches())
+    def reRoot(self, state):
+        self.parent = None
+        self.replaceState(state)
+
+        # calculateResult() relies on depth (depth 1 = move made from the root) so the whole subtree is shifted up
+        # NOTE - transposition keys include the depth so nodes stop sharing statistics - growTree() starts a new table
+        shift = self.depth
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            node.depth -= shift
+            node.transpositions = None
+            node.twins = None
+            stack += node.branches
+
+    # unlinks every node of the subtree so reference counting frees it as soon as it's dropped
+    # NOTE - parent <-> branches links and transposition twins (and the table) are reference cycles - without this a dropped
+    #  tree waits for the cyclic garbage collector, which is paused while a search runs (see runIterations())
+    def release(self):
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            stack += node.branches
+            node.branches = []
+            node.parent = None
+            node.twins = None
+            node.transpositions = None
+
+    # gives the node a new board - its legal moves are generated again and branches that aren't legal on it are dropped
+    # NOTE - the remaining branches keep their statistics but their boards are out of date until refreshBranches()
+    def replaceState(self, state):
+        self.end_state = False
+        self.setGameState(state, self.game_action)
 
-        if random_check:
-            random_index = random.randint(0, len(self.available_moves) - 1)
-            move = self.available_moves[random_index]
-            return move
-
-        # turn on combo check if duplicate check is on
-        if duplicate_check:
-            combo_check = True
-
-        # create list of combos
-        combos = []
-        if combo_check:
-            if len(self.available_moves) > 1:
-                for move in self.available_moves:
-                    if move:
-                        if len(move) > 1:
-                            combos.append(move)
-
-        # create list of moves with suit that isn't the same as the current boss
-        other_suit = []
-        if suit_check:
-            if len(self.available_moves) > 1:
-                for move in self.available_moves:
-                    if move:
-                        other_suit_check = True
-                        for card in move:
-                            if card.suit == self.game_state.castle.boss.suit:
-                                other_suit_check = False
-                        if other_suit_check:
-                            other_suit.append(move)
-
-        # create list of combos that don't have duplicate suit types
-        # NOTE - edits already made combo list
-        duplicates = []
-        if duplicate_check:
-            for move in combos:
-                duplicate = False
-                for card in move:
-                    move_copy = deepcopy(move)
-                    move_copy.remove(card)
-                    for other_card in move_copy:
-                        if card.suit == other_card.suit and card.suit != other_card.suit:
-                            duplicate = True
-                if duplicate:
-                    duplicates.append(move)
-
-            combos = [move for move in combos if move not in duplicates]
-
-        # combine lists if multiple checks are on
-        if suit_check and combo_check:
-            moves = [move for move in self.available_moves if move in combos and move in other_suit]
-        elif combo_check:
-            moves = combos
-        elif suit_check:
-            moves = other_suit
-        else:
-            moves = self.available_moves
+        legal_plays = self.game_state.legalPlays(self.game_state.players[self.active_player].hand)
+        if self.end_state:
+            legal_plays = ()
+        self.branches = [child for child in self.branches if child.game_action in legal_plays]
 
-        # prioritise heuristic plays first - default to a random move as a redundancy
-        if len(moves) > 0:
-            random_move = random.randint(0, len(moves) - 1)
-            move = moves[random_move]
+        # NOTE - moves that already have a branch aren't expanded again
+        expanded = [child.game_action for child in self.branches]
+        if self.progressive_widening:
+            self.available_moves = []
+            self.move_generator = randomOrder([move for move in legal_plays if move not in expanded])
         else:
-            random_move = random.randint(0, len(self.available_moves) - 1)
-            move = self.available_moves[random_move]
+            self.available_moves = [move for move in legal_plays if move not in expanded]
 
-        return move
+        self.stale_branches = len(self.branches) > 0
 
-    def determineSimulationMove(self, possible_moves, random_check = False, combo_check = False, suit_check = False, duplicate_check = False):
-        try:
-            move = possible_moves[0]
-        except:
-            raise Exception('possible_moves is not a list!')
+    # rebuilds every branch's board by playing its move on this node's board - called the first time the node is selected
+    #  after a re-root, so only the part of the old tree the search goes back to is replayed
+    # NOTE - the move plays out with new random discards and draws - a branch keeps its statistics from the old sample
+    def refreshBranches(self):
+        self.stale_branches = False
+        for child in self.branches:
+            state = self.game_state.clone()
+            state.nextState(child.game_action, True)
+            child.replaceState(state)
 
-        # NOTE - If random_check is True - all other heuristics are overridden
+    # heuristic functions
+    # NOTE - both pick a random move out of the heuristic ones (see ISMCTS/Game/heuristic_kernel.py) - random_check overrides
+    #  every other check and duplicate_check only turns combo_check on (it never removed a combo - see heuristicKernel())
+    def determineExpansionMove(self, random_check = False, combo_check = False, suit_check = False, duplicate_check = False):
         if random_check:
-            random_index = random.randint(0, len(possible_moves) - 1)
-            move = possible_moves[random_index]
-            return move
-
-        # turn on combo check if duplicate check is on
-        if duplicate_check:
-            combo_check = True
-
-        # create list of combos
-        combos = []
-        if combo_check:
-            if len(possible_moves) > 1:
-                for move in possible_moves:
-                    if move:
-                        if len(move) > 1:
-                            combos.append(move)
-
-        # create list of moves with suit that isn't the same as the current boss
-        other_suit = []
-        if suit_check:
-            if len(possible_moves) > 1:
-                for move in possible_moves:
-                    if move:
-                        other_suit_check = True
-                        for card in move:
-                            if card.suit == self.game_state.castle.boss.suit:
-                                other_suit_check = False
-                        if other_suit_check:
-                            other_suit.append(move)
-
-        # create list of combos that don't have duplicate suit types
-        # NOTE - edits already made combo list
-        duplicates = []
-        if duplicate_check:
-            for move in combos:
-                duplicate = False
-                for card in move:
-                    move_copy = deepcopy(move)
-                    move_copy.remove(card)
-                    for other_card in move_copy:
-                        if card.suit == other_card.suit and card.suit != other_card.suit:
-                            duplicate = True
-                if duplicate:
-                    duplicates.append(move)
-
-            combos = [move for move in combos if move not in duplicates]
-
-        # combine lists if multiple checks are on
-        if suit_check and combo_check:
-            moves = [move for move in possible_moves if move in combos and move in other_suit]
-        elif combo_check:
-            moves = combos
-        elif suit_check:
-            moves = other_suit
-        else:
-            moves = possible_moves
+            return chooseMove(self.available_moves)
 
-        # prioritise heuristic plays first - default to a random move as a redundancy
-        if len(moves) > 0:
-            random_index = random.randint(0, len(moves) - 1)
-            move = moves[random_index]
-        else:
-            random_index = random.randint(0, len(possible_moves) - 1)
-            move = possible_moves[random_index]
+        # NOTE - a node's moves change as it expands so their features are worked out here - it's once per iteration
+        features = [moveFeatures(move) for move in self.available_moves]
+        wanted = wantedMoves(features, self.game_state.castle.boss.suit, combo_check or duplicate_check, suit_check)
+        return chooseMove(self.available_moves, wanted)
 
-        return move
\ No newline at end of file
+    # NOTE - possible_moves are the legal plays of the player to move (see playout()) so their cached wanted moves are used
+    def determineSimulationMove(self, possible_moves, random_check = False, combo_check = False, suit_check = False, duplicate_check = False):
+        if len(possible_moves) == 0:
+            raise Exception('possible_moves is not a list!')
+
+        if random_check:
+            return chooseMove(possible_moves)
+
+        game_state = self.game_state
+        hand = game_state.players[game_state.currentPlayer()].hand
+        wanted = wantedPlays(game_state, hand, game_state.castle.boss.suit, combo_check or duplicate_check, suit_check)
+        return chooseMove(possible_moves, wanted)
+
+# the moves in a random order - drawn one at a time (Fisher-Yates from the back) so the moves a node never expands cost nothing
+# NOTE - plays is copied on the first draw - legalPlays() returns a shared tuple
+def randomOrder(plays):
+    plays = list(plays)
+    for last in range(len(plays) - 1, -1, -1):
+        index = random.randint(0, last)
+        plays[index], plays[last] = plays[last], plays[index]
+        yield plays[last]
+
+# plays a random game from game_state until it's won or lost - every nextState() undo record is added to undo_records
+# NOTE - choose_move picks a move from the list of legal plays (random or heuristic)
+#  returns (winner, boss_bonus, surviving_turns, stuck) - stuck is True if a player ran out of legal plays
+# NOTE - the game is cut off after max_moves moves (None for no limit) or once a boss falls (boss_cutoff) - winner is
+#  then Result.ALIVE or Result.BOSS_DEFEATED and game_state is left where the rollout stopped
+def playout(game_state, undo_records, choose_move, max_moves=None, boss_cutoff=False):
+    boss_bonus = 0
+    surviving_turns = 0
+
+    while max_moves is None or surviving_turns < max_moves:
+        possible_moves = game_state.legalPlays(game_state.players[game_state.currentPlayer()].hand)
+
+        if len(possible_moves) == 0:
+            return Result.LOSS, boss_bonus, surviving_turns, True
+
+        move = choose_move(possible_moves)
+
+        # NOTE - Band-aid fix - if move isn't a list - turn it into a list
+        try:
+            length = len(move)
+        except TypeError:
+            if move:
+                move = [move]
+
+        undo_records.append(game_state.nextState(move, True, undo=True))
+
+        winner = game_state.winner()
+
+        if winner == Result.ALIVE:
+            surviving_turns += 1
+
+        elif winner == Result.BOSS_DEFEATED:
+            surviving_turns += 1
+            boss_bonus += 1
+
+            if boss_cutoff:
+                return winner, boss_bonus, surviving_turns, False
+
+        # redundant conditions but kept for readability
+        elif winner == Result.LOSS or winner == Result.WIN: # i.e not ALIVE or BOSS_DEFEATED
+            return winner, boss_bonus, surviving_turns, False
+
+    return Result.ALIVE, boss_bonus, surviving_turns, False
+
+# number of moves a rollout played - every move adds a surviving turn except the one that ended the game
+def rolloutLength(result):
+    winner, boss_bonus, surviving_turns, stuck = result
+    if stuck or winner == Result.ALIVE or winner == Result.BOSS_DEFEATED:
+        return surviving_turns
+    return surviving_turns + 1
+
+# takes the end of a simulation and returns the list of results to backpropagate from a node at the given depth
+# NOTE - a heavily punished loss is backpropagated twice (the punishment on its own then the normal result)
+# NOTE - rewards is (win reward, loss punishment, instant loss punishment) - see REWARDS
+# NOTE - estimate is evaluatePosition() of where a cut off rollout stopped - the rollout is scored like a loss that still
+#  had estimate bosses and turns to come (winner is Result.ALIVE or Result.BOSS_DEFEATED)
+def calculateRewards(winner, depth, boss_bonus = 0, surviving_turns = 0, diamond_check = False, rewards = None, estimate = None):
+    reward, punishment, instant_punishment = rewards if rewards else REWARDS
+    if estimate is not None and winner != Result.WIN and winner != Result.LOSS:
+        winner = Result.LOSS
+        surviving_turns += estimate
+
+    if winner == Result.WIN:
+        # CONFIG - Don't need to add boss bonus since reward is so high
+        return [reward]
+    elif winner == Result.LOSS:
+        # CONFIG - Heavily punish moves that result in instant death or that immediately leave players with no diamonds.
+        if (surviving_turns == 0 and depth == 1) or (diamond_check and depth == 1):
+            punishment = instant_punishment
+            return [punishment, punishment + boss_bonus + surviving_turns]
+
+        return [punishment + boss_bonus + surviving_turns]
+    return []
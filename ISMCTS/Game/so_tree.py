@@ -0,0 +1,316 @@
+# REFERENCE - Cowling, Powley & Whitehouse (2012) - Information Set Monte Carlo Tree Search (SO-ISMCTS)
+# REFERENCE - https://github.com/melvinzhang/ismcts/blob/master/ISMCTS.py
+# REFERENCE - https://docs.python.org/3/library/array.html
+
+# External Imports
+import random
+from array import array
+from math import sqrt
+from math import log
+from math import inf
+
+# Internal Imports
+from Game.Regicide.regicide_board import Result
+from ISMCTS.Game.regicide_node import RegicideNode
+from ISMCTS.Game.regicide_node import playout
+from ISMCTS.Game.regicide_node import calculateRewards
+from ISMCTS.Game.array_tree import YIELD_MOVE
+from ISMCTS.Game.array_tree import moveId
+from ISMCTS.Game.array_tree import moveFromId
+from ISMCTS.Game.heuristic_kernel import chooseMove
+from ISMCTS.Game.heuristic_kernel import moveFeatures
+from ISMCTS.Game.heuristic_kernel import wantedMoves
+
+# Single observer ISMCTS (SO-ISMCTS) with state-free nodes
+# every iteration determinizes one working board at the root (for the player the search is for) and walks the tree down
+# by playing the edge moves on it - the tree, selection, expansion and the rollout all see the same sample of the hidden
+# cards, and no node ever sees the real hands of the other players
+# NOTE - a node is one row of a set of columns - move id, visits, reward sum, availability, parent and the first child and
+#  next sibling links (44 bytes) - a node's children are a linked list since a determinization can make a move legal
+#  that no earlier one did, so children are added one at a time
+# NOTE - the working board is determinized with randomize() and every move is played with an undo record - everything is
+#  undone after the iteration so the board is never copied (cloneAndRandomize() without the clone)
+# NOTE - availability counts the iterations a child's move was legal when its parent was selected from - UCB explores by
+#  it instead of the parent's visits (a child that's rarely legal isn't punished for being picked rarely)
+class SOTree:
+    def __init__(self, state, selection_heuristics=False, UCT_exploration=0.7, expansion_heuristics=False, simulation_heuristics=False, rewards=None, chunk=4096):
+        self.board = state.clone()
+        self.observer = state.currentPlayer()
+        self.selection_heuristics = selection_heuristics
+        self.UCT_exploration = UCT_exploration
+        self.expansion_heuristics = expansion_heuristics
+        self.simulation_heuristics = simulation_heuristics
+        self.rewards = rewards # NOTE - None is calculateRewards()' default REWARDS
+        self.chunk = chunk
+        self.search_stats = None # set by growSOTree()
+
+        self.size = 0
+        self.capacity = 0
+
+        self.visits = array("q")
+        self.reward = array("d")
+        self.available = array("q")
+        self.parent = array("i")
+        self.first_child = array("i")
+        self.next_sibling = array("i")
+        self.move = array("q")
+
+        # NOTE - rollout moves are picked by the same heuristics RegicideNode uses - the policy node only ever reads self.board
+        self.policy = RegicideNode()
+        self.policy.game_state = self.board
+
+        self.addChild(-1, None) # root
+
+    # grows every column by one chunk
+    def grow(self):
+        self.visits.extend([0] * self.chunk)
+        self.reward.extend([0.0] * self.chunk)
+        self.available.extend([0] * self.chunk)
+        self.parent.extend([0] * self.chunk)
+        self.first_child.extend([-1] * self.chunk)
+        self.next_sibling.extend([-1] * self.chunk)
+        self.move.extend([0] * self.chunk)
+        self.capacity += self.chunk
+
+    # adds a child playing move to the front of parent's children and returns it
+    # NOTE - a new child is available from the iteration that expands it
+    def addChild(self, parent, move):
+        if self.size == self.capacity:
+            self.grow()
+
+        node = self.size
+        self.size += 1
+
+        self.parent[node] = parent
+        self.move[node] = moveId(move)
+        self.available[node] = 1
+
+        if parent >= 0:
+            self.next_sibling[node] = self.first_child[parent]
+            self.first_child[parent] = node
+
+        return node
+
+    # children of node whose move is legal on the working board and the legal moves without a child yet
+    def splitChildren(self, node, legal_plays):
+        legal_ids = {moveId(move): move for move in legal_plays}
+
+        children = []
+        child = self.first_child[node]
+        while child >= 0:
+            if legal_ids.pop(self.move[child], False) is not False:
+                children.append(child)
+            child = self.next_sibling[child]
+
+        return children, list(legal_ids.values())
+
+    # UCB over the legal children of node - exploration by availability rather than the parent's visits
+    def selectUCB(self, children):
+        exploration = self.UCT_exploration
+
+        max_rank = -inf
+        selection = children[0]
+        for child in children:
+            visits = self.visits[child]
+            rank = self.reward[child] / visits + exploration * sqrt(log(self.available[child]) / visits)
+            if rank > max_rank:
+                max_rank = rank
+                selection = child
+        return selection
+
+    # same heuristics as RegicideNode.determineExpansionMove()
+    def expansionMove(self, moves):
+        if not self.expansion_heuristics:
+            return chooseMove(moves)
+
+        features = [moveFeatures(move) for move in moves]
+        return chooseMove(moves, wantedMoves(features, self.board.castle.boss.suit, True, True))
+
+    # one determinize -> Select -> Expand -> Simulate -> Backpropagate iteration - returns False on a dud run (nothing expanded)
+    def iterate(self):
+        board = self.board
+        undo_records = [board.randomize(self.observer, True)]
+        path = [0]
+        node = 0
+
+        try:
+            while True:
+                legal_plays = board.legalPlays(board.players[board.currentPlayer()].hand)
+
+                if len(legal_plays) == 0:
+                    return False
+
+                children, untried = self.splitChildren(node, legal_plays)
+
+                if untried:
+                    # Expand - a random move of this determinization that hasn't been tried from node
+                    move = self.expansionMove(untried)
+                    child = self.addChild(node, move)
+                    undo_records.append(board.nextState(move, True, undo=True))
+                    path.append(child)
+                    self.Simulate(board, path, undo_records)
+                    return True
+
+                # Select - every legal child was available this iteration whichever one is picked
+                for child in children:
+                    self.available[child] += 1
+
+                if self.selection_heuristics:
+                    child = self.selectUCB(children)
+                else:
+                    child = children[random.randint(0, len(children) - 1)]
+
+                undo_records.append(board.nextState(moveFromId(self.move[child]), True, undo=True))
+                path.append(child)
+                node = child
+
+                winner = board.winner()
+                if winner == Result.WIN or winner == Result.LOSS:
+                    # NOTE - a terminal node is only simulated once (like RegicideNode) - after that it's a dud
+                    return False
+        finally:
+            for record in reversed(undo_records):
+                board.undo(record)
+
+    # plays the rollout on from the expanded child (last node on the path) and backpropagates the results
+    # NOTE - the board is already determinized - the rollout carries on with the iteration's sample
+    def Simulate(self, board, path, undo_records):
+        depth = len(path) - 1
+        winner = board.winner()
+
+        if winner == Result.WIN or winner == Result.LOSS:
+            self.Backpropagate(path, calculateRewards(winner, depth, rewards=self.rewards))
+            return
+
+        diamond_check = board.diamondCheck()
+
+        if self.simulation_heuristics:
+            choose_move = lambda possible_moves: self.policy.determineSimulationMove(possible_moves, False, True, True, True)
+        else:
+            choose_move = lambda possible_moves: self.policy.determineSimulationMove(possible_moves, True, False, False, False)
+
+        winner, boss_bonus, surviving_turns, stuck = playout(board, undo_records, choose_move)
+
+        if stuck:
+            self.Backpropagate(path, calculateRewards(Result.LOSS, depth, boss_bonus, surviving_turns, rewards=self.rewards))
+        else:
+            self.Backpropagate(path, calculateRewards(winner, depth, boss_bonus, surviving_turns, diamond_check, self.rewards))
+
+    def Backpropagate(self, path, results):
+        total = sum(results)
+        count = len(results)
+        for node in path:
+            self.visits[node] += count
+            self.reward[node] += total
+
+    # returns the move of the root child with the highest average reward
+    # NOTE - the observer's own hand is never determinized so every root child is legal on the real board
+    def findHighestRankingAction(self):
+        max_ranking = -inf
+        best = -1
+        child = self.first_child[0]
+        while child >= 0:
+            if self.visits[child] > 0:
+                rank = self.reward[child] / self.visits[child]
+                if rank > max_ranking:
+                    max_ranking = rank
+                    best = child
+            child = self.next_sibling[child]
+
+        if best < 0:
+            raise Exception("Error: 'findHighestRankingAction()' called before any root child was visited!")
+
+        return moveFromId(self.move[best])
+
+    # (move, reward sum, visits) for every root child - same shape as ArrayTree.rootChildren()
+    def rootChildren(self):
+        children = []
+        child = self.first_child[0]
+        while child >= 0:
+            children.append((moveFromId(self.move[child]), self.reward[child], self.visits[child]))
+            child = self.next_sibling[child]
+        return children
+
+    # fills stats once the search is done - tree size, depth and the visit distribution of the root (see SearchStats.finish())
+    # NOTE - the phases aren't timed so their times and calls stay at 0
+    def finishStats(self, stats, run_count, dud_runs, elapsed):
+        stats.run_count = run_count
+        stats.dud_runs = dud_runs
+        stats.elapsed = elapsed
+
+        # NOTE - a child is always added after its parent so every parent's depth is known by the time its children are reached
+        depths = [0] * self.size
+        for node in range(1, self.size):
+            depths[node] = depths[self.parent[node]] + 1
+        stats.tree_size = self.size
+        stats.max_depth = max(depths)
+
+        stats.root_visits = [(move, visits, reward / visits) for move, reward, visits in self.rootChildren() if visits > 0]
+
+    # bytes used by the node columns (allocated capacity, not just used rows)
+    def memoryUsage(self):
+        return sum(column.itemsize * len(column) for column in [self.visits, self.reward, self.available, self.parent, self.first_child, self.next_sibling, self.move])
+
+# testing function
+def soTree():
+    import time
+    import tracemalloc
+    from Game.Regicide.regicide_board import RegicideBoard
+    from ISMCTS.search import growTree
+
+    random.seed(0)
+    state = RegicideBoard()
+    state.start(3)
+    seat = state.currentPlayer()
+    hands = [player.hand.mask for player in state.players]
+
+    tree = SOTree(state, selection_heuristics=True, chunk=1024)
+    start_time = time.perf_counter()
+    dud_runs = 0
+    for run in range(1000):
+        if not tree.iterate():
+            dud_runs += 1
+    so_time = time.perf_counter() - start_time
+
+    action = tree.findHighestRankingAction()
+    assert action in state.legalPlays(state.players[seat].hand), "SO-ISMCTS picked an illegal move!"
+    assert [player.hand.mask for player in tree.board.players] == hands, "Working board should be put back after every iteration!"
+    assert tree.visits[0] == sum(visits for move, reward, visits in tree.rootChildren()), "Root visits should be the sum of its children's!"
+
+    # every child is linked to its parent and was available every time it was visited
+    # NOTE - an instant loss backs up two results so a visit through a node adds at most two visits
+    for node in range(1, tree.size):
+        assert 1 <= tree.available[node] and tree.visits[node] <= 2 * tree.available[node], "Availability out of date!"
+        child = tree.first_child[tree.parent[node]]
+        while child != node:
+            assert child >= 0, "Node missing from its parent's children!"
+            child = tree.next_sibling[child]
+
+    # nodes below the root are added one determinization at a time - moves the root player can't know about show up as
+    #  siblings instead of being fixed by the real hands
+    depth_two = set()
+    child = tree.first_child[0]
+    while child >= 0:
+        grandchild = tree.first_child[child]
+        while grandchild >= 0:
+            depth_two.add(tree.move[grandchild])
+            grandchild = tree.next_sibling[grandchild]
+        child = tree.next_sibling[child]
+    next_hand = state.players[(seat + 1) % 3].hand.mask
+    assert any(move != YIELD_MOVE and move & ~next_hand for move in depth_two), "Opponent moves should come from determinizations!"
+
+    # a state-free node against a RegicideNode that keeps its own board
+    tracemalloc.start()
+    root_node, run_count, node_duds, elapsed = growTree(state, 300, inf)
+    node_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    nodes = root_node.search_stats.tree_size
+
+    print("SO-ISMCTS: {:.0f} runs/s | {} nodes | {:.0f} bytes per node | RegicideNode: ~{:.0f} bytes per node".format(
+        1000 / so_time, tree.size, tree.memoryUsage() / tree.capacity, node_bytes / nodes))
+
+    assert tree.memoryUsage() / tree.capacity <= 48, "Nodes should only keep their statistics!"
+
+if __name__ == "__main__":
+    soTree()
+    print("Everything Passed!")
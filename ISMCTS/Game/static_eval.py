@@ -0,0 +1,113 @@
+# REFERENCE - https://www.chessprogramming.org/Evaluation
+# REFERENCE - https://en.wikipedia.org/wiki/Linear_regression
+
+# External Imports
+import random
+
+# Internal Imports
+from Cards.Base.card_set import SUIT_MASKS
+from Cards.Base.card_set import healthOf
+from Game.Regicide.regicide_board import Result
+
+# Static evaluation of a Regicide position - what a random rollout would still score from it (bosses defeated + turns survived)
+# used to cut rollouts short (see RegicideNode.Simulate()) - the estimate is added to what the rollout scored before the cutoff
+# so a cut off rollout is scored on the same scale as calculateRewards() gives a lost game
+# NOTE - the weights are a least squares fit of ~29000 positions from random rollouts of 2-4 player games to what those rollouts
+#  went on to score (mean absolute error 3.6 against 4.5 for the mean on its own) - refit them if the rollout policy changes
+
+# CONFIG - weight of every feature of a position
+EVAL_BIAS = -3.68
+HAND_HEALTH_WEIGHT = 0.09 # sum of the ranks in every hand
+DIAMOND_WEIGHT = 0.74 # diamonds in hands - each one refills hands later on
+TAVERN_WEIGHT = 0.05 # cards left to draw
+BOSS_HEALTH_WEIGHT = -0.03
+BOSS_ATTACK_WEIGHT = -0.04
+CASTLE_WEIGHT = 0.80 # bosses left after the one in play - every one is at least a boss bonus and a few turns away
+PLAYER_WEIGHT = -2.32 # smaller hands per player
+SURVIVOR_WEIGHT = 0.17 # players whose hand can block the boss's attack
+
+DIAMONDS = SUIT_MASKS["D"]
+
+# estimated score still to come from state - never negative, the game can end on the next move
+# NOTE - only the cards in hands and the size of each pile are read so it costs about as much as a couple of rollout moves
+def evaluatePosition(state):
+    boss = state.castle.boss
+    if boss is None:
+        return 0.0
+
+    hands = 0
+    survivors = 0
+    for player in state.players:
+        mask = player.hand.mask
+        hands |= mask
+        if healthOf(mask) > boss.attack:
+            survivors += 1
+
+    estimate = (EVAL_BIAS
+                + HAND_HEALTH_WEIGHT * healthOf(hands)
+                + DIAMOND_WEIGHT * (hands & DIAMONDS).bit_count()
+                + TAVERN_WEIGHT * state.tavern.cards.mask.bit_count()
+                + BOSS_HEALTH_WEIGHT * boss.health
+                + BOSS_ATTACK_WEIGHT * boss.attack
+                + CASTLE_WEIGHT * len(state.castle.cards)
+                + PLAYER_WEIGHT * len(state.players)
+                + SURVIVOR_WEIGHT * survivors)
+
+    return max(0.0, estimate)
+
+# testing function - the evaluation should follow what full random rollouts go on to score
+def staticEval():
+    from time import perf_counter
+    from Game.Regicide.regicide_board import RegicideBoard
+
+    random.seed(5)
+    estimates = []
+    scores = []
+    eval_time = 0.0
+    for game in range(300):
+        board = RegicideBoard()
+        board.start(2 + game % 3)
+
+        # NOTE - a position is sampled every few moves of a random rollout and scored by how the rollout carries on
+        positions = []
+        score = 0
+        while True:
+            plays = board.legalPlays(board.players[board.currentPlayer()].hand)
+            if not plays:
+                break
+
+            if len(positions) < 3 and random.random() < 0.2:
+                start_time = perf_counter()
+                estimate = evaluatePosition(board)
+                eval_time += perf_counter() - start_time
+                positions.append((estimate, score))
+
+            board.nextState(random.choice(plays), True)
+            winner = board.winner()
+            if winner == Result.ALIVE:
+                score += 1
+            elif winner == Result.BOSS_DEFEATED:
+                score += 2
+            else:
+                break
+
+        for estimate, before in positions:
+            assert estimate >= 0, "Estimate can't be negative!"
+            estimates.append(estimate)
+            scores.append(score - before)
+
+    count = len(estimates)
+    mean_estimate = sum(estimates) / count
+    mean_score = sum(scores) / count
+    error = sum(abs(estimate - score) for estimate, score in zip(estimates, scores)) / count
+    baseline = sum(abs(mean_score - score) for score in scores) / count
+
+    print("Positions: {} | Mean Estimate: {:.2f} | Mean Score: {:.2f} | Error: {:.2f} (mean only {:.2f}) | {:.2f}us per evaluation".format(
+        count, mean_estimate, mean_score, error, baseline, eval_time / count * 1000000))
+
+    assert abs(mean_estimate - mean_score) < 1.5, "Evaluation is off the scale of a rollout!"
+    assert error < baseline, "Evaluation should beat guessing the mean score!"
+
+if __name__ == "__main__":
+    staticEval()
+    print("Everything Passed!")
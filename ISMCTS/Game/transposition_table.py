@@ -0,0 +1,42 @@
+# REFERENCE - https://www.chessprogramming.org/Transposition_Table
+# REFERENCE - Childs, Brodeur & Kocsis (2008) - Transpositions and Move Groups in Monte Carlo Tree Search
+
+# Transposition table for RegicideNode - nodes whose information set hash (and depth) match share their statistics
+# NOTE - nodes keep their own branches, only ranking and visits are shared - every node with the same key is kept in a
+#  'twins' list and Backpropagate() adds each result to every twin so they always hold the same values
+class TranspositionTable:
+    def __init__(self):
+        self.entries = {}
+        self.lookups = 0
+        self.hits = 0
+
+    # registers a newly expanded node - if its information set has been reached before it takes on the existing statistics
+    def share(self, node, key):
+        self.lookups += 1
+        key = (node.depth, key) # NOTE - rewards depend on depth so equal hashes at different depths aren't shared
+
+        twins = self.entries.get(key)
+        if twins is None:
+            twins = []
+            self.entries[key] = twins
+        else:
+            self.hits += 1
+            node.ranking = twins[0].ranking
+            node.visits = twins[0].visits
+
+        twins.append(node)
+        node.twins = twins
+
+    # NOTE - every hit is a node that didn't need statistics of its own (lookups - entries)
+    def hitRate(self):
+        if self.lookups == 0:
+            return 0.0
+        return self.hits / self.lookups
+
+    def stats(self):
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "entries": len(self.entries),
+            "hit_rate": self.hitRate()
+        }
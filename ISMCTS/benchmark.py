@@ -0,0 +1,248 @@
+# REFERENCE - https://docs.python.org/3/library/timeit.html
+# REFERENCE - https://docs.python.org/3/library/statistics.html
+# REFERENCE - https://docs.python.org/3/library/argparse.html#sub-commands
+
+# External Imports
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from math import inf
+
+# Internal Imports
+from Cards.Base.card import Card
+from Cards.Base.deck import Deck
+from Cards.Regicide.boss import Boss
+from Game.Regicide.regicide_board import RegicideBoard
+from Game.Regicide.regicide_board import generateLegalPlays
+from Game.Regicide.regicide_board import legal_plays_cache
+from ISMCTS.search import growTree
+from ISMCTS.search import SearchBudget
+from ISMCTS.runner import createBoard
+from ISMCTS.runner import runGame
+
+# Microbenchmark suite - every benchmark reports operations per second over several repeats
+# results are written to a JSON baseline and compare flags anything that got slower than the threshold
+## python -m ISMCTS.benchmark run --out Logs/Benchmarks/baseline.json
+## python -m ISMCTS.benchmark compare Logs/Benchmarks/baseline.json --threshold 0.1
+
+# CONFIG - default file the baseline is written to and compared against
+BASELINE_PATH = "Logs/Benchmarks/baseline.json"
+
+# representative hands for legalPlays() - plain singles, combos, animal companions, four 2's and a single card
+HANDS = {
+    "singles": [Card(2, "S"), Card(13, "H"), Card(3, "D"), Card(5, "D"), Card(9, "C")],
+    "combos": [Card(2, "H"), Card(3, "H"), Card(13, "S"), Card(1, "H"), Card(3, "S"), Card(3, "D")],
+    "companions": [Card(2, "H"), Card(1, "S"), Card(13, "S"), Card(1, "H"), Card(3, "S"), Card(3, "D"), Card(10, "C")],
+    "twos": [Card(2, "H"), Card(2, "S"), Card(2, "D"), Card(2, "C"), Card(4, "H")],
+    "single": [Card(7, "D")]
+}
+
+# runs function number times per repeat and returns the operations per second of every repeat
+# NOTE - ops_per_call is for benchmarks where one call does many operations (e.g. a batch of search iterations)
+def measure(function, number, repeat, ops_per_call=1):
+    function() # warm up
+
+    rates = []
+    for run in range(repeat):
+        start_time = time.perf_counter()
+        for call in range(number):
+            function()
+        elapsed = time.perf_counter() - start_time
+        rates.append(number * ops_per_call / elapsed)
+
+    mean = statistics.mean(rates)
+    stdev = statistics.stdev(rates) if len(rates) > 1 else 0.0
+
+    return {
+        "ops_per_sec": mean,
+        "median": statistics.median(rates),
+        "stdev": stdev,
+        "rsd": stdev / mean if mean else 0.0, # relative standard deviation
+        "number": number,
+        "repeat": repeat,
+        "ops_per_call": ops_per_call,
+        "runs": rates
+    }
+
+# board where the current player is about to play a five of suit against a jack that doesn't block it
+# NOTE - the discard pile has cards for hearts and the hand isn't full for diamonds
+def suitPowerBoard(suit):
+    random.seed(0)
+    board = RegicideBoard()
+    board.start(2)
+
+    card = Card(5, suit)
+    for player in board.players:
+        if card in player.hand:
+            player.hand.remove(card)
+    if card in board.tavern.cards:
+        board.tavern.cards.remove(card)
+
+    hand = board.players[0].hand
+    hand.remove(hand[0])
+    hand.add(card)
+
+    for counter in range(10):
+        board.discard.addCards([board.tavern.drawCard()])
+
+    board.castle.boss = Boss(11, "S" if suit != "S" else "C")
+
+    return board, [card]
+
+# midgame board used by the clone/search benchmarks
+def midgameBoard(seed=0, num_players=3, turns=4):
+    board = createBoard(seed, num_players)
+    for turn in range(turns):
+        legal_plays = board.legalPlays(board.players[board.currentPlayer()].hand)
+        board.nextState(legal_plays[0], True)
+    return board
+
+def benchmarks(quick=False):
+    scale = 0.2 if quick else 1.0
+
+    def count(number):
+        return max(1, int(number * scale))
+
+    suite = []
+
+    # legalPlays() - through the cache and generated from scratch
+    for name, hand in HANDS.items():
+        board = RegicideBoard()
+        board.players = [None, None] # NOTE - only len(players) is read (yielding allowed)
+        mask = sum(1 << card.index for card in hand)
+        suite.append(("legalPlays.cached." + name, lambda board=board, hand=hand: board.legalPlays(hand), count(20000), 1))
+        suite.append(("legalPlays.generate." + name, lambda mask=mask: generateLegalPlays(mask, True), count(20000), 1))
+
+    # nextState() with each suit power (and yielding) - every move is undone so the board is the same each time
+    for suit in ["C", "D", "H", "S"]:
+        board, play = suitPowerBoard(suit)
+
+        def nextStateOp(board=board, play=play):
+            board.undo(board.nextState(play, True, undo=True))
+
+        suite.append(("nextState." + suit, nextStateOp, count(5000), 1))
+
+    board, play = suitPowerBoard("C")
+    suite.append(("nextState.yield", lambda board=board: board.undo(board.nextState(None, True, undo=True)), count(5000), 1))
+
+    board = midgameBoard()
+    suite.append(("cloneAndRandomize", lambda board=board: board.cloneAndRandomize(board.currentPlayer()), count(5000), 1))
+    suite.append(("Card", lambda: Card(7, "H"), count(50000), 1))
+    suite.append(("Deck.create", lambda: Deck().create(), count(5000), 1))
+
+    # one Select -> Expand -> Simulate -> Backpropagate iteration - a tree of 50 iterations is grown per call
+    board = midgameBoard()
+    suite.append(("search.iteration", lambda board=board: growTree(board, 50, inf), count(40), 50))
+
+    # fixed seed full game (2 players, 20 runs per move)
+    suite.append(("game.fixedSeed", lambda: runGame(0, 2, SearchBudget(max_runs=20, max_time=inf)), count(5), 1))
+
+    return suite
+
+# runs every benchmark (or only those whose name starts with one of only) and returns the results document
+def runBenchmarks(repeat=5, quick=False, only=None, verbose=True):
+    results = {}
+    for name, function, number, ops_per_call in benchmarks(quick):
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+
+        # NOTE - every benchmark starts from the same RNG state so runs are comparable
+        random.seed(0)
+        legal_plays_cache.clear()
+
+        results[name] = measure(function, number, repeat, ops_per_call)
+
+        if verbose:
+            print("{:<34} {:>14,.1f} ops/s  +/- {:>5.1f}%".format(name, results[name]["ops_per_sec"], results[name]["rsd"] * 100))
+
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "quick": quick
+        },
+        "results": results
+    }
+
+def saveResults(document, path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(document, file, indent=2)
+
+def loadResults(path):
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+# compares two results documents - returns (name, baseline ops/s, current ops/s, change, regressed) for every shared benchmark
+# NOTE - change is relative (0.1 = 10% faster) - a benchmark has regressed if it got slower by more than threshold
+# NOTE - the medians are compared so one slow repeat (e.g. another process waking up) doesn't fail the gate
+def compareResults(baseline, current, threshold=0.1):
+    rows = []
+    for name, base in baseline["results"].items():
+        if name not in current["results"]:
+            continue
+
+        base_rate = base["median"]
+        current_rate = current["results"][name]["median"]
+        change = current_rate / base_rate - 1 if base_rate else 0.0
+
+        rows.append((name, base_rate, current_rate, change, change < -threshold))
+
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Regicide engine and ISMCTS search.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the suite and write the results to a JSON baseline")
+    run_parser.add_argument("--out", default=BASELINE_PATH, help="file the results are written to")
+    run_parser.add_argument("--repeat", type=int, default=5, help="repeats per benchmark (used for the variance)")
+    run_parser.add_argument("--quick", action="store_true", help="fewer operations per repeat")
+    run_parser.add_argument("--only", nargs="*", default=None, help="only run benchmarks whose name starts with one of these")
+
+    compare_parser = commands.add_parser("compare", help="compare against a baseline - exits with 1 if anything regressed")
+    compare_parser.add_argument("baseline", nargs="?", default=BASELINE_PATH, help="baseline results file")
+    compare_parser.add_argument("--current", default=None, help="results file to compare (runs the suite if not given)")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="slowdown that counts as a regression (0.1 = 10%%)")
+    compare_parser.add_argument("--repeat", type=int, default=5, help="repeats per benchmark when running the suite")
+    compare_parser.add_argument("--quick", action="store_true", help="fewer operations per repeat when running the suite")
+    compare_parser.add_argument("--only", nargs="*", default=None, help="only run benchmarks whose name starts with one of these")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        document = runBenchmarks(args.repeat, args.quick, args.only)
+        saveResults(document, args.out)
+        print("Results written to", args.out)
+        return 0
+
+    baseline = loadResults(args.baseline)
+    if args.current:
+        current = loadResults(args.current)
+    else:
+        current = runBenchmarks(args.repeat, args.quick, args.only)
+        print()
+
+    rows = compareResults(baseline, current, args.threshold)
+    regressions = 0
+    for name, base_rate, current_rate, change, regressed in rows:
+        if regressed:
+            regressions += 1
+        print("{:<34} {:>14,.1f} -> {:>14,.1f} ops/s  {:>+7.1f}%{}".format(name, base_rate, current_rate, change * 100, "  REGRESSION" if regressed else ""))
+
+    print("{} benchmarks compared | {} regressed by more than {}%".format(len(rows), regressions, round(args.threshold * 100, 2)))
+
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+# REFERENCE - https://docs.python.org/3/library/multiprocessing.html#module-multiprocessing.pool
+# REFERENCE - Chaslot, Winands & van den Herik (2008) - Parallel Monte-Carlo Tree Search (leaf parallelization)
+
+# External Imports
+import random
+import multiprocessing
+
+# Internal Imports
+from ISMCTS.Game.regicide_node import RegicideNode
+from ISMCTS.Base.search_stats import SearchStats
+from Game.Regicide.regicide_board import RegicideBoard
+from Game.Regicide.regicide_action import ActionHistory
+
+# Leaf-parallel ISMCTS - the tree is grown in this process as usual but every expanded node plays its rollouts on a pool of
+# worker processes (each one its own determinization) and backs up their summed rewards in one pass
+# NOTE - only pays off when a rollout costs more than sending the board to the workers and back (~a full game rollout)
+# NOTE - the tree only grows one node per iteration - for more iterations per second use root parallelization (see ISMCTS/parallel.py)
+
+# CONFIG - rollouts every worker plays on a throwaway board when it starts (imports, legal plays and discard caches)
+WARMUP_ROLLOUTS = 50
+
+# worker start up - the engine modules are imported with this module so the caches are warmed up before the first job
+def warmWorker(rollouts):
+    board = RegicideBoard()
+    board.start(2)
+    leafWorker((board, 1, False, (False, None, None, False), rollouts, random.getrandbits(64)))
+
+# worker entry point - must be a module level function so the pool can pickle it
+# NOTE - returns (sum of rewards, number of rewards, rollouts, rollout moves, rollouts cut off)
+def leafWorker(job):
+    state, depth, diamond_check, settings, rollouts, seed = job
+
+    # NOTE - each job has an independent RNG stream otherwise every worker would play the same rollouts
+    random.seed(seed)
+
+    node = RegicideNode()
+    node.game_state = state
+    node.depth = depth
+    node.simulation_heuristics, rewards, node.rollout_cutoff, node.boss_cutoff = settings
+    if rewards:
+        node.rewards = rewards
+    node.search_stats = SearchStats()
+
+    total = 0
+    count = 0
+    for rollout in range(rollouts):
+        for result in node.rollout(diamond_check):
+            total += result
+            count += 1
+
+    stats = node.search_stats
+    return total, count, stats.rollout_calls, stats.rollout_moves, stats.rollout_cutoffs
+
+# a worker pool that plays rollouts rollouts for every Simulate() of the nodes it's set on (RegicideNode.leaf_pool)
+# NOTE - the caller owns the pool - close() it (or use it in a with block) once the searches are done
+class LeafPool:
+    def __init__(self, workers, rollouts=None, warmup=WARMUP_ROLLOUTS):
+        if workers < 1:
+            raise Exception("Leaf-parallel search needs at least one worker!")
+        if rollouts is None:
+            rollouts = workers
+        if rollouts < 1:
+            raise Exception("Every leaf needs at least one rollout!")
+
+        self.workers = workers
+        self.rollouts = rollouts
+        self.pool = multiprocessing.Pool(workers, initializer=warmWorker, initargs=(warmup,))
+
+    # one job per worker (fewer if there are fewer rollouts) - the rollouts are split as evenly as possible
+    # NOTE - seeds are drawn from the main RNG so seeded searches stay reproducible
+    def jobs(self, node, diamond_check):
+        # NOTE - rollouts only need the newest action of the history (winner() and the undo records) so the rest isn't sent
+        state = node.game_state.clone()
+        state.history = ActionHistory(state.last_action) if state.last_action else None
+        state.zobrist = None
+
+        settings = (node.simulation_heuristics, node.rewards, node.rollout_cutoff, node.boss_cutoff)
+        count = min(self.workers, self.rollouts)
+        return [(state, node.depth, diamond_check, settings, self.rollouts // count + (1 if job < self.rollouts % count else 0), random.getrandbits(64))
+                for job in range(count)]
+
+    # plays the node's rollouts on the workers - (sum of rewards, number of rewards, rollouts, rollout moves, rollouts cut off)
+    def simulate(self, node, diamond_check):
+        results = self.pool.map(leafWorker, self.jobs(node, diamond_check), chunksize=1)
+        return tuple(sum(values) for values in zip(*results))
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+# testing function
+def leafParallel():
+    import time
+    from ISMCTS.search import search
+    from ISMCTS.search import SearchBudget
+    from ISMCTS.search import SearchConfig
+
+    random.seed(0)
+    state = RegicideBoard()
+    state.start(3)
+    seat = state.currentPlayer()
+
+    with LeafPool(2, 6) as leaf_pool:
+        # a job plays the same rollouts wherever it runs
+        node = RegicideNode()
+        node.setGameState(state.clone())
+        node.setDepth(1)
+        jobs = leaf_pool.jobs(node, state.diamondCheck())
+        assert sum(job[4] for job in jobs) == 6 and len(jobs) == 2, "Rollouts should be split over the workers!"
+        assert leaf_pool.pool.map(leafWorker, jobs) == [leafWorker(job) for job in jobs], "Seeded jobs should play the same rollouts!"
+
+        # every expanded node is backed up once with every one of its rollouts
+        start_time = time.perf_counter()
+        decision = search(state, seat, SearchBudget(max_runs=40), SearchConfig(leaf_pool=leaf_pool, seed=1))
+        leaf_time = time.perf_counter() - start_time
+
+        stats = decision.stats
+        assert decision.action in state.legalPlays(state.players[seat].hand), "Leaf-parallel search picked an illegal move!"
+        assert stats.rollout_calls == 6 * (stats.run_count - stats.dud_runs), "Every expanded node should play 6 rollouts!"
+        assert stats.backprop_calls == stats.run_count - stats.dud_runs, "Rollouts should be backed up in one pass!"
+        assert sum(visits for action, visits, mean in stats.root_visits) >= stats.rollout_calls, "Every rollout should be a visit!"
+
+    start_time = time.perf_counter()
+    serial = search(state, seat, SearchBudget(max_runs=40), SearchConfig(seed=1))
+    serial_time = time.perf_counter() - start_time
+
+    print("Leaf-parallel: {:.0f} rollouts/s | Serial: {:.0f} rollouts/s".format(
+        stats.rollout_calls / leaf_time, serial.stats.rollout_calls / serial_time))
+
+if __name__ == "__main__":
+    leafParallel()
+    print("Everything Passed!")
@@ -2,17 +2,19 @@
 # REFERENCE - https://stackoverflow.com/questions/8898997/python-clear-a-log-file
 
 # External Imports
-from copy import deepcopy
 import logging
 import datetime
+import random
 from math import inf
 
 # Internal Imports
 from Game.Regicide.regicide_board import Result
-from Game.Regicide.regicide_action import RegicideAction
 from Game.Regicide.regicide_board import RegicideBoard
-from ISMCTS.Game.regicide_node import RegicideNode
-from ISMCTS.Base.timer import Timer
+from Game.Regicide.regicide_record import GameRecord
+from Game.Regicide.regicide_record import RecordWriter
+from ISMCTS.search import Searcher
+from ISMCTS.search import SearchBudget
+from ISMCTS.search import SearchConfig
 
 # PyInstaller Prompt
 ## Windows
@@ -26,11 +28,22 @@ def main():
     max_runs = validMaxRuns()
     max_time = validMaxTime() # in (s)
     action_state_logging = False
+    # NOTE - binary game record (see Game/Regicide/regicide_record.py) - a fraction of the size of the action/state logs and replayable
+    record_logging = False
     time_logging = False
     result_logging = False
     main_game_state = RegicideBoard()
+
+    # NOTE - the deal is seeded so the record can deal it again
+    if record_logging:
+        seed = random.getrandbits(63)
+        random.seed(seed)
+
     main_game_state.start()
 
+    if record_logging:
+        game_record = GameRecord(seed, len(main_game_state.players))
+
     # NOTE - turning off state and action log whilst taking timing results
     if action_state_logging:
         action_logger = initialiseActionLogger()
@@ -49,7 +62,11 @@ def main():
     # Keep track of how many turns the players survive
     turns_survived = 0
 
-    root_node = RegicideNode()
+    # CONFIG - search settings of the AI (heuristics, UCT constant, rewards, dud ratio) - see ISMCTS/search.py SearchConfig
+    # NOTE - the searcher keeps its tree between turns (subtree reuse)
+    config = SearchConfig(dud_ratio=1) # AI stops if dud_runs >= int(max_runs/dud_ratio)
+    searcher = Searcher(config)
+    budget = SearchBudget(max_runs, max_time)
 
     game_over = False
 
@@ -81,7 +98,13 @@ def main():
             play_index = validPlay(legal_plays)
             print("")
 
-            main_game_state = main_game_state.nextState(legal_plays[play_index])
+            if record_logging:
+                main_game_state = game_record.play(main_game_state, legal_plays[play_index], False)
+            else:
+                main_game_state = main_game_state.nextState(legal_plays[play_index])
+
+            # NOTE - follow the player's move down the AI's tree so its statistics aren't thrown away
+            searcher.advance([legal_plays[play_index]], main_game_state)
 
             # NOTE - turning off state and action log whilst taking timing results
             if action_state_logging:
@@ -127,60 +150,33 @@ def main():
             print("Legal Plays:", legal_plays)
             #input("Enter any input to continue:\n")
 
-            root_node.setGameState(deepcopy(main_game_state))
-            root_node.setActivePlayer()
-
-            run_count = 0
-
-            # AI stops trying to simulate if it encounters too many dud expansions
-            dud_runs = 0
-            dud_ratio = 1 # AI stops if dud_runs >= int(run_count/dud_ratio)
-            max_duds = int(max_runs/dud_ratio)
-
-            # NOTE - if dud_ratio is too big to return on integer > 0 - default to max_runs
-            if max_duds == 0:
-                max_duds = max_runs
-
-            current_time = 0
-            timer = Timer()
-            timer.start()
+            if searcher.root_node:
+                print("Reusing " + str(searcher.root_node.visits - 1) + " visits from the previous turn's tree")
 
             print("AI is thinking...\n")
 
-            while run_count < max_runs and current_time < max_time and dud_runs < max_duds:
-                selected_node = root_node.Select()
-
-                expanded_node = selected_node.Expand()
-
-                if expanded_node:
-                    #print("Simulation Called!")
-                    expanded_node.Simulate()
-                else:
-                    # keep track of how many times the AI tries to expand an end-state node
-                    dud_runs += 1
-
-                run_count += 1
-                current_time = timer.check()
-                #print("Current run count:", run_count)
+            decision = searcher.search(main_game_state, next_turn, budget)
+            run_count = decision.run_count
+            dud_runs = decision.dud_runs
 
             # NOTE - log total elapsed time to go run_count
             if time_logging:
-                total_time = timer.check()
-                logTime(time_logger, max_runs, total_time, dud_runs)
-
-            timer.stop()
+                logTime(time_logger, max_runs, decision.elapsed, dud_runs)
 
             print("Dud Runs: " + str(dud_runs) + " | " + str(round(dud_runs / run_count * 100, 2)) + "% of runs done were duds!")
             print("Total Runs: " + str(run_count) + " | " + str(round(run_count / max_runs * 100, 2)) + "% of requested runs were completed!")
+            print(decision.stats.summary())
 
-            highest_child = root_node.findHighestRankingChild()
-            ai_action = highest_child.getGameAction()
+            ai_action = decision.action
 
             if ai_action not in legal_plays:
                 raise Exception ("AI making illegal move!")
 
             print("AI's Final Move:", ai_action, end="\n\n")
-            main_game_state = main_game_state.nextState(ai_action, True, True)
+            if record_logging:
+                main_game_state = game_record.play(main_game_state, ai_action, True, True)
+            else:
+                main_game_state = main_game_state.nextState(ai_action, True, True)
 
             #input("Enter any input to continue:\n")
 
@@ -188,7 +184,8 @@ def main():
             if action_state_logging:
                 logState(state_logger, main_game_state)
 
-            root_node.resetNode()
+            # NOTE - keep the subtree of the move that was played instead of resetNode()
+            searcher.advance([ai_action], main_game_state)
 
             state = main_game_state.winner()
 
@@ -227,8 +224,13 @@ def main():
     if action_state_logging:
         logActions(action_logger, main_game_state.actions)
 
+    if record_logging:
+        # NOTE - the game only ends early if a player is left without a legal play
+        game_record.result = winner if winner in [Result.WIN, Result.LOSS] else Result.LOSS
+        saveRecord(game_record)
+
     if result_logging:
-        logResults(result_logger, main_game_state, root_node, max_runs, max_time, boss_defeated, turns_survived)
+        logResults(result_logger, main_game_state, config, max_runs, max_time, boss_defeated, turns_survived)
 
     input("\nPress enter to close application: ")
 
@@ -254,7 +256,7 @@ def validMaxRuns():
     max_runs = input("How many simulation attempts would you like the AI to run?: ")
     while not valid:
         try:
-            if 0 <= int(max_runs):
+            if 0 < int(max_runs):
                 max_runs = int(max_runs)
                 valid = True
             else:
@@ -359,6 +361,14 @@ def initialiseResultLogger(name=None):
     return logger
 
 
+def saveRecord(record):
+    now = datetime.datetime.now()
+    now_str = now.strftime("%d%m%y%H%M%S")
+    filename = "Logs/Records/" + now_str + ".rgr"
+
+    with RecordWriter(filename) as writer:
+        writer.write(record)
+
 def logActions(logger, actions):
     for action in actions:
         logger.info("Player: {} | Cards Played: {} | Boss Defeated: {} | Player Died: {}".format(action.marker + 1, action.cards, action.boss_defeated, action.player_died))
@@ -384,9 +394,9 @@ def logState(logger, state):
 def logTime(logger, max_count, time, dud_count):
     logger.info("Max Count: {} | Time(s): {} | Dud_Count: {}".format(max_count, time, dud_count))
 
-def logResults(logger, state, root_node, max_runs, max_time,boss_defeated, turns_survived):
+def logResults(logger, state, config, max_runs, max_time,boss_defeated, turns_survived):
     logger.info("Max Runs: {} | Max Time: {} | Players {}".format(max_runs, max_time, len(state.players)))
-    logger.info("Selection: {} | Expansion: {} | Simulation: {} ".format(root_node.selection_heuristics, root_node.expansion_heuristics, root_node.simulation_heuristics))
+    logger.info("Selection: {} | Expansion: {} | Simulation: {} ".format(config.selection_heuristics, config.expansion_heuristics, config.simulation_heuristics))
     logger.info("Bosses Defeated: {} | {}% of castle defeated".format(str(boss_defeated), str(round(boss_defeated / 12 * 100, 2))))
     logger.info("Turns Survived: {} | {} bosses defeated every turn!".format(str(turns_survived), str(round(boss_defeated / turns_survived, 2))))
     logger.info("-" * 50)
@@ -0,0 +1,98 @@
+# REFERENCE - https://docs.python.org/3/library/multiprocessing.html#module-multiprocessing.pool
+# REFERENCE - Chaslot, Winands & van den Herik (2008) - Parallel Monte-Carlo Tree Search (root parallelization)
+
+# External Imports
+import random
+import time
+import multiprocessing
+
+# Internal Imports
+from ISMCTS.Game.regicide_node import RegicideNode
+from ISMCTS.search import growTree
+
+# Root-parallel ISMCTS - every worker grows its own tree from the same root state with its own RNG stream,
+# then the root children are merged by action before the highest ranking child is picked
+
+# statistics for one root-parallel decision
+class ParallelStats:
+    def __init__(self, worker_runs, worker_duds, elapsed):
+        self.worker_runs = worker_runs # iterations completed by each worker
+        self.worker_duds = worker_duds
+        self.run_count = sum(worker_runs)
+        self.dud_runs = sum(worker_duds)
+        self.elapsed = elapsed
+
+def createPool(workers):
+    return multiprocessing.Pool(workers)
+
+# turns an action into something hashable so the same move from different trees can be matched up
+# NOTE - yielding (None) is its own key
+def actionKey(action):
+    if not action:
+        return None
+    return tuple(sorted((card.rank, card.suit) for card in action))
+
+# worker entry point - must be a module level function so the pool can pickle it
+def searchWorker(job):
+    state, max_runs, max_time, dud_ratio, seed = job
+
+    # NOTE - each worker has an independent RNG stream otherwise every tree would be identical
+    random.seed(seed)
+
+    root_node, run_count, dud_runs, elapsed = growTree(state, max_runs, max_time, dud_ratio)
+
+    # only the root children are sent back - the rest of the tree stays in the worker
+    children = [(child.getGameAction(), child.ranking, child.visits) for child in root_node.branches]
+    root_node.release()
+
+    return children, run_count, dud_runs
+
+# merges the root children of every worker's tree into one root node
+def mergeRoots(worker_children):
+    merged = {}
+    for children in worker_children:
+        for action, ranking, visits in children:
+            key = actionKey(action)
+            if key not in merged:
+                merged[key] = [action, 0, 0]
+            merged[key][1] += ranking
+            merged[key][2] += visits
+
+    root_node = RegicideNode()
+    for action, ranking, visits in merged.values():
+        child_node = RegicideNode()
+        child_node.game_action = action
+        child_node.ranking = ranking
+        child_node.visits = visits
+        child_node.setParent(root_node)
+        child_node.setDepth(1)
+        root_node.branches.append(child_node)
+
+    return root_node
+
+# each of the workers runs up to max_runs iterations (and max_time seconds) - so total iterations scale with the worker count
+# NOTE - if no pool is given one is created (and closed) for this call only
+def rootParallelSearch(state, max_runs, max_time, workers, pool=None, dud_ratio=1):
+    if workers < 1:
+        raise Exception("Root-parallel search needs at least one worker!")
+
+    start_time = time.perf_counter()
+
+    # NOTE - seeds are drawn from the main RNG so seeded games stay reproducible
+    jobs = [(state, max_runs, max_time, dud_ratio, random.getrandbits(64)) for worker in range(workers)]
+
+    if pool:
+        results = pool.map(searchWorker, jobs)
+    else:
+        with createPool(workers) as new_pool:
+            results = new_pool.map(searchWorker, jobs)
+
+    root_node = mergeRoots([children for children, run_count, dud_runs in results])
+    action = root_node.findHighestRankingChild().getGameAction()
+
+    elapsed = time.perf_counter() - start_time
+    stats = ParallelStats([run_count for children, run_count, dud_runs in results],
+                          [dud_runs for children, run_count, dud_runs in results],
+                          elapsed)
+
+    return action, stats
@@ -0,0 +1,364 @@
+# REFERENCE - https://docs.python.org/3/library/argparse.html
+# REFERENCE - https://docs.python.org/3/library/random.html#random.seed
+
+# External Imports
+import argparse
+import json
+import random
+import time
+from copy import copy
+
+# Internal Imports
+from Game.Regicide.regicide_board import Result
+from Game.Regicide.regicide_board import RegicideBoard
+from Game.Regicide.regicide_board import legal_plays_cache
+from Game.Regicide.regicide_record import GameRecord
+from Game.Regicide.regicide_record import RecordWriter
+from ISMCTS.search import growTree
+from ISMCTS.search import advanceRoot
+from ISMCTS.search import growArrayTree
+from ISMCTS.search import growSOTree
+from ISMCTS.search import SearchBudget
+from ISMCTS.search import SearchConfig
+from ISMCTS.Game.regicide_node import RegicideNode
+from ISMCTS.parallel import rootParallelSearch
+from ISMCTS.parallel import createPool
+from ISMCTS.leaf_parallel import LeafPool
+from ISMCTS.tree_parallel import treeParallelSearch
+from ISMCTS.tree_parallel import createTreePool
+
+# Headless self-play runner - plays full games of Regicide with every seat driven by the ISMCTS agent
+# NOTE - nothing in here prompts or prints so thousands of games can be run back to back
+## python -m ISMCTS.runner --games 10 --players 2 --runs 100 --time 1 --seed 0
+
+# search statistics for a single AI decision
+class MoveStats:
+    def __init__(self, seat, action, run_count, dud_runs, elapsed):
+        self.seat = seat
+        self.action = action
+        self.run_count = run_count
+        self.dud_runs = dud_runs
+        self.elapsed = elapsed
+        self.worker_runs = None # NOTE - only set by root- and tree-parallel search - iterations completed by each worker
+        self.reused_visits = 0 # visits the root already had from the previous turn's tree
+        self.transpositions = None # NOTE - only set when a transposition table is used - see TranspositionTable.stats()
+        self.search = None # NOTE - per-phase SearchStats.toDict() of serial RegicideNode searches
+
+    def toDict(self):
+        return {
+            "seat": self.seat,
+            "action": repr(self.action),
+            "run_count": self.run_count,
+            "dud_runs": self.dud_runs,
+            "elapsed": self.elapsed,
+            "worker_runs": self.worker_runs,
+            "reused_visits": self.reused_visits,
+            "transpositions": self.transpositions,
+            "search": self.search
+        }
+
+# structured result of one full headless game
+class GameResult:
+    def __init__(self, seed, num_players, max_runs, max_time):
+        self.seed = seed
+        self.num_players = num_players
+        self.max_runs = max_runs
+        self.max_time = max_time
+        self.bosses_defeated = 0
+        self.turns_survived = 0
+        self.result = Result.ALIVE
+        self.moves = []
+        self.elapsed = 0
+        self.record = None # NOTE - only set when the game is recorded - see Game/Regicide/regicide_record.py
+
+    def won(self):
+        return self.result == Result.WIN
+
+    def toDict(self):
+        return {
+            "seed": self.seed,
+            "num_players": self.num_players,
+            "max_runs": self.max_runs,
+            "max_time": self.max_time,
+            "bosses_defeated": self.bosses_defeated,
+            "turns_survived": self.turns_survived,
+            "won": self.won(),
+            "result": self.result.name,
+            "elapsed": self.elapsed,
+            "moves": [move.toDict() for move in self.moves]
+        }
+
+# builds a board from a seed without any input() prompts
+def createBoard(seed=None, num_players=2):
+    if seed is not None:
+        random.seed(seed)
+
+    board = RegicideBoard()
+    board.start(num_players)
+
+    return board
+
+# searches from the given state and returns the chosen action, its stats and the searched root node
+# NOTE - budget is a SearchBudget and config a SearchConfig (see ISMCTS/search.py) - the runner plays with the global random
+#  stream so config shouldn't carry an rng or a seed
+# NOTE - workers > 1 switches to root-parallel search across a process pool (see ISMCTS/parallel.py) - no tree is kept
+# NOTE - tree_parallel makes the workers grow one shared tree instead (see ISMCTS/tree_parallel.py) - pool has to come from
+#  createTreePool() and max_runs is shared between the workers rather than given to each one
+# NOTE - root_node is optional - a root from advanceRoot() carries on from the previous turn's tree
+# NOTE - array_tree searches with the array-backed tree store instead of RegicideNode objects - no tree is kept
+# NOTE - so_ismcts searches with state-free nodes that determinize at the root every iteration (see ISMCTS/Game/so_tree.py) - no tree is kept
+# NOTE - the array, SO and tree-parallel trees follow config's heuristics, UCT constant, dud ratio and slack (the SO tree
+#  its rewards too) - root-parallel search only uses its dud ratio. rollout batches, transpositions, widening, rollout cutoffs and the leaf pool are for the
+#  serial RegicideNode search only
+def searchMove(state, budget, config, root_node=None, *, workers=1, pool=None, array_tree=False, tree_parallel=False, so_ismcts=False):
+    seat = state.currentPlayer()
+    max_runs = budget.max_runs
+    max_time = budget.max_time
+    dud_ratio = config.dud_ratio
+
+    if array_tree:
+        tree, run_count, dud_runs, elapsed = growArrayTree(state, max_runs, max_time, config)
+        action = tree.findHighestRankingAction()
+        return action, MoveStats(seat, action, run_count, dud_runs, elapsed), None
+
+    if so_ismcts:
+        tree, run_count, dud_runs, elapsed = growSOTree(state, max_runs, max_time, config)
+        action = tree.findHighestRankingAction()
+        return action, MoveStats(seat, action, run_count, dud_runs, elapsed), None
+
+    if workers > 1 and tree_parallel:
+        action, parallel_stats = treeParallelSearch(state, max_runs, max_time, workers, pool, dud_ratio,
+                                                    selection_heuristics=config.selection_heuristics,
+                                                    UCT_exploration=config.UCT_exploration,
+                                                    simulation_heuristics=config.simulation_heuristics, slack=config.slack)
+        move_stats = MoveStats(seat, action, parallel_stats.run_count, parallel_stats.dud_runs, parallel_stats.elapsed)
+        move_stats.worker_runs = parallel_stats.worker_runs
+        return action, move_stats, None
+
+    if workers > 1:
+        action, parallel_stats = rootParallelSearch(state, max_runs, max_time, workers, pool, dud_ratio)
+        move_stats = MoveStats(seat, action, parallel_stats.run_count, parallel_stats.dud_runs, parallel_stats.elapsed)
+        move_stats.worker_runs = parallel_stats.worker_runs
+        return action, move_stats, None
+
+    reused_visits = root_node.visits - 1 if root_node else 0
+
+    # NOTE - same as Searcher.search() - a new root takes the config and Expand() copies it down to every child
+    if not root_node:
+        root_node = RegicideNode()
+        root_node.setGameState(state.clone())
+        root_node.setActivePlayer()
+        config.configure(root_node)
+
+    root_node, run_count, dud_runs, elapsed = growTree(state, max_runs, max_time, dud_ratio, root_node=root_node,
+                                                       rollout_batch=config.rollout_batch, transpositions=config.transpositions,
+                                                       slack=config.slack, progressive_widening=config.progressive_widening,
+                                                       rollout_cutoff=config.rollout_cutoff, boss_cutoff=config.boss_cutoff,
+                                                       leaf_pool=config.leaf_pool)
+
+    action = root_node.findHighestRankingChild().getGameAction()
+
+    move_stats = MoveStats(seat, action, run_count, dud_runs, elapsed)
+    move_stats.reused_visits = reused_visits
+    if root_node.transpositions:
+        move_stats.transpositions = root_node.transpositions.stats()
+    move_stats.search = root_node.search_stats.toDict()
+
+    return action, move_stats, root_node
+
+# plays one full game with every seat controlled by the AI and returns a GameResult
+# NOTE - budget and config default to 100 runs / 1s per move and the default SearchConfig - see searchMove() for the rest
+# NOTE - pass a multiprocessing pool with workers > 1 to reuse worker processes between moves
+# NOTE - config.reuse_tree keeps the subtree of the move actually played as the next root instead of starting cold
+# NOTE - record keeps a binary GameRecord of the game in game_result.record - moves then draw their randomness from their
+#  own seeds (see GameRecord.play()) so a recorded game doesn't play out the same as an unrecorded one with the same seed
+def runGame(seed=None, num_players=2, budget=None, config=None, *, workers=1, pool=None, array_tree=False, tree_parallel=False, so_ismcts=False, record=False):
+    if budget is None:
+        budget = SearchBudget(max_runs=100, max_time=1.0)
+    if config is None:
+        config = SearchConfig()
+
+    # NOTE - a record can only be replayed from a known deal
+    if record and seed is None:
+        seed = random.getrandbits(63)
+
+    game_result = GameResult(seed, num_players, budget.max_runs, budget.max_time)
+    start_time = time.perf_counter()
+
+    state = createBoard(seed, num_players)
+
+    if record:
+        game_result.record = GameRecord(seed, num_players)
+    root_node = None
+
+    game_over = False
+    while not game_over:
+        legal_plays = state.legalPlays(state.players[state.currentPlayer()].hand)
+
+        # NOTE - a player with no legal plays has lost the game for the adventurers
+        if len(legal_plays) == 0:
+            game_result.result = Result.LOSS
+            break
+
+        action, move_stats, root_node = searchMove(state, budget, config, root_node, workers=workers, pool=pool, array_tree=array_tree,
+                                                   tree_parallel=tree_parallel, so_ismcts=so_ismcts)
+
+        if action not in legal_plays:
+            raise Exception("AI making illegal move!")
+
+        game_result.moves.append(move_stats)
+        if game_result.record:
+            game_result.record.play(state, action)
+        else:
+            state.nextState(action, True)
+
+        if config.reuse_tree and root_node:
+            root_node = advanceRoot(root_node, [action], state)
+        elif root_node:
+            root_node.release()
+            root_node = None
+
+        # NOTE - same counting rules as main()
+        result = state.winner()
+
+        if result == Result.BOSS_DEFEATED:
+            game_result.bosses_defeated += 1
+            game_result.turns_survived += 1
+
+        elif result == Result.ALIVE:
+            game_result.turns_survived += 1
+
+        else:
+            if result == Result.WIN:
+                game_result.bosses_defeated += 1
+
+            game_result.result = result
+            game_over = True
+
+    # NOTE - a player running out of legal plays isn't a result the board knows about
+    if game_result.record:
+        game_result.record.result = game_result.result
+
+    game_result.elapsed = time.perf_counter() - start_time
+
+    return game_result
+
+# plays a batch of games - game i is seeded with seed + i so every batch is reproducible
+# NOTE - record_path writes a binary record of every game to that file as each game finishes
+# NOTE - leaf_workers > 0 starts a LeafPool for the batch - the games search with a copy of config that uses it
+def runGames(games, seed=0, num_players=2, budget=None, config=None, *, workers=1, array_tree=False, tree_parallel=False, so_ismcts=False, record_path=None, leaf_workers=0, leaf_rollouts=None):
+    if config is None:
+        config = SearchConfig()
+
+    pool = None
+    if workers > 1:
+        pool = createTreePool(workers) if tree_parallel else createPool(workers)
+    writer = RecordWriter(record_path) if record_path else None
+    leaf_pool = LeafPool(leaf_workers, leaf_rollouts) if leaf_workers > 0 else None
+    if leaf_pool:
+        config = copy(config)
+        config.leaf_pool = leaf_pool
+
+    results = []
+    try:
+        for game in range(games):
+            result = runGame(seed + game, num_players, budget, config, workers=workers, pool=pool, array_tree=array_tree,
+                             tree_parallel=tree_parallel, so_ismcts=so_ismcts, record=writer is not None)
+            if writer:
+                writer.write(result.record)
+            results.append(result)
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+        if writer:
+            writer.close()
+        if leaf_pool:
+            leaf_pool.close()
+
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run headless ISMCTS self-play games of Regicide.")
+    parser.add_argument("--games", type=int, default=1, help="number of games to play")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game (game i uses seed + i)")
+    parser.add_argument("--players", type=int, default=2, choices=[2, 3, 4], help="number of players")
+    parser.add_argument("--runs", type=int, default=100, help="maximum search iterations per move")
+    parser.add_argument("--time", type=float, default=1.0, help="maximum search time per move (s)")
+    parser.add_argument("--dud-ratio", type=int, default=1, help="AI stops if dud_runs >= int(max_runs/dud_ratio)")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes for root-parallel search (1 = serial)")
+    parser.add_argument("--cold", action="store_true", help="start every search from a new root instead of reusing the last subtree")
+    parser.add_argument("--array-tree", action="store_true", help="search with the array-backed tree store")
+    parser.add_argument("--uct", action="store_true", help="UCT selection (selection heuristics) instead of random selection")
+    parser.add_argument("--exploration", type=float, default=0.7, help="UCT exploration constant")
+    parser.add_argument("--expansion-heuristics", action="store_true", help="expand combos that avoid the boss's suit first")
+    parser.add_argument("--simulation-heuristics", action="store_true", help="rollouts prefer combos that avoid the boss's suit")
+    parser.add_argument("--rollout-batch", type=int, default=1, help="batched random rollouts per expanded leaf (needs NumPy)")
+    parser.add_argument("--transpositions", action="store_true", help="share statistics between nodes with the same information set")
+    parser.add_argument("--json", default=None, help="write one JSON line per game to this file")
+    parser.add_argument("--move-log", default=None, help="write one JSON line per move (with its search statistics) to this file")
+    parser.add_argument("--record", default=None, help="write a binary record of every game to this file (replayable)")
+    parser.add_argument("--widening", action="store_true", help="progressive widening - nodes only draw and expand moves as their visits grow")
+    parser.add_argument("--cutoff", type=int, default=None, help="cut rollouts off after this many moves and score them with a static evaluation")
+    parser.add_argument("--boss-cutoff", action="store_true", help="cut rollouts off once a boss falls and score them with a static evaluation")
+    parser.add_argument("--leaf-workers", type=int, default=0, help="worker processes that play every expanded node's rollouts (0 = off)")
+    parser.add_argument("--leaf-rollouts", type=int, default=None, help="rollouts per expanded node with --leaf-workers (default one per worker)")
+    parser.add_argument("--tree-parallel", action="store_true", help="with --workers, grow one shared tree (virtual loss) instead of a tree per worker")
+    parser.add_argument("--so-ismcts", action="store_true", help="SO-ISMCTS - state-free nodes and a new determinization at the root every iteration")
+    args = parser.parse_args(argv)
+
+    if args.cutoff is not None and args.cutoff < 1:
+        parser.error("--cutoff has to allow at least one move")
+    if args.leaf_rollouts is not None and args.leaf_rollouts < 1:
+        parser.error("--leaf-rollouts has to be at least one")
+    if args.runs < 1:
+        parser.error("--runs has to be at least one")
+
+    budget = SearchBudget(max_runs=args.runs, max_time=args.time)
+    config = SearchConfig(UCT_exploration=args.exploration, selection_heuristics=args.uct, expansion_heuristics=args.expansion_heuristics,
+                          simulation_heuristics=args.simulation_heuristics, dud_ratio=args.dud_ratio, rollout_batch=args.rollout_batch,
+                          transpositions=args.transpositions, reuse_tree=not args.cold, progressive_widening=args.widening,
+                          rollout_cutoff=args.cutoff, boss_cutoff=args.boss_cutoff)
+
+    start_time = time.perf_counter()
+    results = runGames(args.games, args.seed, args.players, budget, config, workers=args.workers, array_tree=args.array_tree,
+                       tree_parallel=args.tree_parallel, so_ismcts=args.so_ismcts, record_path=args.record,
+                       leaf_workers=args.leaf_workers, leaf_rollouts=args.leaf_rollouts)
+    total_time = time.perf_counter() - start_time
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            for result in results:
+                file.write(json.dumps(result.toDict()) + "\n")
+
+    if args.move_log:
+        with open(args.move_log, "w", encoding="utf-8") as file:
+            for result in results:
+                for turn, move in enumerate(result.moves):
+                    line = {"seed": result.seed, "turn": turn}
+                    line.update(move.toDict())
+                    file.write(json.dumps(line) + "\n")
+
+    wins = sum(1 for result in results if result.won())
+    bosses = sum(result.bosses_defeated for result in results)
+    moves = sum(len(result.moves) for result in results)
+
+    print("Games: {} | Wins: {} | Bosses Defeated: {} | Moves: {}".format(len(results), wins, bosses, moves))
+    print("Total Time(s): {} | Games/s: {}".format(round(total_time, 4), round(len(results) / total_time, 4)))
+
+    if args.transpositions:
+        searched = [move.transpositions for result in results for move in result.moves if move.transpositions]
+        lookups = sum(stats["lookups"] for stats in searched)
+        hits = sum(stats["hits"] for stats in searched)
+        print("Transpositions - Nodes: {} | Shared: {} | Hit Rate: {} | Shared Per Move: {}".format(
+            lookups, hits, round(hits / lookups, 4) if lookups else 0, round(hits / len(searched), 2) if searched else 0))
+
+    # NOTE - only counts this process - root-parallel workers have their own caches
+    cache_stats = legal_plays_cache.stats()
+    print("Legal Plays Cache - Hits: {} | Misses: {} | Evictions: {} | Hit Rate: {}".format(
+        cache_stats["hits"], cache_stats["misses"], cache_stats["evictions"], round(cache_stats["hit_rate"], 4)))
+
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,481 @@
+# REFERENCE - https://github.com/melvinzhang/ismcts/blob/master/ISMCTS.py
+
+# External Imports
+import gc
+import random
+from math import inf
+from time import perf_counter
+
+# Internal Imports
+from ISMCTS.Game.regicide_node import RegicideNode
+from ISMCTS.Game.regicide_node import REWARDS
+from ISMCTS.Game.array_tree import ArrayTree
+from ISMCTS.Game.so_tree import SOTree
+from ISMCTS.Game.transposition_table import TranspositionTable
+from ISMCTS.Base.deadline import DeadlineScheduler
+from ISMCTS.Base.deadline import DEADLINE_SLACK
+from ISMCTS.Base.search_stats import SearchStats
+
+# runs search iterations until the run budget, the dud budget or the deadline runs out
+# returns (run_count, dud_runs, elapsed, clock checks)
+# NOTE - iterate() plays one Select -> Expand -> Simulate -> Backpropagate iteration and returns False on a dud run (nothing
+#  expanded) - every tree store has one (RegicideNode trees through growTree(), ArrayTree.iterate(), SOTree.iterate())
+# NOTE - mirrors the search loop in main() - including the dud run stopping condition
+# NOTE - max_time is a hard deadline - the clock is read by a DeadlineScheduler (see ISMCTS/Base/deadline.py) and the search
+#  runs at most slack seconds over it. at least one iteration is always run so there's a root child to play
+# NOTE - the cyclic garbage collector is paused while the search runs - a full collection over a big tree takes tens of ms
+#  which would blow the deadline by itself. a RegicideNode tree is full of reference cycles (parent <-> branches, transposition
+#  twins) so reference counting alone never frees one - a tree or subtree that's dropped has to be release()d (advanceRoot(),
+#  Searcher) or it's only reclaimed by a later collection (a full one once it's been promoted to the oldest generation)
+def runIterations(iterate, max_runs, max_time, dud_ratio=1, slack=DEADLINE_SLACK):
+    run_count = 0
+    dud_runs = 0
+    max_duds = int(max_runs/dud_ratio)
+
+    # NOTE - if dud_ratio is too big to return on integer > 0 - default to max_runs
+    if max_duds == 0:
+        max_duds = max_runs
+
+    gc_enabled = gc.isenabled()
+    gc.disable()
+
+    scheduler = DeadlineScheduler(max_time, slack)
+
+    try:
+        while run_count < max_runs and dud_runs < max_duds and (run_count == 0 or not scheduler.expired(run_count)):
+            if not iterate():
+                dud_runs += 1
+
+            run_count += 1
+
+        elapsed = scheduler.stop()
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    return run_count, dud_runs, elapsed, scheduler.checks
+
+# runs the Select -> Expand -> Simulate loop from the given state and returns the grown root node
+# NOTE - root_node is optional - pass the node returned by advanceRoot() to keep growing last turn's tree
+# NOTE - rollout_batch is the number of rollouts each expanded leaf plays (see ISMCTS/Game/batch_rollout.py)
+# NOTE - transpositions shares statistics between nodes that reach the same information set - the table is root_node.transpositions
+# NOTE - progressive_widening limits how many branches a node may have by its visits and draws moves lazily (see
+#  RegicideNode.canExpand()) - the widening constants are the root's (SearchConfig.configure())
+# NOTE - rollout_cutoff (moves) and boss_cutoff stop rollouts early and score them with a static evaluation (see
+#  ISMCTS/Game/static_eval.py) - None and False play every rollout to the end of the game
+# NOTE - leaf_pool plays the rollouts of every expanded node on worker processes (see ISMCTS/leaf_parallel.py)
+# NOTE - per-phase statistics of the decision are always collected in root_node.search_stats (see ISMCTS/Base/search_stats.py)
+def growTree(state, max_runs, max_time, dud_ratio=1, root_node=None, rollout_batch=1, transpositions=False, slack=DEADLINE_SLACK, progressive_widening=False, rollout_cutoff=None, boss_cutoff=False, leaf_pool=None):
+    if not root_node:
+        root_node = RegicideNode()
+        root_node.setGameState(state.clone())
+        root_node.setActivePlayer()
+
+    root_node.rollout_batch = rollout_batch
+    root_node.progressive_widening = progressive_widening
+    root_node.rollout_cutoff = rollout_cutoff
+    root_node.boss_cutoff = boss_cutoff
+    root_node.leaf_pool = leaf_pool
+
+    # NOTE - a reused subtree keeps its stats object (every node points at it) so it's reset rather than replaced
+    if root_node.search_stats is None:
+        root_node.search_stats = SearchStats()
+    else:
+        root_node.search_stats.reset()
+    stats = root_node.search_stats
+
+    if transpositions:
+        root_node.transpositions = TranspositionTable()
+        root_node.game_state.enableHashing()
+
+    # one iteration on the tree of RegicideNode objects - the phases are timed into stats
+    def iterate():
+        start_time = perf_counter()
+        selected_node = root_node.Select()
+        selection_end = perf_counter()
+
+        expanded_node = selected_node.Expand()
+        expansion_end = perf_counter()
+
+        stats.selection_time += selection_end - start_time
+        stats.selection_calls += 1
+        stats.expansion_time += expansion_end - selection_end
+        stats.expansion_calls += 1
+
+        if not expanded_node:
+            return False
+
+        expanded_node.Simulate()
+        return True
+
+    run_count, dud_runs, elapsed, clock_checks = runIterations(iterate, max_runs, max_time, dud_ratio, slack)
+
+    stats.clock_checks = clock_checks
+    stats.finish(root_node, run_count, dud_runs, elapsed)
+
+    return root_node, run_count, dud_runs, elapsed
+
+# same loop as growTree() but on the array-backed tree store (see ISMCTS/Game/array_tree.py)
+# NOTE - config is a SearchConfig - the array tree uses its selection heuristics (UCT), UCT constant, simulation heuristics,
+#  dud ratio and slack. None is the default config
+def growArrayTree(state, max_runs, max_time, config=None):
+    if config is None:
+        config = SearchConfig()
+
+    tree = ArrayTree(state, config.selection_heuristics, config.UCT_exploration, config.simulation_heuristics)
+    run_count, dud_runs, elapsed, clock_checks = runIterations(tree.iterate, max_runs, max_time, config.dud_ratio, config.slack)
+    return tree, run_count, dud_runs, elapsed
+
+# same loop as growArrayTree() but SO-ISMCTS - every iteration determinizes at the root (see ISMCTS/Game/so_tree.py)
+# NOTE - config is a SearchConfig - the SO tree uses its selection, expansion and simulation heuristics, UCT constant,
+#  rewards, dud ratio and slack. None is the default config
+# NOTE - the statistics of the decision are collected in tree.search_stats like growTree()'s
+def growSOTree(state, max_runs, max_time, config=None):
+    if config is None:
+        config = SearchConfig()
+
+    tree = SOTree(state, config.selection_heuristics, config.UCT_exploration, config.expansion_heuristics, config.simulation_heuristics, config.rewards)
+    run_count, dud_runs, elapsed, clock_checks = runIterations(tree.iterate, max_runs, max_time, config.dud_ratio, config.slack)
+
+    tree.search_stats = SearchStats()
+    tree.search_stats.clock_checks = clock_checks
+    tree.finishStats(tree.search_stats, run_count, dud_runs, elapsed)
+
+    return tree, run_count, dud_runs, elapsed
+
+# subtree reuse - after actions have been played on the real board, walk the tree down the same line
+# and make the node reached the new root (everything else is freed). returns None if the line was never expanded
+# NOTE - state is the real board after the actions were played
+def advanceRoot(root_node, actions, state):
+    node = root_node
+    for action in actions:
+        if not node:
+            break
+        node = node.findChild(action)
+
+    # NOTE - the rest of the old tree is unlinked so it's freed straight away (see RegicideNode.release())
+    if node is not root_node:
+        if node:
+            node.parent.branches = [child for child in node.parent.branches if child is not node]
+        root_node.release()
+
+    if not node:
+        return None
+
+    node.reRoot(state.clone())
+
+    # NOTE - a node that only ever had its own stats (no branches) is no better than a new root
+    if len(node.branches) == 0:
+        node.release()
+        return None
+
+    return node
+
+# Embeddable search API - everything main() used to read from module state or RegicideNode.__init__ is passed in explicitly
+## decision = search(state, state.currentPlayer(), SearchBudget(max_runs=500, max_time=1.0), SearchConfig(seed=0))
+## searcher = Searcher(config) - keeps its tree between decisions (see Searcher.advance())
+
+# how long a single decision may search for - whichever limit is hit first stops the search
+class SearchBudget:
+    def __init__(self, max_runs=inf, max_time=inf):
+        if max_runs < 1:
+            raise Exception("The AI needs at least one run to pick a move!")
+        if max_time < 0:
+            raise Exception("Search time can't be negative!")
+
+        self.max_runs = max_runs
+        self.max_time = max_time # in (s)
+
+# search settings - the defaults are the same as RegicideNode's
+# NOTE - rewards is (win reward, loss punishment, instant loss punishment) - see calculateRewards()
+# NOTE - progressive_widening limits every node to ceil(widening_constant * visits ^ widening_exponent) branches and only
+#  draws the moves it expands (see RegicideNode.canExpand())
+# NOTE - rollout_cutoff is the most moves a rollout plays (None for no limit) and boss_cutoff stops it once a boss falls
+# NOTE - leaf_pool is a LeafPool (see ISMCTS/leaf_parallel.py) that plays the rollouts of every expanded node - the caller closes it
+# NOTE - so_ismcts searches with state-free SO-ISMCTS nodes instead (see growSOTree()) - no tree is kept between decisions
+#  and rollout batches, transpositions, widening, rollout cutoffs and the leaf pool only apply to the RegicideNode search
+# NOTE - rng is a random.Random the search draws from instead of the global generator - seed builds one.
+#  with neither the search shares the global generator like growTree() does
+class SearchConfig:
+    def __init__(self, UCT_exploration=0.7, selection_heuristics=False, expansion_heuristics=False, simulation_heuristics=False,
+                 rewards=REWARDS, dud_ratio=1, rollout_batch=1, transpositions=False, reuse_tree=True, slack=DEADLINE_SLACK,
+                 progressive_widening=False, widening_constant=2.0, widening_exponent=0.5, rollout_cutoff=None, boss_cutoff=False,
+                 leaf_pool=None, so_ismcts=False, rng=None, seed=None):
+        if dud_ratio <= 0:
+            raise Exception("dud_ratio has to be positive!")
+        if len(rewards) != 3:
+            raise Exception("rewards has to be (win reward, loss punishment, instant loss punishment)!")
+        if widening_constant <= 0 or not 0 <= widening_exponent <= 1:
+            raise Exception("Progressive widening needs a positive constant and an exponent between 0 and 1!")
+        if rollout_cutoff is not None and rollout_cutoff < 1:
+            raise Exception("A rollout cutoff has to allow at least one move!")
+
+        self.UCT_exploration = UCT_exploration
+        self.selection_heuristics = selection_heuristics
+        self.expansion_heuristics = expansion_heuristics
+        self.simulation_heuristics = simulation_heuristics
+        self.rewards = tuple(rewards)
+        self.dud_ratio = dud_ratio
+        self.rollout_batch = rollout_batch
+        self.transpositions = transpositions
+        self.reuse_tree = reuse_tree
+        self.slack = slack
+        self.progressive_widening = progressive_widening
+        self.widening_constant = widening_constant
+        self.widening_exponent = widening_exponent
+        self.rollout_cutoff = rollout_cutoff
+        self.boss_cutoff = boss_cutoff
+        self.leaf_pool = leaf_pool
+        self.so_ismcts = so_ismcts
+
+        if rng is None and seed is not None:
+            rng = random.Random(seed)
+        self.rng = rng
+
+    # applies the settings to a root node - Expand() copies them down to every child
+    def configure(self, node):
+        node.UCT_exploration = self.UCT_exploration
+        node.selection_heuristics = self.selection_heuristics
+        node.expansion_heuristics = self.expansion_heuristics
+        node.simulation_heuristics = self.simulation_heuristics
+        node.rewards = self.rewards
+        node.widening_constant = self.widening_constant
+        node.widening_exponent = self.widening_exponent
+
+# the result of one search - the chosen action plus the statistics of the search that chose it
+class Decision:
+    def __init__(self, seat, action, run_count, dud_runs, elapsed, stats, reused_visits=0, transpositions=None):
+        self.seat = seat
+        self.action = action
+        self.run_count = run_count
+        self.dud_runs = dud_runs
+        self.elapsed = elapsed
+        self.stats = stats # SearchStats of the decision
+        self.reused_visits = reused_visits # visits the root already had from the previous decision's tree
+        self.transpositions = transpositions # NOTE - only set when a transposition table is used - see TranspositionTable.stats()
+
+    def toDict(self):
+        return {
+            "seat": self.seat,
+            "action": repr(self.action),
+            "run_count": self.run_count,
+            "dud_runs": self.dud_runs,
+            "elapsed": self.elapsed,
+            "reused_visits": self.reused_visits,
+            "transpositions": self.transpositions,
+            "search": self.stats.toDict()
+        }
+
+# an agent that owns its search tree - call search() for every decision and advance() with every action played on the real board
+# NOTE - the tree of the last decision is kept (config.reuse_tree) so the next search carries on from the subtree actually reached
+class Searcher:
+    def __init__(self, config=None):
+        self.config = config if config else SearchConfig()
+        self.root_node = None
+
+    # forgets the tree - the next search starts from a new root
+    def reset(self):
+        if self.root_node:
+            self.root_node.release()
+        self.root_node = None
+
+    # follows actions played on the real board down the tree - state is the board after they were played
+    def advance(self, actions, state):
+        if self.root_node and self.config.reuse_tree:
+            self.root_node = advanceRoot(self.root_node, actions, state)
+        else:
+            self.reset()
+
+    def search(self, state, seat, budget):
+        config = self.config
+
+        if state.currentPlayer() != seat:
+            raise Exception("It isn't seat " + str(seat) + "'s turn!")
+
+        # NOTE - a reused root's board is the real state already (advanceRoot() re-roots onto it) - any other root is replaced
+        root_node = self.root_node
+        if root_node and (root_node.game_state.currentPlayer() != seat or not config.reuse_tree or config.so_ismcts):
+            self.reset()
+            root_node = None
+
+        if config.so_ismcts:
+            return self.searchSO(state, seat, budget)
+
+        if not root_node:
+            root_node = RegicideNode()
+            root_node.setGameState(state.clone())
+            root_node.setActivePlayer()
+
+        config.configure(root_node)
+        reused_visits = root_node.visits - 1
+
+        # NOTE - the search draws from config.rng by swapping its state into the global generator (everything below
+        #  uses the random module) - the caller's own stream is put back untouched afterwards
+        if config.rng is not None:
+            caller_state = random.getstate()
+            random.setstate(config.rng.getstate())
+
+        try:
+            root_node, run_count, dud_runs, elapsed = growTree(state, budget.max_runs, budget.max_time, config.dud_ratio, root_node,
+                                                               config.rollout_batch, config.transpositions, config.slack,
+                                                               config.progressive_widening, config.rollout_cutoff, config.boss_cutoff,
+                                                               config.leaf_pool)
+        finally:
+            if config.rng is not None:
+                config.rng.setstate(random.getstate())
+                random.setstate(caller_state)
+
+        self.root_node = root_node
+
+        action = root_node.findHighestRankingChild().getGameAction()
+        transpositions = root_node.transpositions.stats() if root_node.transpositions else None
+
+        return Decision(seat, action, run_count, dud_runs, elapsed, root_node.search_stats, reused_visits, transpositions)
+
+    # SO-ISMCTS decision (config.so_ismcts) - a new tree every time, nothing is kept for advance()
+    def searchSO(self, state, seat, budget):
+        config = self.config
+
+        if config.rng is not None:
+            caller_state = random.getstate()
+            random.setstate(config.rng.getstate())
+
+        try:
+            tree, run_count, dud_runs, elapsed = growSOTree(state, budget.max_runs, budget.max_time, config)
+        finally:
+            if config.rng is not None:
+                config.rng.setstate(random.getstate())
+                random.setstate(caller_state)
+
+        return Decision(seat, tree.findHighestRankingAction(), run_count, dud_runs, elapsed, tree.search_stats)
+
+# one-off decision from a new tree - use a Searcher to keep the tree between decisions
+def search(state, seat, budget, config=None):
+    return Searcher(config).search(state, seat, budget)
+
+# testing function
+def embeddedSearch():
+    from Game.Regicide.regicide_board import RegicideBoard
+
+    random.seed(0)
+    state = RegicideBoard()
+    state.start(2)
+    seat = state.currentPlayer()
+    budget = SearchBudget(max_runs=60)
+
+    # the same seed picks the same move and the caller's random stream isn't touched
+    caller_state = random.getstate()
+    first = search(state, seat, budget, SearchConfig(seed=1))
+    assert random.getstate() == caller_state, "Seeded search shouldn't use the caller's random stream!"
+    second = search(state, seat, budget, SearchConfig(seed=1))
+    assert first.action == second.action and first.stats.root_visits == second.stats.root_visits, "Seeded searches should be identical!"
+    assert first.action in state.legalPlays(state.players[seat].hand), "Search picked an illegal move!"
+    assert first.run_count == 60 and first.stats.run_count == 60, "Search should use its whole run budget!"
+
+    # every node of the tree follows the root's config
+    searcher = Searcher(SearchConfig(UCT_exploration=1.4, selection_heuristics=True, rewards=(1, 0, -1), seed=2))
+    decision = searcher.search(state, seat, budget)
+    stack = [searcher.root_node]
+    while stack:
+        node = stack.pop()
+        assert node.UCT_exploration == 1.4 and node.selection_heuristics and node.rewards == (1, 0, -1), "Child nodes should inherit the config!"
+        stack += node.branches
+
+    # the searcher carries its tree over to the next decision - the rest of the old tree is unlinked (no cycles left for the gc)
+    old_root = searcher.root_node
+    state.nextState(decision.action, True)
+    searcher.advance([decision.action], state)
+    assert old_root.branches == [], "Dropped tree should be released!"
+    if searcher.root_node:
+        decision = searcher.search(state, state.currentPlayer(), budget)
+        assert decision.reused_visits > 0, "Searcher should reuse the previous tree!"
+
+        # every board the search has gone back to since the re-root was replayed from the real board, not the old sample
+        root_history = searcher.root_node.game_state.history
+        stack = [searcher.root_node]
+        while stack:
+            node = stack.pop()
+            if node.stale_branches:
+                continue
+            for child in node.branches:
+                history = child.game_state.history
+                for step in range(child.depth):
+                    history = history.previous
+                assert history is root_history, "Reused nodes should be rebuilt from the real board!"
+                stack.append(child)
+
+    # SO-ISMCTS through the same API - seeded, configured and nothing kept between decisions
+    config = SearchConfig(so_ismcts=True, selection_heuristics=True, expansion_heuristics=True, rewards=(1, 0, -1), seed=3)
+    searcher = Searcher(config)
+    first = searcher.search(state, state.currentPlayer(), budget)
+    assert searcher.root_node is None, "SO-ISMCTS shouldn't keep a tree!"
+    second = Searcher(SearchConfig(so_ismcts=True, selection_heuristics=True, expansion_heuristics=True, rewards=(1, 0, -1), seed=3)).search(state, state.currentPlayer(), budget)
+    assert first.action == second.action and first.stats.root_visits == second.stats.root_visits, "Seeded SO-ISMCTS searches should be identical!"
+    assert first.action in state.legalPlays(state.players[state.currentPlayer()].hand), "SO-ISMCTS picked an illegal move!"
+    assert first.stats.run_count == 60 and first.stats.tree_size > 1, "SO-ISMCTS should fill in the decision's stats!"
+    # NOTE - a loss is worth its punishment plus a few bosses and turns - 1000 is far above what the default rewards give
+    tree, run_count, dud_runs, elapsed = growSOTree(state, 60, inf, SearchConfig(selection_heuristics=True, expansion_heuristics=True, rewards=(1, 1000, 0)))
+    assert tree.selection_heuristics and tree.expansion_heuristics and tree.rewards == (1, 1000, 0), "SO tree should use the config!"
+    assert tree.reward[0] / tree.visits[0] > 500, "SO tree should score rollouts with the config's rewards!"
+
+    # the array tree follows the config it's given
+    tree, run_count, dud_runs, elapsed = growArrayTree(state, 100, inf, SearchConfig(selection_heuristics=True, UCT_exploration=1.4, simulation_heuristics=True))
+    assert tree.selection_heuristics and tree.UCT_exploration == 1.4 and tree.simulation_heuristics, "Array tree should use the config!"
+    assert tree.findHighestRankingAction() in state.legalPlays(state.players[state.currentPlayer()].hand), "Array tree picked an illegal move!"
+
+    # progressive widening - no node has more branches than its visits allow and only a fraction of the moves are generated
+    seat = state.currentPlayer()
+    eager_searcher = Searcher(SearchConfig(seed=3))
+    eager = eager_searcher.search(state, seat, SearchBudget(max_runs=200))
+
+    # every expanded node generates the legal moves of the board after its move once - the root's aren't counted
+    legal_moves = 0
+    stack = list(eager_searcher.root_node.branches)
+    while stack:
+        node = stack.pop()
+        legal_moves += len(node.game_state.legalPlays(node.game_state.players[node.active_player].hand))
+        stack += node.branches
+    assert eager.stats.moves_generated == legal_moves, "Moves should be counted once per expanded node!"
+
+    searcher = Searcher(SearchConfig(progressive_widening=True, seed=3))
+    decision = searcher.search(state, seat, SearchBudget(max_runs=200))
+    assert decision.action in state.legalPlays(state.players[seat].hand), "Widened search picked an illegal move!"
+    assert decision.stats.moves_generated < eager.stats.moves_generated, "Widening should generate fewer moves!"
+    assert decision.stats.moves_expanded == decision.stats.tree_size - 1, "Every expanded move should be a node!"
+
+    stack = [searcher.root_node]
+    while stack:
+        node = stack.pop()
+        assert len(node.branches) <= node.wideningLimit(), "Node has more branches than its visits allow!"
+        stack += node.branches
+
+    # a reused widened tree only generates moves that don't have a branch yet
+    state.nextState(decision.action, True)
+    searcher.advance([decision.action], state)
+    if searcher.root_node:
+        decision = searcher.search(state, state.currentPlayer(), budget)
+        actions = [child.game_action for child in searcher.root_node.branches]
+        assert all(actions.count(action) == 1 for action in actions), "Reused root expanded a move twice!"
+
+    # rollout cutoff - rollouts stop after the cutoff (or the boss falling) and are scored on the same scale as full ones
+    seat = state.currentPlayer()
+    full = search(state, seat, SearchBudget(max_runs=100), SearchConfig(seed=4))
+    cut = search(state, seat, SearchBudget(max_runs=100), SearchConfig(rollout_cutoff=5, seed=4))
+    assert cut.action in state.legalPlays(state.players[seat].hand), "Cut off search picked an illegal move!"
+    assert cut.stats.rollout_cutoffs > 0 and cut.stats.meanRolloutLength() <= 5, "Rollouts should stop at the cutoff!"
+    assert full.stats.rollout_cutoffs == 0, "Rollouts shouldn't be cut off by default!"
+    mean = lambda decision: sum(visits * ranking for action, visits, ranking in decision.stats.root_visits) / sum(visits for action, visits, ranking in decision.stats.root_visits)
+    assert abs(mean(cut) - mean(full)) < 10, "Cut off rollouts should score on the scale of full rollouts!"
+
+    boss = search(state, seat, SearchBudget(max_runs=100), SearchConfig(boss_cutoff=True, seed=4))
+    assert boss.stats.meanRolloutLength() < full.stats.meanRolloutLength(), "Boss cutoff should shorten rollouts!"
+
+    try:
+        search(state, 1 - state.currentPlayer(), budget)
+        assert False, "Searching for the wrong seat should fail!"
+    except Exception as error:
+        assert "turn" in str(error), "Wrong seat should raise a turn error!"
+
+if __name__ == "__main__":
+    embeddedSearch()
+    print("Everything Passed!")
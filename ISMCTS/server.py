@@ -0,0 +1,557 @@
+# REFERENCE - https://docs.python.org/3/library/multiprocessing.html#pipes-and-queues
+# REFERENCE - https://docs.python.org/3/library/socketserver.html
+# REFERENCE - https://jsonlines.org/
+
+# External Imports
+import argparse
+import json
+import os
+import random
+import signal
+import socketserver
+import sys
+import threading
+import time
+import multiprocessing
+from collections import OrderedDict
+from collections import deque
+
+# Internal Imports
+from Cards.Base.card_set import maskOf
+from Game.Regicide.regicide_board import RegicideBoard
+from Game.Regicide.regicide_board import boardFromDict
+from ISMCTS.search import Searcher
+from ISMCTS.search import SearchBudget
+from ISMCTS.search import SearchConfig
+
+# Local move-server - hosts the agent for many games at once over JSON lines (stdin/stdout or a Unix socket)
+# every game is pinned to one worker process which keeps that game's tree between requests (see Searcher),
+# workers take turns between their games round-robin so one busy game can't starve the others
+## python -m ISMCTS.server --workers 4
+## python -m ISMCTS.server --workers 4 --socket /tmp/regicide.sock
+
+# Requests (one JSON object per line) - replies carry the same "id"
+## {"id": 1, "type": "search", "game": "g1", "board": RegicideBoard.toDict(), "budget": {"max_runs": 500, "max_time": 0.5}, "config": {"seed": 0}}
+## {"id": 2, "type": "close", "game": "g1"}
+## {"id": 3, "type": "stats"}
+
+# CONFIG - trees a worker keeps before dropping the least recently searched game
+MAX_WORKER_GAMES = 256
+
+# CONFIG - iterations every worker runs on a throwaway board before it reports ready (imports, legal plays cache)
+WARMUP_RUNS = 200
+
+# CONFIG - latencies kept for the percentiles in stats()
+LATENCY_WINDOW = 1000
+
+# NOTE - keys a request may set in its "config" - everything else is refused
+CONFIG_KEYS = ["UCT_exploration", "selection_heuristics", "expansion_heuristics", "simulation_heuristics", "rewards",
+               "dud_ratio", "rollout_batch", "transpositions", "reuse_tree", "slack", "progressive_widening", "widening_constant",
+               "widening_exponent", "rollout_cutoff", "boss_cutoff", "so_ismcts", "seed"]
+
+# nearest-rank percentile of an already sorted list
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, int(round(fraction * len(values))) - 1))
+    return values[index]
+
+def latencySummary(samples):
+    values = sorted(samples)
+    return {
+        "count": len(values),
+        "p50": percentile(values, 0.5),
+        "p90": percentile(values, 0.9),
+        "p99": percentile(values, 0.99),
+        "max": values[-1] if values else 0.0
+    }
+
+# walks the tree down the plays made on the real board - returns the tree's own actions for advanceRoot() or None
+# NOTE - plays are matched by their cards (the board that came over JSON has new card lists, not the tree's tuples)
+def treeLine(root_node, plays):
+    node = root_node
+    line = []
+    for cards in plays:
+        mask = maskOf(cards)
+        node = next((child for child in node.branches if maskOf(child.game_action) == mask), None)
+        if node is None:
+            return None
+        line.append(node.game_action)
+    return line
+
+def searchConfig(data):
+    if not data:
+        return SearchConfig()
+
+    unknown = [key for key in data if key not in CONFIG_KEYS]
+    if unknown:
+        raise Exception("Unknown config keys: " + ", ".join(unknown))
+
+    return SearchConfig(**data)
+
+# one game a worker is hosting - its searcher and how many actions the board had when the tree was last advanced
+class HostedGame:
+    def __init__(self, config_data):
+        self.config_data = config_data
+        self.searcher = Searcher(searchConfig(config_data))
+        self.actions = 0
+
+    # moves the tree on to the board the client sent - anything that can't be followed starts a new tree
+    def catchUp(self, board):
+        searcher = self.searcher
+        if searcher.root_node is None:
+            return
+
+        if board.turnCount() < self.actions:
+            searcher.reset()
+            return
+
+        plays = [action.cards for action in board.actions[self.actions:]]
+        line = treeLine(searcher.root_node, plays)
+        if line is None:
+            searcher.reset()
+        elif line:
+            searcher.advance(line, board)
+
+# handles one request inside a worker process and returns the reply
+def handleRequest(games, request):
+    game_id = request.get("game")
+    request_type = request.get("type")
+
+    if request_type == "close":
+        games.pop(game_id, None)
+        return {"game": game_id, "closed": True}
+
+    if request_type != "search":
+        raise Exception("Unknown request type: " + str(request_type))
+
+    board = boardFromDict(request["board"])
+    budget_data = request.get("budget", {})
+    budget = SearchBudget(budget_data.get("max_runs", 100), budget_data.get("max_time", 1.0))
+    config_data = request.get("config") or {}
+
+    # NOTE - a game that changes its config gets a new tree - the old one was grown with other settings
+    game = games.get(game_id)
+    if game is None or game.config_data != config_data:
+        game = HostedGame(config_data)
+        games[game_id] = game
+    games.move_to_end(game_id)
+
+    while len(games) > MAX_WORKER_GAMES:
+        games.popitem(last=False)
+
+    game.catchUp(board)
+
+    decision = game.searcher.search(board, board.currentPlayer(), budget)
+    game.actions = board.turnCount()
+
+    reply = decision.toDict()
+    reply["game"] = game_id
+    reply["action"] = [card.index for card in decision.action] if decision.action else None
+    reply["cards"] = repr(list(decision.action)) if decision.action else None
+    return reply
+
+# worker process entry point - must be a module level function so it can be started in a new process
+# NOTE - requests come in over conn one at a time, None shuts the worker down
+def serverWorker(conn, warmup=True):
+    if warmup:
+        random.seed(os.getpid())
+        board = RegicideBoard()
+        board.start(2)
+        Searcher(SearchConfig(seed=0)).search(board, board.currentPlayer(), SearchBudget(max_runs=WARMUP_RUNS))
+
+    conn.send("ready")
+
+    games = OrderedDict()
+    parent = os.getppid()
+    while True:
+        # NOTE - forked workers inherit each other's ends of the pipes so a dead server doesn't always show up as EOF -
+        #  the worker also stops once it's been orphaned
+        if not conn.poll(1.0):
+            if os.getppid() != parent:
+                break
+            continue
+
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+
+        try:
+            reply = handleRequest(games, request)
+        except Exception as error:
+            reply = {"game": request.get("game"), "error": str(error)}
+
+        conn.send(reply)
+
+    conn.close()
+
+# Fair scheduler - games are pinned to a worker (least loaded when first seen) and each worker serves its games round-robin
+# NOTE - a game with several requests queued goes to the back of the ring after each one so every game gets a turn
+class FairQueue:
+    def __init__(self, workers):
+        self.assignment = {} # game -> worker
+        self.load = [0] * workers # games pinned to each worker
+        self.rings = [deque() for worker in range(workers)] # games with queued requests - in the order they're served
+        self.jobs = {} # game -> deque of queued requests
+        self.closing = set() # closed games waiting for their queued requests to be answered before they're unpinned
+        self.depth = 0
+
+    def assign(self, game):
+        worker = self.assignment.get(game)
+        if worker is None:
+            worker = self.load.index(min(self.load))
+            self.assignment[game] = worker
+            self.load[worker] += 1
+        return worker
+
+    def push(self, game, job):
+        worker = self.assign(game)
+        jobs = self.jobs.get(game)
+        if not jobs:
+            jobs = deque()
+            self.jobs[game] = jobs
+            self.rings[worker].append(game)
+        jobs.append(job)
+        self.depth += 1
+        return worker
+
+    # next request for worker - None if it has nothing queued
+    def pop(self, worker):
+        ring = self.rings[worker]
+        if not ring:
+            return None
+
+        game = ring.popleft()
+        jobs = self.jobs[game]
+        job = jobs.popleft()
+        if jobs:
+            ring.append(game)
+        else:
+            del self.jobs[game]
+        self.depth -= 1
+        return job
+
+    # unpins a closed game - its worker has already dropped the tree
+    # NOTE - requests queued for the game behind the close still go to the same worker - the game is unpinned once the last
+    #  of them has been answered (see finish())
+    def release(self, game):
+        self.closing.add(game)
+        self.finish(game)
+
+    # called once a request for game has been answered
+    def finish(self, game):
+        if game in self.closing and game not in self.jobs:
+            self.closing.discard(game)
+            worker = self.assignment.pop(game, None)
+            if worker is not None:
+                self.load[worker] -= 1
+
+# a queued request - reply is called with the reply dict once the worker has answered
+class Job:
+    def __init__(self, request, reply):
+        self.request = request
+        self.reply = reply
+        self.submitted = time.perf_counter()
+
+# owns the worker processes and one dispatch thread per worker - submit() can be called from any thread
+class MoveServer:
+    def __init__(self, workers=None, warmup=True):
+        workers = workers if workers else os.cpu_count() or 1
+        if workers < 1:
+            raise Exception("The move-server needs at least one worker!")
+
+        self.condition = threading.Condition()
+        self.queue = FairQueue(workers)
+        self.running = True
+        self.in_flight = 0
+        self.served = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW) # submit -> reply (s)
+        self.waits = deque(maxlen=LATENCY_WINDOW) # time spent queued (s)
+        self.start_time = time.perf_counter()
+
+        # NOTE - every worker is started (and warmed up) before any thread exists so the processes fork cleanly
+        self.processes = []
+        self.connections = []
+        for worker in range(workers):
+            parent_conn, child_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=serverWorker, args=(child_conn, warmup), daemon=True)
+            process.start()
+            self.processes.append(process)
+            self.connections.append(parent_conn)
+
+        for conn in self.connections:
+            if conn.recv() != "ready":
+                raise Exception("Move-server worker failed to start!")
+
+        self.threads = [threading.Thread(target=self.dispatch, args=(worker,), daemon=True) for worker in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    # queues a request - reply(dict) is called from a dispatch thread (stats are answered straight away)
+    def submit(self, request, reply):
+        request_id = request.get("id")
+        request_type = request.get("type")
+
+        if request_type == "stats":
+            stats = self.stats()
+            stats["id"] = request_id
+            reply(stats)
+            return
+
+        if request_type not in ["search", "close"] or "game" not in request:
+            with self.condition:
+                self.errors += 1
+            reply({"id": request_id, "error": "Requests need a type (search/close/stats) and a game!"})
+            return
+
+        with self.condition:
+            if not self.running:
+                raise Exception("Move-server has been closed!")
+            self.queue.push(request["game"], Job(request, reply))
+            self.condition.notify_all()
+
+    def dispatch(self, worker):
+        conn = self.connections[worker]
+        while True:
+            with self.condition:
+                job = self.queue.pop(worker)
+                while job is None and self.running:
+                    self.condition.wait()
+                    job = self.queue.pop(worker)
+                if job is None:
+                    return
+                self.in_flight += 1
+
+            started = time.perf_counter()
+            try:
+                conn.send({key: value for key, value in job.request.items() if key != "id"})
+                reply = conn.recv()
+            except (EOFError, OSError):
+                reply = {"game": job.request.get("game"), "error": "Move-server worker " + str(worker) + " stopped!"}
+            finished = time.perf_counter()
+
+            reply["id"] = job.request.get("id")
+            reply["queue_wait"] = started - job.submitted
+            reply["latency"] = finished - job.submitted
+
+            with self.condition:
+                self.in_flight -= 1
+                self.served += 1
+                if "error" in reply:
+                    self.errors += 1
+                self.latencies.append(reply["latency"])
+                self.waits.append(reply["queue_wait"])
+                if job.request["type"] == "close":
+                    self.queue.release(job.request["game"])
+                else:
+                    self.queue.finish(job.request["game"])
+                self.condition.notify_all()
+
+            job.reply(reply)
+
+    # blocks until every queued request has been answered
+    def drain(self):
+        with self.condition:
+            while self.queue.depth or self.in_flight:
+                self.condition.wait()
+
+    def stats(self):
+        with self.condition:
+            return {
+                "workers": len(self.processes),
+                "queue_depth": self.queue.depth,
+                "in_flight": self.in_flight,
+                "served": self.served,
+                "errors": self.errors,
+                "games": self.queue.load[:],
+                "latency": latencySummary(self.latencies),
+                "queue_wait": latencySummary(self.waits),
+                "uptime": time.perf_counter() - self.start_time
+            }
+
+    def close(self):
+        self.drain()
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        for thread in self.threads:
+            thread.join()
+        for conn in self.connections:
+            conn.send(None)
+            conn.close()
+        for process in self.processes:
+            process.join()
+
+# reads JSON requests line by line from lines and writes the replies to output as they finish (not in request order)
+# NOTE - returns once the input ends and every request from it has been answered
+def serveLines(server, lines, output):
+    lock = threading.Lock()
+    pending = [0]
+    done = threading.Condition(lock)
+
+    def reply(message):
+        with lock:
+            try:
+                output.write(json.dumps(message) + "\n")
+                output.flush()
+            except (OSError, ValueError):
+                pass # NOTE - the client went away - nothing left to answer
+            pending[0] -= 1
+            done.notify_all()
+
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if not line.strip():
+            continue
+
+        with lock:
+            pending[0] += 1
+
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request isn't an object")
+        except ValueError as error:
+            reply({"id": None, "error": "Invalid JSON request: " + str(error)})
+            continue
+
+        # NOTE - a request the server won't take is answered here - otherwise it would never stop being pending
+        try:
+            server.submit(request, reply)
+        except Exception as error:
+            reply({"id": request.get("id"), "error": str(error)})
+
+    with lock:
+        while pending[0]:
+            done.wait()
+
+def serveSocket(server, path):
+    if not hasattr(socketserver, "ThreadingUnixStreamServer"):
+        raise Exception("Unix sockets aren't available on this platform - use stdin/stdout instead!")
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            output = self.wfile
+            writer = type("Writer", (), {
+                "write": lambda writer, text: output.write(text.encode("utf-8")),
+                "flush": lambda writer: output.flush()
+            })()
+            serveLines(server, self.rfile, writer)
+
+    if os.path.exists(path):
+        os.remove(path)
+
+    with socketserver.ThreadingUnixStreamServer(path, Handler) as socket_server:
+        socket_server.daemon_threads = True
+        try:
+            socket_server.serve_forever()
+        finally:
+            os.remove(path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve ISMCTS moves for many Regicide games over JSON lines.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes (one search at a time each)")
+    parser.add_argument("--socket", default=None, help="listen on this Unix socket instead of stdin/stdout")
+    parser.add_argument("--no-warmup", action="store_true", help="don't warm the workers up before serving")
+    args = parser.parse_args(argv)
+
+    # NOTE - SIGTERM shuts down the same way Ctrl+C does - queued requests are answered and the socket file is removed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    server = MoveServer(args.workers, not args.no_warmup)
+    try:
+        if args.socket:
+            serveSocket(server, args.socket)
+        else:
+            serveLines(server, sys.stdin, sys.stdout)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+# testing function
+def moveServer():
+    import io
+    import queue
+
+    # requests are served round-robin between games on the same worker
+    fair = FairQueue(2)
+    for game, job in [("a", 1), ("a", 2), ("a", 3), ("c", 4), ("b", 5)]:
+        fair.push(game, job)
+    assert fair.assignment == {"a": 0, "c": 1, "b": 0}, "New games should go to the least loaded worker!"
+    assert [fair.pop(0) for counter in range(5)] == [1, 5, 2, 3, None], "Games should take turns on a worker!"
+    assert fair.pop(1) == 4 and fair.depth == 0, "Queue depth should be back to zero!"
+
+    # a closed game stays pinned until the requests queued behind its close are answered
+    fair.push("a", 6)
+    fair.push("a", 7)
+    fair.pop(0)
+    fair.release("a")
+    assert fair.assignment["a"] == 0 and fair.load == [2, 1], "Game with queued requests shouldn't be unpinned yet!"
+    fair.pop(0)
+    fair.finish("a")
+    assert "a" not in fair.assignment and fair.load == [1, 1], "Closed game should be unpinned after its last request!"
+
+    server = MoveServer(2, warmup=False)
+    try:
+        replies = queue.Queue()
+        boards = {}
+        for game in range(3):
+            random.seed(game)
+            boards[game] = RegicideBoard()
+            boards[game].start(2 + game)
+
+        # a few turns of three games at once - every board goes through JSON like a real client's would
+        reused = 0
+        for turn in range(4):
+            for game, board in boards.items():
+                server.submit({"id": (game, turn), "type": "search", "game": game, "board": json.loads(json.dumps(board.toDict())),
+                               "budget": {"max_runs": 60}, "config": {"seed": game}}, replies.put)
+
+            for counter in range(len(boards)):
+                reply = replies.get(timeout=60)
+                assert "error" not in reply, reply.get("error")
+                board = boards[reply["game"]]
+                hand = board.players[board.currentPlayer()].hand
+                cards = [card for card in hand if card.index in (reply["action"] or [])]
+                assert any(maskOf(play) == maskOf(reply["action"] and cards) for play in board.legalPlays(hand)), "Reply should be a legal play!"
+                board.nextState(cards if cards else None, True)
+                reused += reply["reused_visits"]
+
+        assert reused > 0, "Workers should keep their trees between requests!"
+
+        server.submit({"id": "bad", "type": "search", "game": 0, "board": {}}, replies.put)
+        assert "error" in replies.get(timeout=60), "Bad boards should get an error reply!"
+
+        stats = server.stats()
+        assert stats["served"] == 13 and stats["queue_depth"] == 0 and stats["latency"]["count"] == 13, "Stats don't add up!"
+        assert sorted(stats["games"]) == [1, 2], "Games should be spread over the workers!"
+
+        # the same requests over JSON lines
+        output = io.StringIO()
+        lines = [json.dumps({"id": 1, "type": "search", "game": "lines", "board": boards[0].toDict(), "budget": {"max_runs": 20}}),
+                 "not json", json.dumps({"id": 2, "type": "stats"}), json.dumps({"id": 3, "type": "close", "game": "lines"})]
+        serveLines(server, lines, output)
+        answers = {answer["id"]: answer for answer in map(json.loads, output.getvalue().splitlines())}
+        assert answers[1]["run_count"] == 20 and "error" in answers[None] and "latency" in answers[2], "JSON line replies are wrong!"
+        assert answers[3]["closed"], "Close should be answered!"
+    finally:
+        server.close()
+
+    # a closed server answers with an error instead of leaving serveLines() waiting
+    output = io.StringIO()
+    serveLines(server, [json.dumps({"id": 4, "type": "close", "game": "lines"})], output)
+    answer = json.loads(output.getvalue())
+    assert answer["id"] == 4 and "error" in answer, "Requests a closed server refuses should get an error reply!"
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--test":
+        moveServer()
+        print("Everything Passed!")
+    else:
+        main()
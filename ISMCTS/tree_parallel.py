@@ -0,0 +1,410 @@
+# REFERENCE - https://docs.python.org/3/library/multiprocessing.shared_memory.html
+# REFERENCE - Chaslot, Winands & van den Herik (2008) - Parallel Monte-Carlo Tree Search (tree parallelization, virtual loss)
+
+# External Imports
+import random
+import time
+import multiprocessing
+from contextlib import nullcontext
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from math import sqrt
+from math import log
+from math import inf
+
+# Internal Imports
+from ISMCTS.Game.array_tree import ArrayTree
+from ISMCTS.Game.array_tree import moveId
+from ISMCTS.Game.array_tree import moveFromId
+from ISMCTS.Game.array_tree import legalIds
+from ISMCTS.Game.regicide_node import RegicideNode
+from Game.Regicide.regicide_board import Result
+from ISMCTS.Base.deadline import DeadlineScheduler
+from ISMCTS.Base.deadline import DEADLINE_SLACK
+from ISMCTS.parallel import ParallelStats
+
+# Tree-parallel ISMCTS - every worker grows the same tree, an ArrayTree whose columns live in one shared memory block
+# workers walk their own board down from the root (same Select -> Expand -> Simulate -> Backpropagate steps as ArrayTree)
+# and a virtual loss is put on every node they pass so the other workers are steered away from the paths being simulated
+# NOTE - one lock (shared by the pool's workers - see createTreePool()) covers the counters, the child links, the virtual
+#  losses and backpropagation. it's held for a handful of array writes at a time so workers only wait on it briefly -
+#  Select reads the statistics without it (a stale read only changes which child gets picked)
+# NOTE - rows are handed out in chunks - a worker reserves CHUNK_NODES rows from the shared counter and allocates children
+#  from its own chunk without the lock. the end of a chunk that's too small for a node's children is left unused
+
+# CONFIG - rows in a search's shared block - the search stops expanding once they're all used (see SharedTree.startRun())
+TREE_CAPACITY = 1 << 18
+
+# CONFIG - rows a worker reserves at a time
+CHUNK_NODES = 1024
+
+# CONFIG - visits a worker adds to every node of the path it's simulating and the reward each one counts as
+#  (a loss, the same as LOSS_PUNISHMENT) until the real result is backpropagated
+VIRTUAL_LOSS = 1
+VIRTUAL_LOSS_REWARD = 0
+
+# shared block layout - a header of counters then one column after another, every value 8 bytes
+#  header: next free row | iterations started | dud runs | tree full
+HEADER_SLOTS = 4
+NEXT_NODE = 0
+STARTED_RUNS = 1
+DUD_RUNS = 2
+TREE_FULL = 3
+COLUMNS = [("visits", "q"), ("reward", "d"), ("virtual", "q"), ("parent", "q"), ("first_child", "q"), ("num_children", "q"), ("move", "q")]
+
+# set in every worker of a tree pool - the lock of the shared tree
+tree_lock = None
+
+def sharedTreeSize(capacity):
+    return (HEADER_SLOTS + len(COLUMNS) * capacity) * 8
+
+# ArrayTree over a shared memory block - the columns are typed views of the block so every process sees the same tree
+# NOTE - lock is None while the search sets the block up - no worker has attached yet
+class SharedTree(ArrayTree):
+    def __init__(self, memory, capacity, state, lock=None, selection_heuristics=False, UCT_exploration=0.7, simulation_heuristics=False, chunk=CHUNK_NODES):
+        self.memory = memory
+        self.board = state.clone()
+        self.lock = lock if lock is not None else nullcontext()
+        self.selection_heuristics = selection_heuristics
+        self.UCT_exploration = UCT_exploration
+        self.simulation_heuristics = simulation_heuristics
+        self.chunk = chunk
+        self.capacity = capacity
+
+        # NOTE - rows of this process's current chunk - [chunk_next, chunk_end)
+        self.chunk_next = 0
+        self.chunk_end = 0
+
+        buffer = memory.buf
+        self.header = buffer[:HEADER_SLOTS * 8].cast("q")
+        offset = HEADER_SLOTS * 8
+        for name, code in COLUMNS:
+            setattr(self, name, buffer[offset:offset + capacity * 8].cast(code))
+            offset += capacity * 8
+
+        self.policy = RegicideNode()
+        self.policy.game_state = self.board
+
+    # rows used so far (chunks handed out, not just rows with a node in them)
+    @property
+    def size(self):
+        return self.header[NEXT_NODE]
+
+    # the views have to be released before the block can be closed
+    def release(self):
+        for name, code in COLUMNS:
+            getattr(self, name).release()
+        self.header.release()
+
+    # first of count rows in a row from this process's chunk - None if the tree is full
+    def reserve(self, count):
+        if self.chunk_next + count > self.chunk_end:
+            with self.lock:
+                start = self.header[NEXT_NODE]
+                if start + count > self.capacity:
+                    self.header[TREE_FULL] = 1
+                    return None
+                end = min(self.capacity, start + max(self.chunk, count))
+                self.header[NEXT_NODE] = end
+
+            self.chunk_next = start
+            self.chunk_end = end
+
+        first = self.chunk_next
+        self.chunk_next += count
+        return first
+
+    # adds count nodes in one block under parent - returns the first one or None if the tree is full
+    # NOTE - rows are filled in before they're linked to the parent so the other workers never see half a block.
+    #  if another worker linked children to parent first its block is kept and these rows go unused
+    def allocate(self, count, parent, moves):
+        first = self.reserve(count)
+        if first is None:
+            return None
+
+        for offset in range(count):
+            self.parent[first + offset] = parent
+            self.move[first + offset] = moveId(moves[offset])
+
+        if parent >= 0:
+            with self.lock:
+                if self.num_children[parent] != 0:
+                    return self.first_child[parent]
+                self.first_child[parent] = first
+                self.num_children[parent] = count
+
+        return first
+
+    def addVirtualLoss(self, node):
+        with self.lock:
+            self.virtual[node] += VIRTUAL_LOSS
+
+    # claims an untried child for this worker - the check and the virtual loss happen under one lock
+    # NOTE - returns False if another worker visited or claimed the child since it was read as untried
+    def claimChild(self, child):
+        with self.lock:
+            if self.visits[child] != 0 or self.virtual[child] != 0:
+                return False
+            self.virtual[child] += VIRTUAL_LOSS
+            return True
+
+    # every result is added to every node on the path and the path's virtual loss is taken back off in one go
+    # NOTE - called with no results to take the virtual loss off a path that was never simulated (dud runs)
+    def Backpropagate(self, path, results):
+        total = sum(results)
+        count = len(results)
+        with self.lock:
+            for node in path:
+                self.visits[node] += count
+                self.reward[node] += total
+            for node in path[1:]:
+                self.virtual[node] -= VIRTUAL_LOSS
+
+    # UCT over the available children of node - virtual losses count as visits with VIRTUAL_LOSS_REWARD each
+    def selectUCT(self, node, children):
+        exploration = self.UCT_exploration
+        parent_log = log(max(1, self.visits[node] + self.virtual[node]))
+
+        max_rank = -inf
+        selection = children[0]
+        for child in children:
+            virtual = self.virtual[child]
+            visits = self.visits[child] + virtual
+            rank = (self.reward[child] + VIRTUAL_LOSS_REWARD * virtual) / visits + exploration * sqrt(parent_log / visits)
+            if rank > max_rank:
+                max_rank = rank
+                selection = child
+        return selection
+
+    # reserves the next iteration of the search - False once the budget is used up or the tree is full
+    def startRun(self, max_runs, max_duds):
+        with self.lock:
+            header = self.header
+            if header[STARTED_RUNS] >= max_runs or header[DUD_RUNS] >= max_duds or header[TREE_FULL]:
+                return False
+            header[STARTED_RUNS] += 1
+            return True
+
+    def countDud(self):
+        with self.lock:
+            self.header[DUD_RUNS] += 1
+
+    # one Select -> Expand -> Simulate -> Backpropagate iteration - returns False on a dud run (nothing expanded)
+    # NOTE - ArrayTree.iterate() with a virtual loss on every node the worker moves to - a child another worker is
+    #  simulating (virtual loss but no visits yet) isn't expanded again
+    def iterate(self):
+        board = self.board
+        undo_records = []
+        path = [0]
+        node = 0
+        simulated = False
+
+        try:
+            while True:
+                # Select - walk down while every available child of the node has been visited
+                hand = board.players[board.currentPlayer()].hand
+                legal_plays = board.legalPlays(hand)
+
+                if len(legal_plays) == 0:
+                    return False
+
+                if self.num_children[node] == 0:
+                    if self.allocate(len(legal_plays), node, legal_plays) is None:
+                        return False
+
+                children = self.availableChildren(node, legalIds(board, hand))
+
+                if len(children) == 0:
+                    return False
+
+                untried = [child for child in children if self.visits[child] == 0 and self.virtual[child] == 0]
+
+                while untried:
+                    # Expand - a random unvisited child, unless another worker gets to it first
+                    child = untried.pop(random.randint(0, len(untried) - 1))
+                    if not self.claimChild(child):
+                        continue
+                    path.append(child)
+                    undo_records.append(board.nextState(self.moveOf(child), True, undo=True))
+                    self.Simulate(board, path, undo_records)
+                    simulated = True
+                    return True
+
+                # NOTE - every child has been visited or claimed by now so none of them has zero visits for UCT
+
+                if self.selection_heuristics:
+                    child = self.selectUCT(node, children)
+                else:
+                    child = children[random.randint(0, len(children) - 1)]
+
+                self.addVirtualLoss(child)
+                path.append(child)
+                undo_records.append(board.nextState(self.moveOf(child), True, undo=True))
+                node = child
+
+                winner = board.winner()
+                if winner == Result.WIN or winner == Result.LOSS:
+                    # NOTE - a terminal node is only simulated once (like RegicideNode) - after that it's a dud
+                    return False
+        finally:
+            if not simulated:
+                self.Backpropagate(path, [])
+            for record in reversed(undo_records):
+                board.undo(record)
+
+    def moveOf(self, node):
+        return moveFromId(self.move[node])
+
+# worker start up - every worker of the pool shares the tree lock
+def attachLock(lock):
+    global tree_lock
+    tree_lock = lock
+
+# a pool whose workers can grow a shared tree - the lock is handed to every worker when it starts
+# NOTE - attaching to a block registers it with the resource tracker (before Python 3.13) - the tracker is started before
+#  the workers so they share this process's one, otherwise every worker's own tracker would unlink the block (or warn about
+#  a leak) when the worker exits. the search that created the block is the one that unlinks it
+def createTreePool(workers):
+    resource_tracker.ensure_running()
+    return multiprocessing.Pool(workers, initializer=attachLock, initargs=(multiprocessing.Lock(),))
+
+# worker entry point - must be a module level function so the pool can pickle it
+# NOTE - the worker attaches to the search's block by name and runs iterations until the shared budget is used up
+def treeWorker(job):
+    name, capacity, state, max_runs, max_time, max_duds, slack, settings, seed = job
+
+    # NOTE - each worker has an independent RNG stream otherwise every worker would walk the same paths
+    random.seed(seed)
+
+    memory = SharedMemory(name=name)
+    tree = SharedTree(memory, capacity, state, tree_lock, *settings)
+
+    run_count = 0
+    dud_runs = 0
+    scheduler = DeadlineScheduler(max_time, slack)
+    try:
+        while not scheduler.expired(run_count) and tree.startRun(max_runs, max_duds):
+            if not tree.iterate():
+                dud_runs += 1
+                tree.countDud()
+            run_count += 1
+    finally:
+        tree.release()
+        memory.close()
+
+    return run_count, dud_runs
+
+# every worker grows one shared tree - max_runs is the budget of the whole search (root-parallel search gives each worker max_runs)
+# NOTE - pool has to come from createTreePool() - if no pool is given one is created (and closed) for this call only
+# NOTE - returns the action and a ParallelStats with the rows the tree used (tree_size) and the tree's root children
+def treeParallelSearch(state, max_runs, max_time, workers, pool=None, dud_ratio=1, capacity=TREE_CAPACITY,
+                       selection_heuristics=False, UCT_exploration=0.7, simulation_heuristics=False, slack=DEADLINE_SLACK):
+    if workers < 1:
+        raise Exception("Tree-parallel search needs at least one worker!")
+
+    start_time = time.perf_counter()
+
+    max_duds = int(max_runs/dud_ratio)
+
+    # NOTE - if dud_ratio is too big to return on integer > 0 - default to max_runs
+    if max_duds == 0:
+        max_duds = max_runs
+
+    memory = SharedMemory(create=True, size=sharedTreeSize(capacity))
+    tree = SharedTree(memory, capacity, state)
+    try:
+        tree.allocate(1, -1, [None]) # root
+
+        # NOTE - seeds are drawn from the main RNG so seeded games pick the same worker streams
+        settings = (selection_heuristics, UCT_exploration, simulation_heuristics)
+        jobs = [(memory.name, capacity, state, max_runs, max_time, max_duds, slack, settings, random.getrandbits(64)) for worker in range(workers)]
+
+        if pool:
+            results = pool.map(treeWorker, jobs, chunksize=1)
+        else:
+            with createTreePool(workers) as new_pool:
+                results = new_pool.map(treeWorker, jobs, chunksize=1)
+
+        action = tree.findHighestRankingAction()
+
+        elapsed = time.perf_counter() - start_time
+        stats = ParallelStats([run_count for run_count, dud_runs in results], [dud_runs for run_count, dud_runs in results], elapsed)
+        stats.tree_size = tree.size
+        stats.root_children = tree.rootChildren()
+    finally:
+        tree.release()
+        memory.close()
+        memory.unlink()
+
+    return action, stats
+
+# testing function
+def treeParallel():
+    from Game.Regicide.regicide_board import RegicideBoard
+    from ISMCTS.search import growArrayTree
+
+    random.seed(0)
+    state = RegicideBoard()
+    state.start(3)
+    seat = state.currentPlayer()
+
+    with createTreePool(2) as pool:
+        # the whole budget is shared - the workers run exactly max_runs iterations between them
+        start_time = time.perf_counter()
+        action, stats = treeParallelSearch(state, 300, inf, 2, pool, selection_heuristics=True)
+        parallel_time = time.perf_counter() - start_time
+
+        assert action in state.legalPlays(state.players[seat].hand), "Tree-parallel search picked an illegal move!"
+        assert stats.run_count == 300 and len(stats.worker_runs) == 2, "Workers should share the run budget!"
+        assert sum(visits for move, reward, visits in stats.root_children) > 0, "Root children should have been visited!"
+
+        # every virtual loss is taken back off and every child block hangs off its parent
+        capacity = 1 << 16
+        memory = SharedMemory(create=True, size=sharedTreeSize(capacity))
+        tree = SharedTree(memory, capacity, state, chunk=64)
+        try:
+            tree.allocate(1, -1, [None])
+            jobs = [(memory.name, capacity, state, 200, inf, 200, DEADLINE_SLACK, (True, 0.7, False), seed) for seed in range(2)]
+            pool.map(treeWorker, jobs, chunksize=1)
+
+            rows = tree.size
+            assert all(tree.virtual[node] == 0 for node in range(rows)), "Virtual loss left on the tree!"
+            for node in range(rows):
+                for child in range(tree.first_child[node], tree.first_child[node] + tree.num_children[node]):
+                    assert tree.parent[child] == node, "Child block isn't linked to its parent!"
+            children = range(tree.first_child[0], tree.first_child[0] + tree.num_children[0])
+            assert tree.visits[0] == sum(tree.visits[child] for child in children), "Root visits should be the sum of its children's!"
+
+            # only one of two workers sharing the tree can claim the same untried child
+            other = SharedTree(memory, capacity, state)
+            untried = tree.allocate(1, -1, [None])
+            assert tree.claimChild(untried) and not other.claimChild(untried), "An untried child was claimed twice!"
+            assert tree.virtual[untried] == VIRTUAL_LOSS, "A lost claim shouldn't add virtual loss!"
+            tree.virtual[untried] = 0
+            other.release()
+
+            # a full tree stops the search instead of failing
+            tree.header[STARTED_RUNS] = 0
+            tree.header[DUD_RUNS] = 0
+            tree.header[NEXT_NODE] = tree.capacity
+            tree.chunk_next = tree.chunk_end = 0
+            jobs = [(memory.name, capacity, state, 10000, inf, 10000, DEADLINE_SLACK, (False, 0.7, False), seed) for seed in range(2)]
+            assert sum(run_count for run_count, dud_runs in pool.map(treeWorker, jobs)) < 10000, "A full tree should stop the search!"
+            assert tree.header[TREE_FULL] == 1, "Tree should be marked full!"
+        finally:
+            tree.release()
+            memory.close()
+            memory.unlink()
+
+    # comparable to the serial array tree with the same budget
+    start_time = time.perf_counter()
+    serial, run_count, dud_runs, elapsed = growArrayTree(state, 300, inf)
+    serial_time = time.perf_counter() - start_time
+
+    mean = lambda children: sum(reward for move, reward, visits in children) / max(1, sum(visits for move, reward, visits in children))
+    print("Tree-parallel: {:.0f} runs/s (mean {:.2f}) | Serial: {:.0f} runs/s (mean {:.2f}) | Rows: {}".format(
+        stats.run_count / parallel_time, mean(stats.root_children), run_count / serial_time, mean(serial.rootChildren()), stats.tree_size))
+
+if __name__ == "__main__":
+    treeParallel()
+    print("Everything Passed!")